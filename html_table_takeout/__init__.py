@@ -1,2 +1,43 @@
+from typing import TYPE_CHECKING
+
 from .parser import parse_html
-from .types import Table, TRow, TCell, TLink, TRef, TText
+from .types import Table, TRow, TCell, TTextCell, TLink, TRef, TText
+from .schema import TypedColumn
+from .stats import ParseStats
+from .hooks import ParseHook, HistogramHook, Histogram, register_hook, unregister_hook
+from .diff import TableDiff
+from .selector import Selector
+
+if TYPE_CHECKING:
+    from .scan import TableInfo, scan_tables, parse_table_at
+    from .index import TableIndex, IndexedTable
+    from .lazy import LazyTable
+    from .reparse import TableReparser, ReparseResult
+
+
+# Exports whose modules are imported on first use, as the index loads sqlite3
+# and json, and none of them are needed to parse
+_LAZY_EXPORTS = {
+    'TableInfo': 'scan',
+    'scan_tables': 'scan',
+    'parse_table_at': 'scan',
+    'TableIndex': 'index',
+    'IndexedTable': 'index',
+    'LazyTable': 'lazy',
+    'TableReparser': 'reparse',
+    'ReparseResult': 'reparse',
+}
+
+
+def __getattr__(name: str):
+    module_name = _LAZY_EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    import importlib # pylint: disable=import-outside-toplevel
+    value = getattr(importlib.import_module(f".{module_name}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted({*globals(), *_LAZY_EXPORTS})
@@ -0,0 +1,261 @@
+"""
+Benchmarks parsing and exporting on synthetic documents, generated from a
+seed so that runs are comparable. Run with::
+
+    python -m html_table_takeout.bench [--scale 1.0] [--repeat 5] [--json results.json]
+
+Pass ``--compare`` with the JSON of an earlier run to print the change in
+median times. Nothing is fetched from the network.
+"""
+import argparse
+import json
+import math
+import platform
+import random
+import sys
+import time
+from typing import Any, Callable
+
+from .parser import parse_html
+from .types import Table
+
+
+_WORDS = (
+    'alpha', 'beta', 'gamma', 'delta', 'population', 'revenue', 'total', 'Québec',
+    'naïve', '東京', 'year', 'rank', 'name', 'value', 'north', 'south',
+)
+_ENTITIES = ('&amp;', '&lt;', '&gt;', '&quot;', '&#39;', '&nbsp;', '&eacute;', '&#x2014;', '&copy;', '&euro;')
+
+
+def _text(rng: random.Random, words: int = 3) -> str:
+    return ' '.join(rng.choice(_WORDS) for _ in range(words))
+
+
+def _cell(rng: random.Random, col: int) -> str:
+    if col % 4 == 1:
+        return f"<td><a href='/item/{rng.randrange(10**6)}'>{_text(rng, 2)}</a></td>"
+    if col % 4 == 2:
+        return f"<td>{rng.randrange(10**6):,}</td>"
+    return f"<td>{_text(rng)}</td>"
+
+
+def _grid(rng: random.Random, rows: int, cols: int) -> str:
+    header = '<thead><tr>' + ''.join(f"<th>{_text(rng, 1)} {c}</th>" for c in range(cols)) + '</tr></thead>'
+    body = ''.join('<tr>' + ''.join(_cell(rng, c) for c in range(cols)) + '</tr>\n' for _ in range(rows))
+    return f"<table class='data'>{header}<tbody>{body}</tbody></table>"
+
+
+def generate_wide(rng: random.Random, scale: float) -> str:
+    return _grid(rng, 20, max(1, int(400 * scale)))
+
+
+def generate_tall(rng: random.Random, scale: float) -> str:
+    return _grid(rng, max(1, int(2000 * scale)), 6)
+
+
+def generate_spans(rng: random.Random, scale: float) -> str:
+    # Cells spanning up to 4 rows and columns, some beyond the table edges
+    rows = []
+    for _ in range(max(1, int(600 * scale))):
+        cells = []
+        for _ in range(rng.randint(2, 6)):
+            rowspan = rng.choice((1, 1, 1, 2, 3, 4))
+            colspan = rng.choice((1, 1, 1, 2, 3, 4))
+            cells.append(f"<td rowspan='{rowspan}' colspan='{colspan}'>{_text(rng, 2)}</td>")
+        rows.append('<tr>' + ''.join(cells) + '</tr>\n')
+    return '<table>' + ''.join(rows) + '</table>'
+
+
+def generate_nested(rng: random.Random, scale: float) -> str:
+    # Tables nested in the first cell of each other, with rows on either side
+    depth = max(1, int(200 * scale))
+    head = ''.join(
+        f"<table><tr><td>{_text(rng, 2)}</td><td>{_text(rng, 2)}</td></tr><tr><td>"
+        for _ in range(depth)
+    )
+    tail = ''.join(f"</td><td>{_text(rng, 1)}</td></tr></table>" for _ in range(depth))
+    return head + _grid(rng, 5, 3) + tail
+
+
+def generate_entities(rng: random.Random, scale: float) -> str:
+    rows = []
+    for _ in range(max(1, int(1500 * scale))):
+        cells = ''.join(
+            '<td>' + ''.join(f"{rng.choice(_ENTITIES)}{rng.choice(_WORDS)}" for _ in range(6)) + '</td>'
+            for _ in range(4)
+        )
+        rows.append(f"<tr>{cells}</tr>\n")
+    return '<table>' + ''.join(rows) + '</table>'
+
+
+def generate_hidden(rng: random.Random, scale: float) -> str:
+    # Cells full of hidden elements, and hidden tables between displayed ones
+    parts = []
+    for i in range(max(1, int(60 * scale))):
+        rows = ''.join(
+            '<tr>' + ''.join(
+                f"<td>{_text(rng, 1)}<span style='display: none'>{_text(rng, 4)}</span>"
+                f"<div style='color:red;display:none'><b>{_text(rng, 2)}</b></div></td>"
+                for _ in range(5)
+            ) + '</tr>\n'
+            for _ in range(20)
+        )
+        style = " style='display:none'" if i % 2 else ''
+        parts.append(f"<table{style}>{rows}</table>")
+    return '\n'.join(parts)
+
+
+def generate_document(rng: random.Random, scale: float) -> str:
+    # A long page of prose, scripts and lists with a few small tables
+    parts = ['<html><head><script>var data = "<table><tr><td>not a table</td></tr></table>";</script></head><body>']
+    for i in range(max(1, int(3000 * scale))):
+        parts.append(f"<p class='text'>{_text(rng, 40)}</p>")
+        if i % 10 == 0:
+            parts.append('<ul>' + ''.join(f"<li><a href='/{n}'>{_text(rng, 2)}</a></li>" for n in range(8)) + '</ul>')
+        if i % 500 == 0:
+            parts.append(_grid(rng, 10, 4))
+    parts.append('</body></html>')
+    return '\n'.join(parts)
+
+
+CORPORA: dict[str, Callable[[random.Random, float], str]] = {
+    'wide': generate_wide,
+    'tall': generate_tall,
+    'spans': generate_spans,
+    'nested': generate_nested,
+    'entities': generate_entities,
+    'hidden': generate_hidden,
+    'document': generate_document,
+}
+
+
+def _count_cells(tables: list[Table]) -> int:
+    return sum(len(r.cells) for root in tables for t in root.walk_tables() for r in t.rows)
+
+
+def _percentile(times: list[float], percent: float) -> float:
+    # Nearest rank of the sorted times
+    ordered = sorted(times)
+    rank = max(0, math.ceil(percent / 100 * len(ordered)) - 1)
+    return ordered[rank]
+
+
+def _measure(run: Callable[[], Any], repeat: int, num_bytes: int, num_cells: int) -> dict[str, float]:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - start)
+    median = _percentile(times, 50)
+    return {
+        'min': min(times),
+        'p50': median,
+        'p90': _percentile(times, 90),
+        'max': max(times),
+        'mb_per_s': num_bytes / 1e6 / median if median else 0.0,
+        'cells_per_s': num_cells / median if median else 0.0,
+    }
+
+
+def _run_corpus(html_text: str, repeat: int) -> dict[str, Any]:
+    num_bytes = len(html_text.encode('utf-8'))
+    tables = parse_html(html_text)
+    num_cells = _count_cells(tables)
+    operations: dict[str, Callable[[], Any]] = {
+        'parse_html': lambda: parse_html(html_text),
+        'to_csv': lambda: [t.to_csv() for t in tables],
+        'to_html': lambda: [t.to_html() for t in tables],
+        'inner_text': lambda: [t.inner_text() for t in tables],
+    }
+    # Throughput is of the HTML read by parsing and of the text written by
+    # the others, which are each run once here before being timed
+    sizes = {
+        op: num_bytes if op == 'parse_html' else sum(len(s.encode('utf-8')) for s in run())
+        for op, run in operations.items()
+    }
+    return {
+        'bytes': num_bytes,
+        'tables': len(tables),
+        'cells': num_cells,
+        'operations': {
+            op: _measure(run, repeat, sizes[op], num_cells) for op, run in operations.items()
+        },
+    }
+
+
+def run_benchmarks(
+    corpora: list[str] | None = None,
+    scale: float = 1.0,
+    repeat: int = 5,
+    seed: int = 0,
+) -> dict[str, Any]:
+    """
+    Times ``parse_html()``, then ``to_csv()``, ``to_html()`` and
+    ``inner_text()`` of the parsed tables, on each generated corpus.
+    Returns the results as a JSON-compatible dict.
+    """
+    results = {
+        name: _run_corpus(CORPORA[name](random.Random(seed), scale), repeat)
+        for name in corpora or list(CORPORA)
+    }
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'scale': scale,
+        'repeat': repeat,
+        'seed': seed,
+        'results': results,
+    }
+
+
+def _print_report(report: dict[str, Any], baseline: dict[str, Any] | None) -> None:
+    columns = f"{'corpus':<10} {'operation':<11} {'p50 ms':>9} {'p90 ms':>9} {'MB/s':>8} {'cells/s':>11}"
+    print(columns + ('  vs baseline' if baseline else ''))
+    for name, result in report['results'].items():
+        for op, m in result['operations'].items():
+            line = (
+                f"{name:<10} {op:<11} {m['p50'] * 1000:>9.2f} {m['p90'] * 1000:>9.2f}"
+                f" {m['mb_per_s']:>8.2f} {m['cells_per_s']:>11.0f}"
+            )
+            previous = (baseline or {}).get('results', {}).get(name, {}).get('operations', {}).get(op)
+            if previous and previous['p50']:
+                line += f"  {(m['p50'] / previous['p50'] - 1) * 100:+.1f}%"
+            print(line)
+
+
+def main(argv: list[str] | None = None) -> int:
+    arg_parser = argparse.ArgumentParser(
+        prog='python -m html_table_takeout.bench',
+        description='Benchmarks html-table-takeout on generated documents.',
+    )
+    arg_parser.add_argument(
+        '--corpus', action='append', choices=list(CORPORA), help='corpus to run, repeatable (default: all)',
+    )
+    arg_parser.add_argument('--scale', type=float, default=1.0, help='size of the generated documents (default: 1.0)')
+    arg_parser.add_argument('--repeat', type=int, default=5, help='timed runs of each operation (default: 5)')
+    arg_parser.add_argument('--seed', type=int, default=0, help='seed of the generators (default: 0)')
+    arg_parser.add_argument('--json', metavar='PATH', help="write the results as JSON to PATH, or '-' for stdout")
+    arg_parser.add_argument('--compare', metavar='PATH', help='JSON results of an earlier run to compare with')
+    args = arg_parser.parse_args(argv)
+    if args.repeat < 1 or args.scale <= 0:
+        arg_parser.error('--repeat and --scale must be positive')
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+
+    report = run_benchmarks(args.corpus, args.scale, args.repeat, args.seed)
+    if args.json == '-':
+        json.dump(report, sys.stdout, indent=2)
+        print()
+        return 0
+    _print_report(report, baseline)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,147 @@
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from typing import Sequence
+
+
+# Largest product of range lengths aligned by SequenceMatcher, which is
+# quadratic when no row is unique
+_MAX_MATCHER_SIZE = 1_000_000
+
+
+@dataclass
+class TableDiff:
+    # Indexes of the rows of the other Table that are not in this Table
+    added: list[int] = field(default_factory=list)
+    # Indexes of the rows of this Table that are not in the other Table
+    removed: list[int] = field(default_factory=list)
+    # (this index, other index) of matched rows whose cells differ
+    changed: list[tuple[int, int]] = field(default_factory=list)
+
+
+def diff_records(
+    old: Sequence[tuple[str, ...]],
+    new: Sequence[tuple[str, ...]],
+    key: Sequence[int] | None = None,
+) -> TableDiff:
+    """
+    Compares two lists of row records of the same width. Rows are matched
+    by the values of the `key` columns, or else by aligning the two lists
+    so that as many equal rows as possible stay matched in order.
+    """
+    if key is not None:
+        return _diff_keyed(old, new, key)
+
+    # Rows are compared as small ints so that equal rows are hashed once
+    numbers: dict[tuple[str, ...], int] = {}
+    a = [numbers.setdefault(r, len(numbers)) for r in old]
+    b = [numbers.setdefault(r, len(numbers)) for r in new]
+
+    # Rows between matched rows are paired in order as changed rows
+    result = TableDiff()
+    prev_i = prev_j = -1
+    for i, j in [*_align(a, b), (len(a), len(b))]:
+        paired = min(i - prev_i, j - prev_j) - 1
+        result.changed.extend(
+            (prev_i + 1 + k, prev_j + 1 + k) for k in range(paired) if a[prev_i + 1 + k] != b[prev_j + 1 + k]
+        )
+        result.removed.extend(range(prev_i + 1 + paired, i))
+        result.added.extend(range(prev_j + 1 + paired, j))
+        prev_i, prev_j = i, j
+    return result
+
+
+def _align(a: list[int], b: list[int]) -> list[tuple[int, int]]:
+    # Returns the (a index, b index) of matched equal rows in order. As in
+    # patience diff, rows found once in both ranges are matched first where
+    # they keep their order, and the ranges between them are aligned in turn.
+    # This is near-linear even when many rows moved.
+    matches: list[tuple[int, int]] = []
+    stack = [(0, len(a), 0, len(b))]
+    while stack:
+        a_lo, a_hi, b_lo, b_hi = stack.pop()
+        while a_lo < a_hi and b_lo < b_hi and a[a_lo] == b[b_lo]:
+            matches.append((a_lo, b_lo))
+            a_lo += 1
+            b_lo += 1
+        while a_lo < a_hi and b_lo < b_hi and a[a_hi - 1] == b[b_hi - 1]:
+            a_hi -= 1
+            b_hi -= 1
+            matches.append((a_hi, b_hi))
+        if a_lo == a_hi or b_lo == b_hi:
+            continue
+
+        anchors = _unique_anchors(a, b, a_lo, a_hi, b_lo, b_hi)
+        if not anchors:
+            # Only repeated rows are left, aligned exhaustively while cheap
+            # enough, or else left unmatched
+            if (a_hi - a_lo) * (b_hi - b_lo) <= _MAX_MATCHER_SIZE:
+                from difflib import SequenceMatcher # pylint: disable=import-outside-toplevel
+                matcher = SequenceMatcher(None, a[a_lo:a_hi], b[b_lo:b_hi], autojunk=False)
+                for i, j, size in matcher.get_matching_blocks():
+                    matches.extend((a_lo + i + k, b_lo + j + k) for k in range(size))
+            continue
+        for i, j in anchors:
+            matches.append((i, j))
+            stack.append((a_lo, i, b_lo, j))
+            a_lo, b_lo = i + 1, j + 1
+        stack.append((a_lo, a_hi, b_lo, b_hi))
+    matches.sort()
+    return matches
+
+
+def _unique_anchors(a: list[int], b: list[int], a_lo: int, a_hi: int, b_lo: int, b_hi: int) -> list[tuple[int, int]]:
+    # Indexes of the rows found once in each range, repeated ones set to -1
+    unique_a: dict[int, int] = {}
+    for i in range(a_lo, a_hi):
+        unique_a[a[i]] = -1 if a[i] in unique_a else i
+    unique_b: dict[int, int] = {}
+    for j in range(b_lo, b_hi):
+        unique_b[b[j]] = -1 if b[j] in unique_b else j
+    pairs = [
+        (i, unique_b[row]) for row, i in unique_a.items()
+        if i >= 0 and unique_b.get(row, -1) >= 0
+    ]
+    pairs.sort()
+
+    # Longest run of pairs in order in both ranges by patience sorting
+    tops: list[int] = []
+    top_pairs: list[int] = []
+    previous: list[int] = []
+    for n, (_, j) in enumerate(pairs):
+        pile = bisect_left(tops, j)
+        previous.append(top_pairs[pile - 1] if pile else -1)
+        if pile == len(tops):
+            tops.append(j)
+            top_pairs.append(n)
+        else:
+            tops[pile] = j
+            top_pairs[pile] = n
+    anchors: list[tuple[int, int]] = []
+    n = top_pairs[-1] if top_pairs else -1
+    while n >= 0:
+        anchors.append(pairs[n])
+        n = previous[n]
+    anchors.reverse()
+    return anchors
+
+
+def _diff_keyed(old: Sequence[tuple[str, ...]], new: Sequence[tuple[str, ...]], key: Sequence[int]) -> TableDiff:
+    # Rows with a repeated key are matched to the rows with that key in the
+    # other list in order
+    old_rows: dict[tuple[str, ...], list[int]] = {}
+    for i, r in enumerate(old):
+        old_rows.setdefault(tuple(r[k] for k in key), []).append(i)
+    for rows in old_rows.values():
+        rows.reverse()
+
+    result = TableDiff()
+    for j, r in enumerate(new):
+        matches = old_rows.get(tuple(r[k] for k in key))
+        if not matches:
+            result.added.append(j)
+            continue
+        i = matches.pop()
+        if old[i] != r:
+            result.changed.append((i, j))
+    result.removed = sorted(i for rows in old_rows.values() for i in rows)
+    return result
@@ -0,0 +1,146 @@
+from bisect import bisect_left
+from dataclasses import dataclass, field
+import threading
+
+from .stats import ParseStats
+from .types import Table
+
+
+class ParseHook:
+    """
+    Receives events while ``parse_html()`` runs, such as to export metrics.
+    Subclass it and override the methods of the events wanted; the others
+    do nothing. Pass hooks to ``parse_html()`` with `hooks`, or register
+    them for all calls with ``register_hook()``.
+
+    Events are called from the parsing thread, so a hook registered for
+    all calls must be safe to call from several threads at once. Errors
+    raised by a hook are not caught.
+    """
+    # Tables taking at least this many seconds from their start tag to
+    # their end tag are reported to on_slow_table(), None to not report
+    slow_table_threshold: float | None = None
+
+    def on_table_start(self, attrs: dict[str, str | None], depth: int) -> None:
+        """
+        Called at the start tag of each table that is built, with its
+        attributes and its depth, 0 for root tables. Root tables that do
+        not match `attrs` or `select` are not built.
+        """
+
+    def on_table_end(self, table: Table, depth: int, discarded_reason: str | None, elapsed: float) -> None:
+        """
+        Called at the end tag of each table that is built, with the seconds
+        since its start tag. `discarded_reason` is None when the table is
+        kept, or else 'empty' when it has no cells or no text, 'match'
+        when its text does not match, 'columns' for a descendant table
+        in a cell outside the column projection, or 'orphan' for a
+        descendant table before any cell of its parent.
+        """
+
+    def on_slow_table(self, table: Table, depth: int, elapsed: float) -> None:
+        """
+        Called after ``on_table_end()`` when the table took at least
+        `slow_table_threshold` seconds.
+        """
+
+    def on_document_end(self, stats: ParseStats) -> None:
+        """
+        Called when ``parse_html()`` is done with the stats of the call.
+        """
+
+
+_hooks: tuple[ParseHook, ...] = ()
+_hooks_lock = threading.Lock()
+
+
+def register_hook(hook: ParseHook) -> None:
+    """
+    Registers the hook to receive the events of all ``parse_html()`` calls.
+    """
+    global _hooks # pylint: disable=global-statement
+    with _hooks_lock:
+        if hook not in _hooks:
+            _hooks = (*_hooks, hook)
+
+
+def unregister_hook(hook: ParseHook) -> None:
+    """
+    Stops the registered hook from receiving events. Does nothing if the
+    hook is not registered.
+    """
+    global _hooks # pylint: disable=global-statement
+    with _hooks_lock:
+        _hooks = tuple(h for h in _hooks if h is not hook)
+
+
+def _active_hooks(hooks: list[ParseHook] | None) -> tuple[ParseHook, ...]:
+    # Registered hooks followed by those of the call
+    return (*_hooks, *hooks) if hooks else _hooks
+
+
+_SIZE_BOUNDS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000, 100000, 1000000)
+_LATENCY_BOUNDS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0)
+
+
+@dataclass
+class Histogram:
+    # Upper bounds of the buckets in increasing order, values above the last
+    # are counted in an extra bucket
+    bounds: tuple[float, ...] = _SIZE_BOUNDS
+    counts: list[int] = field(default_factory=list)
+    count: int = 0
+    total: float = 0.0
+    max: float = 0.0
+
+    def __post_init__(self) -> None:
+        if not self.counts:
+            self.counts = [0] * (len(self.bounds) + 1)
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    def quantile(self, q: float) -> float:
+        """
+        Returns the upper bound of the bucket holding the `q` quantile of
+        the values, between 0 and 1, or the largest value for the last
+        bucket. Returns 0 when no value was observed.
+        """
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if n and seen >= rank:
+                return self.bounds[i] if i < len(self.bounds) else self.max
+        return 0.0
+
+
+class HistogramHook(ParseHook):
+    """
+    Aggregates in-process histograms of the number of rows and cells of the
+    tables kept, the time to parse each table and each document, and counts
+    of the tables discarded by reason.
+    """
+    def __init__(self) -> None:
+        self.table_rows = Histogram(_SIZE_BOUNDS)
+        self.table_cells = Histogram(_SIZE_BOUNDS)
+        self.table_latency = Histogram(_LATENCY_BOUNDS)
+        self.document_latency = Histogram(_LATENCY_BOUNDS)
+        self.discarded: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def on_table_end(self, table: Table, depth: int, discarded_reason: str | None, elapsed: float) -> None:
+        with self._lock:
+            self.table_latency.observe(elapsed)
+            if discarded_reason is not None:
+                self.discarded[discarded_reason] = self.discarded.get(discarded_reason, 0) + 1
+                return
+            self.table_rows.observe(len(table.rows))
+            self.table_cells.observe(sum(len(r.cells) for r in table.rows))
+
+    def on_document_end(self, stats: ParseStats) -> None:
+        with self._lock:
+            self.document_latency.observe(stats.total_time())
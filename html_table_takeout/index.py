@@ -0,0 +1,288 @@
+from dataclasses import dataclass
+from fnmatch import fnmatch
+from hashlib import blake2b
+from html import unescape
+import json
+from mmap import mmap, ACCESS_READ
+import os
+from pathlib import Path, PurePath
+import re
+import sqlite3
+from typing import Any, Iterator
+
+from .parser import _found_match, _found_match_attributes, _normalized_text
+from .scan import TableInfo, parse_table_at, scan_tables
+from .types import Table
+
+
+_RE_TAG = re.compile(r'<[^>]*>')
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    encoding TEXT NOT NULL,
+    error TEXT
+);
+CREATE TABLE IF NOT EXISTS tables (
+    document_id INTEGER NOT NULL REFERENCES documents (id) ON DELETE CASCADE,
+    table_index INTEGER NOT NULL,
+    parent INTEGER,
+    depth INTEGER NOT NULL,
+    attrs TEXT NOT NULL,
+    row_count INTEGER NOT NULL,
+    max_width INTEGER NOT NULL,
+    span_start INTEGER NOT NULL,
+    span_end INTEGER NOT NULL,
+    caption TEXT,
+    preview TEXT NOT NULL,
+    fingerprint TEXT NOT NULL,
+    PRIMARY KEY (document_id, table_index)
+);
+CREATE INDEX IF NOT EXISTS tables_fingerprint ON tables (fingerprint);
+"""
+
+
+def _text_fingerprint(html_text: str) -> str:
+    # Tables with the same text, whatever their markup, get the same fingerprint
+    text = _normalized_text(unescape(_RE_TAG.sub(' ', html_text)))
+    return blake2b(text.encode('utf-8'), digest_size=8).hexdigest()
+
+
+def _glob_match(parts: tuple[str, ...], pattern_parts: tuple[str, ...]) -> bool:
+    # Whether the parts of a relative path match those of a glob pattern as
+    # Path.glob() matches them, with '**' matching any number of directories
+    if not pattern_parts:
+        return not parts
+    if pattern_parts[0] == '**':
+        return any(_glob_match(parts[i:], pattern_parts[1:]) for i in range(len(parts) + 1))
+    return bool(parts) and fnmatch(parts[0], pattern_parts[0]) and _glob_match(parts[1:], pattern_parts[1:])
+
+
+@dataclass
+class IndexedTable:
+    """
+    A table found in the index, parsed on demand with ``TableIndex.parse()``.
+    """
+    path: Path
+    info: TableInfo
+    # Hash of the whitespace-normalized text of the table
+    fingerprint: str
+    encoding: str = 'utf-8'
+    mtime_ns: int = 0
+    size: int = 0
+
+
+class TableIndex:
+    """
+    An on-disk index of the tables in many HTML files, kept in a SQLite
+    sidecar file. Indexing scans each file once with ``scan_tables()``;
+    queries then only read the files and tables that match.
+
+    Use it as a context manager, or call ``close()`` when done.
+    """
+    def __init__(self, index_path: str | Path) -> None:
+        self.index_path = Path(index_path)
+        self.conn = sqlite3.connect(self.index_path)
+        self.conn.execute('PRAGMA foreign_keys = ON')
+        with self.conn:
+            self.conn.executescript(_SCHEMA)
+
+
+    def __enter__(self) -> 'TableIndex':
+        return self
+
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+
+    def close(self) -> None:
+        self.conn.close()
+
+
+    def update(
+        self,
+        root: str | Path,
+        pattern: str = '**/*.html',
+        encoding: str = 'utf-8',
+        displayed_only: bool = True,
+        batch_size: int = 1000,
+    ) -> int:
+        """
+        Indexes the files under `root` matching the glob `pattern`. Files
+        indexed before are only scanned again when their modification time
+        or size changed, and files matching `pattern` that no longer exist
+        are dropped from the index. Files indexed with other patterns are
+        kept. Changes are committed every `batch_size` files.
+
+        Files that cannot be read or decoded are kept in the index with
+        their error and no tables, so they are not retried until they
+        change.
+
+        Returns the number of files scanned.
+        """
+        root = Path(root).resolve()
+        prefix = os.path.join(root, '')
+        known = {
+            path: (document_id, mtime_ns, size)
+            for document_id, path, mtime_ns, size in self.conn.execute(
+                'SELECT id, path, mtime_ns, size FROM documents WHERE substr(path, 1, ?) = ?',
+                (len(prefix), prefix),
+            )
+        }
+        scanned = 0
+        try:
+            for file_path in root.glob(pattern):
+                if not file_path.is_file():
+                    continue
+                stat = file_path.stat()
+                path = str(file_path)
+                previous = known.pop(path, None)
+                if previous is not None and previous[1:] == (stat.st_mtime_ns, stat.st_size):
+                    continue
+                if previous is not None:
+                    self.conn.execute('DELETE FROM documents WHERE id = ?', (previous[0],))
+                self._index_file(file_path, stat, encoding, displayed_only)
+                scanned += 1
+                if scanned % batch_size == 0:
+                    self.conn.commit()
+            pattern_parts = PurePath(pattern).parts
+            self.conn.executemany(
+                'DELETE FROM documents WHERE id = ?',
+                [
+                    (document_id,)
+                    for path, (document_id, _mtime_ns, _size) in known.items()
+                    if _glob_match(PurePath(path).relative_to(root).parts, pattern_parts)
+                    and not os.path.isfile(path)
+                ],
+            )
+        finally:
+            self.conn.commit()
+        return scanned
+
+
+    def _index_file(self, file_path: Path, stat: os.stat_result, encoding: str, displayed_only: bool) -> None:
+        html_bytes = b''
+        infos: list[TableInfo] = []
+        error = None
+        try:
+            html_bytes = file_path.read_bytes()
+            infos = scan_tables(
+                html_bytes.decode(encoding), encoding=encoding, displayed_only=displayed_only, spans='byte',
+            )
+        except (OSError, UnicodeError) as e:
+            error = repr(e)
+        cursor = self.conn.execute(
+            'INSERT INTO documents (path, mtime_ns, size, encoding, error) VALUES (?, ?, ?, ?, ?)',
+            (str(file_path), stat.st_mtime_ns, stat.st_size, encoding, error),
+        )
+        self.conn.executemany(
+            'INSERT INTO tables VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+            (
+                (
+                    cursor.lastrowid, info.index, info.parent, info.depth, json.dumps(info.attrs),
+                    info.row_count, info.max_width, info.span[0], info.span[1], info.caption,
+                    json.dumps(info.preview),
+                    _text_fingerprint(html_bytes[info.span[0]:info.span[1]].decode(encoding)),
+                )
+                for info in infos
+            ),
+        )
+
+
+    def query(
+        self,
+        *,
+        match: str | re.Pattern | None = None,
+        attrs: dict[str, str | None] | None = None,
+        min_rows: int = 0,
+        min_width: int = 0,
+        depth: int | None = None,
+        fingerprint: str | None = None,
+    ) -> Iterator[IndexedTable]:
+        """
+        Yields the indexed tables meeting all of the criteria, in order of
+        file and position.
+
+        Parameters
+        ----------
+        match : str or compiled regular expression, optional
+            Tables with caption or preview text containing this string or
+            regex will be yielded.
+
+        attrs : dict, optional
+            Tables with these attributes will be yielded, as in
+            ``parse_html()``.
+
+        min_rows : int, default 0
+            Tables with fewer rows will be skipped.
+
+        min_width : int, default 0
+            Tables with fewer cells in their widest row will be skipped.
+
+        depth : int, optional
+            Only tables nested this deep will be yielded, 0 for root tables.
+
+        fingerprint : str, optional
+            Only tables with this text fingerprint will be yielded.
+        """
+        sql = (
+            'SELECT path, mtime_ns, size, encoding, table_index, parent, depth, attrs, row_count, max_width,'
+            ' span_start, span_end, caption, preview, fingerprint'
+            ' FROM tables JOIN documents ON documents.id = tables.document_id'
+            ' WHERE row_count >= ? AND max_width >= ?'
+        )
+        params: list[Any] = [min_rows, min_width]
+        if depth is not None:
+            sql += ' AND depth = ?'
+            params.append(depth)
+        if fingerprint is not None:
+            sql += ' AND fingerprint = ?'
+            params.append(fingerprint)
+        sql += ' ORDER BY documents.path, table_index'
+        for row in self.conn.execute(sql, params):
+            info = TableInfo(
+                index=row[4],
+                parent=row[5],
+                depth=row[6],
+                attrs=json.loads(row[7]),
+                row_count=row[8],
+                max_width=row[9],
+                span=(row[10], row[11]),
+                caption=row[12],
+                preview=json.loads(row[13]),
+            )
+            if not _found_match_attributes(info.attrs, attrs):
+                continue
+            if match and not _found_match(' '.join([info.caption or '', *info.preview]), match):
+                continue
+            yield IndexedTable(
+                path=Path(row[0]),
+                info=info,
+                fingerprint=row[14],
+                encoding=row[3],
+                mtime_ns=row[1],
+                size=row[2],
+            )
+
+
+    def parse(self, entry: IndexedTable, **options: Any) -> Table | None:
+        """
+        Parses the table of the entry from its memory-mapped file. Options
+        are passed to ``parse_table_at()``.
+
+        Raises ``IOError`` when the file cannot be read and ``ValueError``
+        when it changed since it was indexed.
+        """
+        try:
+            with entry.path.open('rb') as file:
+                stat = os.fstat(file.fileno())
+                if (stat.st_mtime_ns, stat.st_size) != (entry.mtime_ns, entry.size):
+                    raise ValueError(f"File changed since it was indexed, update the index: {entry.path}")
+                with mmap(file.fileno(), 0, access=ACCESS_READ) as source:
+                    return parse_table_at(source, entry.info, encoding=entry.encoding, **options)
+        except OSError as e:
+            raise IOError(f"Failed to read file. Error:{repr(e)}") from None
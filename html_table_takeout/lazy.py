@@ -0,0 +1,146 @@
+from dataclasses import replace
+from functools import lru_cache, partial
+import re
+from typing import Callable
+
+from .parser import _ParseOptions, _SourceOffsets, _found_match, _parse_html_text, _whitespace_stripped
+from .scan import TableInfo, _TableScanner, _shift_spans
+from .types import Table, TRow
+
+
+class LazyTable(Table):
+    """
+    A Table returned by ``parse_html(lazy=True)``. Its `rows` are parsed
+    from its range of the source when first used, so only the tables that
+    are looked at are built. What the scan found out without parsing, such
+    as attributes and shape, is in `info`.
+    """
+    def __init__( # pylint: disable=super-init-not-called
+        self,
+        id: int, # pylint: disable=redefined-builtin
+        info: TableInfo,
+        load: Callable[[], list[TRow]],
+        span: tuple[int, int] | None = None,
+    ) -> None:
+        # The dataclass __init__ is not called as rows are loaded later
+        self.id = id
+        self.span = span
+        self.info = info
+        self._load: Callable[[], list[TRow]] | None = load
+        self._rows: list[TRow] | None = None
+
+    @property # type: ignore[override]
+    def rows(self) -> list[TRow]:
+        if self._rows is None:
+            assert self._load is not None
+            self._rows = self._load()
+            self._load = None
+        return self._rows
+
+    @rows.setter
+    def rows(self, rows: list[TRow]) -> None:
+        self._rows = rows
+        self._load = None
+
+    def __eq__(self, other: object) -> bool:
+        # Equal to an eagerly parsed Table with the same content
+        if not isinstance(other, Table):
+            return NotImplemented
+        return (self.id, self.rows) == (other.id, other.rows)
+
+    def is_loaded(self) -> bool:
+        """
+        Whether the rows were parsed.
+        """
+        return self._rows is not None
+
+
+def _parse_range(
+    html_text: str,
+    info: TableInfo,
+    table_id: int,
+    span_start: int | None,
+    options: _ParseOptions,
+) -> Table | None:
+    # Parses a root table on its own, then gives it and its descendants the
+    # ids and spans they have when the whole source is parsed. The options
+    # must not filter by match or attrs, as those are checked on the table
+    # within the whole source.
+    start, end = info.span
+    tables = _parse_html_text(html_text[start:end], options)
+    if not tables:
+        return None
+    table = tables[0]
+    id_offset = table_id - table.id
+    for t in table.walk_tables():
+        t.id += id_offset
+    if span_start is not None:
+        _shift_spans(table, span_start)
+    return table
+
+
+def _parse_root(
+    parse_range: Callable[[], Table | None],
+    parse_document: Callable[[], list[Table]],
+    table_id: int,
+) -> Table | None:
+    table = parse_range()
+    if table is None:
+        # The scan found a range that the parser does not see as the table,
+        # so it is taken from the whole source parsed as in eager mode
+        table = next((t for t in parse_document() if t.id == table_id), None)
+    return table
+
+
+def _load_rows(parse: Callable[[], Table | None]) -> list[TRow]:
+    table = parse()
+    return table.rows if table is not None else []
+
+
+def _scan_root_tables(html_text: str, options: _ParseOptions) -> list[tuple[TableInfo, int, bool]]:
+    # Returns the info, id and whether there is text in its own cells for
+    # each root table the parser gives an id
+    scanner = _TableScanner(_SourceOffsets(html_text), options.displayed_only, options.attrs)
+    scanner.scan()
+    infos = scanner.infos
+
+    # Ids are assigned as tables with cells end, as in the parser, where
+    # descendant tables are flattened in text mode unless ignored
+    descendant_ids = options.nested == 'ref' and options.mode != 'text'
+    ids: dict[int, int] = {}
+    for index in scanner.ended:
+        info = infos[index]
+        if info.max_width and (info.depth == 0 or descendant_ids):
+            ids[index] = len(ids)
+    return [
+        (infos[index], table_id, scanner.has_text[index])
+        for index, table_id in ids.items()
+        if not infos[index].depth
+    ]
+
+
+def _is_returned(table: Table | None, match: str | re.Pattern | None) -> bool:
+    # Whether the parser returns the root table, as checked on its text
+    inner_text = table.inner_text() if table is not None else ''
+    return bool(_whitespace_stripped(inner_text)) and _found_match(inner_text, match)
+
+
+def _parse_html_lazy(html_text: str, options: _ParseOptions) -> list[Table]:
+    spans = options.spans
+    byte_offsets = _SourceOffsets(html_text, options.encoding) if spans == 'byte' else None
+    # Parsed once if needed by any table
+    parse_document = lru_cache(maxsize=None)(partial(_parse_html_text, html_text, replace(options, match=None)))
+    range_options = replace(options, match=None, attrs=None)
+    tables: list[Table] = []
+    for info, table_id, has_text in _scan_root_tables(html_text, options):
+        span = info.span
+        if byte_offsets is not None:
+            span = (byte_offsets.offset(span[0]), byte_offsets.offset(span[1]))
+        parse_range = partial(_parse_range, html_text, info, table_id, span[0] if spans else None, range_options)
+        parse = partial(_parse_root, parse_range, parse_document, table_id)
+        # Only parsing tells the text to match, or whether a table with text
+        # in descendant tables only has any once they are rendered
+        if (options.match or not has_text) and not _is_returned(parse(), options.match):
+            continue
+        tables.append(LazyTable(table_id, info, partial(_load_rows, parse), span if spans else None))
+    return tables
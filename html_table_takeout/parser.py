@@ -1,12 +1,16 @@
 from dataclasses import dataclass, field
+from html import unescape
 from html.parser import HTMLParser
 import re
-from typing import Literal
+import time
+from typing import Callable, Literal
 from pathlib import Path
 from urllib.parse import urlparse
-from urllib.request import Request, urlopen
 
-from .types import Table, TRow, TCell, TLink, TRef, TText
+from .hooks import ParseHook, _active_hooks
+from .selector import Selector, compile_selector, _ElementStack
+from .stats import ParseStats
+from .types import Table, TRow, TCell, TTextCell, TLink, TRef, TText, _RE_WHITESPACE
 
 
 def _found_match(s: str, match: str | re.Pattern | None) -> bool:
@@ -21,6 +25,10 @@ def _whitespace_stripped(s: str) -> str:
     return ''.join(s.split())
 
 
+def _normalized_text(s: str) -> str:
+    return ' '.join(s.split())
+
+
 def _parse_span(s: str) -> int:
     # take integer portion only if decimal
     digits = ''.join(c for c in s.split('.')[0] if c.isdigit())
@@ -62,22 +70,220 @@ def _is_http_url(url: str) -> bool:
     return url_parts.scheme in ('http', 'https')
 
 
-def _request_http(url: str, encoding: str, request_headers: dict[str, str] | None = None) -> str:
+def _request_http(
+    url: str,
+    encoding: str,
+    request_headers: dict[str, str] | None = None,
+    stats: ParseStats | None = None,
+) -> str:
+    # Imported on first use as urllib.request loads http.client, ssl and email
+    from urllib.request import Request, urlopen # pylint: disable=import-outside-toplevel
     try:
+        started = time.perf_counter()
         with urlopen(Request(url=url, headers=request_headers or {})) as resp:
-            return resp.read().decode(encoding)
+            data = resp.read()
+        return _decode(data, encoding, '', started, stats)
     except Exception as e:
         raise IOError(f"Failed to make HTTP request. Error:{repr(e)}") from None
 
 
-def _read_file(file_path: Path, encoding: str) -> str:
+def _read_file(file_path: Path, encoding: str, newline: str | None = None, stats: ParseStats | None = None) -> str:
     try:
-        with file_path.open(mode='r', encoding=encoding) as file:
-            return file.read()
+        started = time.perf_counter()
+        data = file_path.read_bytes()
+        return _decode(data, encoding, newline, started, stats)
     except Exception as e:
         raise IOError(f"Failed to read file. Error:{repr(e)}") from None
 
 
+def _decode(data: bytes, encoding: str, newline: str | None, started: float, stats: ParseStats | None) -> str:
+    # Read and decoded separately so that the two can be timed
+    decode_started = time.perf_counter()
+    text = data.decode(encoding)
+    if newline is None and '\r' in text:
+        # Translate line endings as reading in text mode does
+        text = text.replace('\r\n', '\n').replace('\r', '\n')
+    if stats is not None:
+        stats.read_time += decode_started - started
+        stats.decode_time += time.perf_counter() - decode_started
+        stats.bytes_in += len(data)
+    return text
+
+
+# Text is fed in chunks of about this size when tables may be jumped over
+_FEED_CHUNK_SIZE = 1 << 16
+_RE_SKIP_TAG = re.compile(
+    # Spaces after '</' are only allowed before a bare tag name, as in HTMLParser
+    r'''<[!?]|<(/?)(?:(?<=/)\s+(?=[a-zA-Z][-.a-zA-Z0-9:_]*\s*>))?'''
+    r'''([a-zA-Z][^\t\n\r\f />\x00]*)((?:[^>"']+|"[^"]*"|'[^']*')*)>|</'''
+)
+_RE_COMMENT_END = re.compile(r'--\s*>')
+_RE_DECLARATION_NAME = re.compile(r'[a-zA-Z][-_.a-zA-Z0-9]*\s*')
+_RE_MARKED_SECTION_END = {
+    **dict.fromkeys(('temp', 'cdata', 'ignore', 'include', 'rcdata'), re.compile(r']\s*]\s*>')),
+    # Conditional comments saved by Microsoft Office
+    **dict.fromkeys(('if', 'else', 'endif'), re.compile(r']\s*>')),
+}
+_RE_STYLE_ATTR = re.compile(r'''(?:^|[\s"'])style\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s>]+))''', re.IGNORECASE)
+_RE_RAW_TEXT_END = {
+    'script': re.compile(r'</script', re.IGNORECASE),
+    'style': re.compile(r'</style', re.IGNORECASE),
+}
+# Elements whose content HTMLParser does not tokenize, with those of
+# escapable text on versions that have them
+_RAW_TEXT_TAGS = frozenset((
+    *HTMLParser.CDATA_CONTENT_ELEMENTS,
+    *getattr(HTMLParser, 'RCDATA_CONTENT_ELEMENTS', ()),
+))
+
+
+def _markup_end(html_text: str, start: int) -> int:
+    # Returns where the comment, marked section such as CDATA, processing
+    # instruction, declaration or '</' without a tag name ends, found as
+    # HTMLParser finds it, or -1 if it does not end. Tags inside are not
+    # seen by the parser, which stops at those that do not end.
+    if html_text.startswith('<!--', start):
+        m = _RE_COMMENT_END.search(html_text, start + 4)
+        return m.end() if m else -1
+    if html_text.startswith('<![', start):
+        name = _RE_DECLARATION_NAME.match(html_text, start + 3)
+        section_end = _RE_MARKED_SECTION_END.get(name[0].strip().lower()) if name else None
+        if section_end is None:
+            # The parser raises on unknown marked sections
+            return -1
+        m = section_end.search(html_text, start + 3)
+        return m.end() if m else -1
+    end = html_text.find('>', start + 2)
+    return end + 1 if end >= 0 else -1
+
+
+def _find_table_end(html_text: str, pos: int, depth: int, displayed_only: bool) -> int:
+    # Returns where the end tag closing the current table starts, or -1 if
+    # it cannot be found. Tables are counted as the parser counts them.
+    while True:
+        m = _RE_SKIP_TAG.search(html_text, pos)
+        if m is None:
+            return -1
+        if m[2] is None:
+            pos = _markup_end(html_text, m.start())
+            if pos < 0:
+                return -1
+            continue
+        pos = m.end()
+        tag = m[2].lower()
+        if m[1]:
+            if tag == 'table':
+                if depth == 0:
+                    return m.start()
+                depth -= 1
+        elif tag in _RE_RAW_TEXT_END:
+            end = _RE_RAW_TEXT_END[tag].search(html_text, pos)
+            if end is None:
+                return -1
+            pos = end.start()
+        elif tag == 'table':
+            style = _RE_STYLE_ATTR.search(m[3])
+            hidden = style is not None and _has_style_display_none(
+                {'style': unescape(style[1] or style[2] or style[3] or '')}
+            )
+            if not (displayed_only and hidden):
+                depth += 1
+
+
+def _append_text(cell: TCell, text: str, in_a: bool) -> None:
+    if not cell.elements:
+        cell.elements.append(TText())
+    element = cell.elements[-1]
+    if in_a or type(element) is TText: # pylint: disable=unidiomatic-typecheck
+        element.text += text
+    else:
+        cell.elements.append(TText(text=text))
+
+
+class _SourceOffsets:
+    """
+    Converts parser positions to offsets into the source, counted in
+    characters or in bytes of the encoded source. Positions must mostly
+    come in document order, as both are found by scanning forward.
+    """
+    def __init__(self, source: str, encoding: str | None = None) -> None:
+        self.source = source
+        self.encoding = encoding
+        self.line = 1
+        self.line_start = 0
+        self.char = 0
+        self.byte = 0
+
+    def char_offset(self, line: int, column: int) -> int:
+        while self.line < line:
+            self.line_start = self.source.index('\n', self.line_start) + 1
+            self.line += 1
+        return self.line_start + column
+
+    def offset(self, char: int) -> int:
+        if self.encoding is None:
+            return char
+        if char < self.char:
+            return self.byte - len(self.source[char:self.char].encode(self.encoding))
+        self.byte += len(self.source[self.char:char].encode(self.encoding))
+        self.char = char
+        return self.byte
+
+
+@dataclass
+class _ParseOptions:
+    """
+    Options of ``parse_html()`` that decide how tables are built, checked
+    once when created. Shared by eager and lazy parsing and by
+    `TableReparser`.
+    """
+    match: str | re.Pattern | None = None
+    attrs: dict[str, str | None] | None = None
+    displayed_only: bool = True
+    extract_links: Literal[None, 'thead', 'tbody', 'tfoot', 'all'] = 'all'
+    select: str | Selector | None = None
+    columns: list[int | str] | None = None
+    row_filter: Callable[[TRow], bool] | None = None
+    row_slice: tuple[int, int | None] | None = None
+    max_rows: int | None = None
+    nested: Literal['ref', 'ignore', 'flatten_text'] = 'ref'
+    mode: Literal['elements', 'text'] = 'elements'
+    spans: Literal[None, 'char', 'byte'] = None
+    encoding: str = 'utf-8'
+    lazy: bool = False
+
+    def __post_init__(self) -> None:
+        columns, row_slice = self.columns, self.row_slice
+        if columns is not None and any(isinstance(c, int) and c < 0 for c in columns):
+            raise ValueError(f"Column positions must not be negative: {columns}")
+        if row_slice is not None and (row_slice[0] < 0 or (row_slice[1] is not None and row_slice[1] < 0)):
+            raise ValueError(f"Row positions must not be negative: {row_slice}")
+        if self.max_rows is not None and self.max_rows < 1:
+            raise ValueError(f"max_rows must be at least 1: {self.max_rows}")
+        if self.nested not in ('ref', 'ignore', 'flatten_text'):
+            raise ValueError(f"nested must be 'ref', 'ignore' or 'flatten_text': {self.nested!r}")
+        if self.mode not in ('elements', 'text'):
+            raise ValueError(f"mode must be 'elements' or 'text': {self.mode!r}")
+        if self.spans not in (None, 'char', 'byte'):
+            raise ValueError(f"spans must be None, 'char' or 'byte': {self.spans!r}")
+        if self.lazy and (
+            self.select is not None or columns is not None or self.row_filter is not None
+            or row_slice is not None or self.max_rows is not None
+        ):
+            raise ValueError("lazy cannot be combined with select, columns, row_filter, row_slice or max_rows")
+        if isinstance(self.select, str):
+            # Fail before any resource is read
+            self.select = compile_selector(self.select)
+
+    @property
+    def windowed(self) -> bool:
+        # Whether the rest of a table is passed over once its row window has passed
+        return (self.row_slice is not None and self.row_slice[1] is not None) or self.max_rows is not None
+
+
+_NO_COLUMNS: frozenset[int] = frozenset()
+
+
 @dataclass
 class _Context:
     table: Table = field(default_factory=Table)
@@ -88,46 +294,155 @@ class _Context:
     in_td: bool = False
     in_a: bool = False
     index: int = 0
+    # Cell receiving text, None when outside the column projection
+    cell: TCell | None = None
+    # Column positions to keep, None to keep all
+    keep: frozenset[int] | None = None
+    # Column positions to keep in the current row, empty for rows before the row window
+    row_keep: frozenset[int] | None = None
+    # Whether header names in the projection are resolved from the next row
+    resolve_keep: bool = False
+    # Whether any cell was found, including those outside the projection
+    has_cells: bool = False
+    # Ended rows and those of them kept, counted for root tables only
+    row_count: int = 0
+    kept_count: int = 0
+    # Text of the current cell in text mode, joined when the cell ends
+    text_parts: list[str] | None = None
+    # Source offsets where the table and the current cell start, when recorded
+    start: int = -1
+    cell_start: int | None = None
+    # When the table started, taken only for hooks
+    started: float = 0.0
     remainder: list[tuple[int, TCell, int]] = field(default_factory=list)
     next_remainder: list[tuple[int, TCell, int]] = field(default_factory=list)
 
 
+@dataclass
+class _FlatTable:
+    # Text of a descendant table flattened without building a Table
+    rows: list[list[str]] = field(default_factory=list)
+    row: list[str] | None = None
+    cell: list[str] | None = None
+    has_cells: bool = False
+
+    def end_cell(self) -> None:
+        if self.cell is not None and self.row is not None:
+            self.row.append(_RE_WHITESPACE.sub(' ', ''.join(self.cell).strip()))
+        self.cell = None
+
+    def end_row(self) -> None:
+        self.end_cell()
+        if self.row is not None:
+            self.rows.append(self.row)
+        self.row = None
+
+    def text(self) -> str:
+        self.end_row()
+        return '\n'.join(' '.join(row) for row in self.rows)
+
+
 class _HtmlTableParser(HTMLParser):
     def __init__(
         self,
-        match: str | re.Pattern | None = None,
-        attrs: dict[str, str | None] | None = None,
-        displayed_only: bool = True,
-        extract_links: Literal[None, 'thead', 'tbody', 'tfoot', 'all'] = 'all',
+        options: _ParseOptions,
+        offsets: _SourceOffsets | None = None,
+        hooks: tuple[ParseHook, ...] = (),
     ) -> None:
         HTMLParser.__init__(self, convert_charrefs=True)
         self.id = 0
-        self.match = match
-        self.attrs = attrs
-        self.displayed_only = displayed_only
-        self.extract_links = extract_links
+        self.match = options.match
+        self.attrs = options.attrs
+        self.displayed_only = options.displayed_only
+        self.extract_links = options.extract_links
+        select = options.select
+        self.select = compile_selector(select) if isinstance(select, str) else select
+        # Open elements are only tracked when needed to evaluate the selector
+        self.elements = _ElementStack()
+        columns = options.columns
+        self.column_indexes = frozenset(c for c in columns if isinstance(c, int)) if columns is not None else None
+        self.column_names = [_normalized_text(c) for c in columns if isinstance(c, str)] if columns else []
+        self.row_filter = options.row_filter
+        self.row_start, self.row_stop = options.row_slice or (0, None)
+        self.max_rows = options.max_rows
+        # Whether the rest of the root table is passed over, and the depth of tables within it
+        self.skipping = False
+        self.skip_depth = 0
+        # Open element whose content is not tokenized, where the parser cannot jump
+        self.raw_text_tag: str | None = None
+        # Where the parser was restarted in the source, as it counts positions from there
+        self.base_line = 1
+        self.base_column = 0
+        self.text_mode = options.mode == 'text'
+        self.cell_type = TTextCell if self.text_mode else TCell
+        # Text cells cannot reference tables, so descendant tables are flattened
+        self.nested = 'flatten_text' if self.text_mode and options.nested == 'ref' else options.nested
+        # Depth of descendant tables that are ignored or flattened, and the flattened ones
+        self.nested_depth = 0
+        self.flat_tables: list[_FlatTable] = []
+        # Source spans of tables and cells are only recorded when given offsets
+        self.offsets = offsets
         self.tables: list[Table] = []
         self.contexts: list[_Context] = []
+        # Counted whether or not they are reported, as this costs next to nothing
+        self.tag_count = 0
+        self.cell_count = 0
+        self.span_count = 0
+        self.link_count = 0
+        self.discarded: dict[str, int] = {}
+        self.filter_time = 0.0
+        # Hooks are only called when there are any
+        self.hooks = hooks
 
 
     def handle_starttag(self, tag: str, attrs):
+        self.tag_count += 1
+        if tag in _RAW_TEXT_TAGS:
+            self.raw_text_tag = tag
         attrs = dict(attrs)
+        if self.select is not None:
+            self.elements.push(tag, attrs)
         if self.displayed_only and _has_style_display_none(attrs):
             return
+        if self.skipping:
+            if tag == 'table':
+                self.skip_depth += 1
+            return
+        if self.nested_depth or (tag == 'table' and self.contexts and self.nested != 'ref'):
+            self._handle_nested_start(tag)
+            return
 
         ctx = self.contexts[-1] if self.contexts else None
         if tag == 'table' and (
             ctx # always pass child tables
-            or _found_match_attributes(attrs, self.attrs)
+            or (
+                _found_match_attributes(attrs, self.attrs)
+                and (self.select is None or self.select.matches(self.elements.elements))
+            )
         ):
-            self.contexts.append(_Context())
+            if ctx is None and self.column_indexes is not None:
+                # Project root tables only, child tables are kept whole
+                self.contexts.append(_Context(
+                    keep=None if self.column_names else self.column_indexes,
+                    resolve_keep=bool(self.column_names),
+                ))
+            else:
+                self.contexts.append(_Context())
+            if self.offsets is not None:
+                self.contexts[-1].start = self._offset()
+            if self.hooks:
+                self._start_table_hooks(attrs)
+        elif tag == 'table' and ctx is None:
+            self._discard('attrs' if not _found_match_attributes(attrs, self.attrs) else 'select')
         if ctx is None:
             return
 
         if tag in ('thead', 'tbody', 'tfoot'):
             # Handle implicit end of previous row
             if ctx.in_tr:
-                self.handle_endtag('tr')
+                self._handle_end('tr')
+                if self.skipping and self.raw_text_tag is None:
+                    return
 
             # rowspan must not cross row groups
             ctx.remainder = []
@@ -142,55 +457,95 @@ class _HtmlTableParser(HTMLParser):
         elif tag == 'tr':
             # Handle implicit end of previous row
             if ctx.in_tr:
-                self.handle_endtag('tr')
+                self._handle_end('tr')
+                if self.skipping and self.raw_text_tag is None:
+                    return
 
             ctx.table.rows.append(TRow(group='thead' if ctx.in_thead else 'tfoot' if ctx.in_tfoot else 'tbody'))
             ctx.index = 0
             ctx.next_remainder = []
+            if ctx.row_count < self.row_start and len(self.contexts) == 1 and not ctx.resolve_keep:
+                # Rows before the window only build cells spanning into later rows
+                ctx.row_keep = _NO_COLUMNS
+            else:
+                ctx.row_keep = ctx.keep
 
             ctx.in_tr = True
             ctx.in_td = False
             ctx.in_a = False
 
         elif tag in ('td', 'th') and ctx.in_tr:
+            self._end_cell(ctx)
             row = ctx.table.rows[-1]
 
+            keep = ctx.row_keep
+
             # Append cells from previous rows with rowspan > 1 that come before this <td>
             while ctx.remainder and ctx.remainder[0][0] <= ctx.index:
                 prev_i, prev_cell, prev_rowspan = ctx.remainder.pop(0)
-                row.cells.append(prev_cell)
+                if keep is None or ctx.index in keep:
+                    row.cells.append(prev_cell)
                 if prev_rowspan > 1:
                     ctx.next_remainder.append((prev_i, prev_cell, prev_rowspan - 1))
                 ctx.index += 1
+                self.span_count += 1
 
-            # Append the cell from this <td>, colspan times
-            cell = TCell(header=tag == 'th')
             # Limits for rowspan and colspan are from spec.
             # According to spec, rowspan may be zero meaning the cell spans remaining rows in row group:
             # https://html.spec.whatwg.org/multipage/tables.html#attr-tdth-rowspan
             rowspan = min(max(0, _parse_span(attrs.get('rowspan', ''))), 65534) or 65534
             colspan = min(max(1, _parse_span(attrs.get('colspan', ''))), 1000)
 
-            for _ in range(colspan):
-                row.cells.append(cell)
-                if rowspan > 1:
-                    ctx.next_remainder.append((ctx.index, cell, rowspan - 1))
-                ctx.index += 1
+            # Append the cell from this <td>, colspan times
+            self.span_count += colspan - 1
+            if keep is None:
+                cell = self.cell_type(header=tag == 'th')
+                for _ in range(colspan):
+                    row.cells.append(cell)
+                    if rowspan > 1:
+                        ctx.next_remainder.append((ctx.index, cell, rowspan - 1))
+                    ctx.index += 1
+                ctx.cell = cell
+            elif rowspan > 1 or not keep.isdisjoint(range(ctx.index, ctx.index + colspan)):
+                # Cells spanning rows are built as they may shift into a kept column
+                cell = self.cell_type(header=tag == 'th')
+                for _ in range(colspan):
+                    if ctx.index in keep:
+                        row.cells.append(cell)
+                    if rowspan > 1:
+                        ctx.next_remainder.append((ctx.index, cell, rowspan - 1))
+                    ctx.index += 1
+                ctx.cell = cell
+            else:
+                # Columns outside the projection advance the index but build no cell
+                ctx.index += colspan
+                ctx.cell = None
+            if ctx.cell is not None:
+                self.cell_count += 1
+            if self.text_mode and ctx.cell is not None:
+                ctx.text_parts = []
+            if self.offsets is not None and ctx.cell is not None:
+                ctx.cell_start = self._offset()
+            ctx.has_cells = True
 
             ctx.in_td = True
             ctx.in_a = False
 
-        elif tag == 'a' and ctx.in_td:
-            cell = ctx.table.rows[-1].cells[-1]
+        elif tag == 'a' and ctx.in_td and ctx.cell is not None and not self.text_mode:
+            cell = ctx.cell
             if _extract_links_allowed(ctx, self.extract_links):
                 cell.elements.append(TLink(href=attrs.get('href', '').strip()))
+                self.link_count += 1
             else:
                 cell.elements.append(TText())
 
             ctx.in_a = True
 
-        elif tag == 'br' and ctx.in_td:
-            cell = ctx.table.rows[-1].cells[-1]
+        elif tag == 'br' and ctx.in_td and ctx.text_parts is not None:
+            ctx.text_parts.append('\n')
+
+        elif tag == 'br' and ctx.in_td and ctx.cell is not None:
+            cell = ctx.cell
             if not cell.elements:
                 cell.elements.append(TText())
             element = cell.elements[-1]
@@ -201,6 +556,25 @@ class _HtmlTableParser(HTMLParser):
 
 
     def handle_endtag(self, tag: str):
+        if tag == self.raw_text_tag:
+            self.raw_text_tag = None
+        if self.select is not None:
+            self.elements.pop(tag)
+        self._handle_end(tag)
+
+
+    def _handle_end(self, tag: str):
+        if self.skipping:
+            if tag != 'table':
+                return
+            if self.skip_depth:
+                self.skip_depth -= 1
+                return
+            self.skipping = False
+        if self.nested_depth:
+            self._handle_nested_end(tag)
+            return
+
         ctx = self.contexts[-1] if self.contexts else None
         if ctx is None:
             return
@@ -208,25 +582,59 @@ class _HtmlTableParser(HTMLParser):
         if tag == 'table':
             # Handle implicit end of previous row
             if ctx.in_tr:
-                self.handle_endtag('tr')
+                self._handle_end('tr')
             ctx = self.contexts.pop()
             parent_ctx = self.contexts[-1] if self.contexts else None
-            if ctx.table.max_width() > 0:
+            if self.offsets is not None:
+                ctx.table.span = (ctx.start, self._offset(True))
+            # The row window may have ended along with the last row
+            self.skipping = False
+            reason = None
+            if ctx.has_cells:
                 # Assign table id
                 ctx.table.id = self.id
                 self.id += 1
                 if parent_ctx:
-                    # Descendant table
-                    parent_ctx.table.rows[-1].cells[-1].elements.append(TRef(table=ctx.table))
+                    # Descendant table, dropped with its cell when outside the column projection
+                    if parent_ctx.keep is not None:
+                        cell = parent_ctx.cell
+                    elif parent_ctx.table.rows and parent_ctx.table.rows[-1].cells:
+                        cell = parent_ctx.table.rows[-1].cells[-1]
+                    else:
+                        cell = None
+                    if cell is not None:
+                        cell.elements.append(TRef(table=ctx.table))
+                    elif parent_ctx.keep is not None:
+                        reason = 'columns'
+                    else:
+                        reason = 'orphan'
                 else:
                     # Root table
+                    started = time.perf_counter()
                     inner_text = ctx.table.inner_text()
-                    if _whitespace_stripped(inner_text) and _found_match(inner_text, self.match):
+                    if not _whitespace_stripped(inner_text):
+                        reason = 'empty'
+                    elif not _found_match(inner_text, self.match):
+                        reason = 'match'
+                    else:
                         self.tables.append(ctx.table)
+                    if reason:
+                        self._discard(reason)
+                    self.filter_time += time.perf_counter() - started
+            else:
+                reason = 'empty'
+                if not parent_ctx:
+                    self._discard(reason)
+            if self.hooks:
+                self._end_table_hooks(ctx, reason)
 
         elif ((tag == 'thead' and ctx.in_thead)
             or (tag == 'tbody' and ctx.in_tbody)
             or (tag == 'tfoot' and ctx.in_tfoot)):
+            self._end_cell(ctx)
+            if ctx.in_tr:
+                self._end_row(ctx)
+
             # rowspan must not cross row groups
             ctx.remainder = []
 
@@ -238,15 +646,22 @@ class _HtmlTableParser(HTMLParser):
             ctx.in_a = False
 
         elif tag == 'tr' and ctx.in_tr:
+            self._end_cell(ctx)
             row = ctx.table.rows[-1]
 
             # Append cells from previous rows at the final position
+            keep = ctx.row_keep
             for prev_i, prev_cell, prev_rowspan in ctx.remainder:
-                row.cells.append(prev_cell)
+                if keep is None or ctx.index in keep:
+                    row.cells.append(prev_cell)
                 if prev_rowspan > 1:
                     ctx.next_remainder.append((prev_i, prev_cell, prev_rowspan - 1))
+                ctx.index += 1
+            self.span_count += len(ctx.remainder)
             ctx.remainder = ctx.next_remainder
 
+            self._end_row(ctx)
+
             ctx.in_tr = False
             ctx.in_td = False
             ctx.in_a = False
@@ -259,42 +674,241 @@ class _HtmlTableParser(HTMLParser):
             ctx.in_tr = True # important - do not omit this
             ctx.in_td = False
             ctx.in_a = False
+            self._end_cell(ctx, True)
 
         elif tag == 'a' and ctx.in_a:
             ctx.in_a = False
 
 
+    def feed_windowed(self, html_text: str) -> None:
+        """
+        Feeds the text in chunks ending before a tag, jumping over the rest
+        of a table once its row window has passed.
+        """
+        lines = _SourceOffsets(html_text)
+        pos = 0
+        n = len(html_text)
+        while pos < n:
+            end = html_text.find('<', pos + _FEED_CHUNK_SIZE)
+            end = n if end < 0 else end
+            self.feed(html_text[pos:end])
+            pos = end
+            if self.skipping and self.raw_text_tag is None:
+                # The parser has processed the text up to its position, the
+                # rest of the chunk is held until more text is fed
+                line, column = self._position()
+                start = lines.char_offset(line, column)
+                table_end = _find_table_end(html_text, start, self.skip_depth, self.displayed_only)
+                if table_end >= 0:
+                    # Restart the parser at the end tag of the table
+                    newlines = html_text.count('\n', start, table_end)
+                    if newlines:
+                        column = table_end - html_text.rfind('\n', start, table_end) - 1
+                    else:
+                        column += table_end - start
+                    HTMLParser.reset(self)
+                    self.base_line = line + newlines
+                    self.base_column = column
+                    self.skip_depth = 0
+                    pos = table_end
+
+
+    def _position(self) -> tuple[int, int]:
+        # Line and column in the source of the text processed so far
+        line, column = self.getpos()
+        if line == 1:
+            column += self.base_column
+        return self.base_line + line - 1, column
+
+
+    def _discard(self, reason: str) -> None:
+        # Counts a root table that is not returned
+        self.discarded[reason] = self.discarded.get(reason, 0) + 1
+
+
+    def _start_table_hooks(self, attrs: dict[str, str | None]) -> None:
+        ctx = self.contexts[-1]
+        for hook in self.hooks:
+            hook.on_table_start(attrs, len(self.contexts) - 1)
+        ctx.started = time.perf_counter()
+
+
+    def _end_table_hooks(self, ctx: _Context, reason: str | None) -> None:
+        # Called once the context of the table is removed
+        elapsed = time.perf_counter() - ctx.started
+        depth = len(self.contexts)
+        for hook in self.hooks:
+            hook.on_table_end(ctx.table, depth, reason, elapsed)
+            if hook.slow_table_threshold is not None and elapsed >= hook.slow_table_threshold:
+                hook.on_slow_table(ctx.table, depth, elapsed)
+
+
+    def record_stats(self, stats: ParseStats, elapsed: float) -> None:
+        """
+        Adds the counts of this parser and the time it took to the stats.
+        """
+        stats.feed_time += elapsed - self.filter_time
+        stats.filter_time += self.filter_time
+        stats.tags_seen += self.tag_count
+        stats.tables_built += self.id
+        for reason, count in self.discarded.items():
+            stats.tables_discarded[reason] = stats.tables_discarded.get(reason, 0) + count
+        stats.cells_created += self.cell_count
+        stats.span_expansions += self.span_count
+        stats.links_extracted += self.link_count
+
+
+    def _offset(self, after_tag: bool = False) -> int:
+        # Offset of the current tag, or of the end of it
+        assert self.offsets is not None
+        char = self.offsets.char_offset(*self._position())
+        if after_tag:
+            char = self.offsets.source.find('>', char) + 1 or len(self.offsets.source)
+        return self.offsets.offset(char)
+
+
+    def _end_cell(self, ctx: _Context, end_tag: bool = False) -> None:
+        # Called wherever the current cell may end, which is at the end of its
+        # end tag or else at the start of the tag implying its end
+        if ctx.text_parts is not None:
+            # Text cells are normalized once
+            if isinstance(ctx.cell, TTextCell):
+                ctx.cell.text = _RE_WHITESPACE.sub(' ', ''.join(ctx.text_parts).strip())
+            ctx.text_parts = None
+        if ctx.cell_start is not None:
+            if ctx.cell is not None:
+                ctx.cell.span = (ctx.cell_start, self._offset(end_tag))
+            ctx.cell_start = None
+
+
+    def _end_row(self, ctx: _Context) -> None:
+        row = ctx.table.rows[-1]
+        if ctx.resolve_keep and row.cells:
+            self._resolve_projection(ctx)
+        if len(self.contexts) > 1:
+            return
+        # Rows of root tables are dropped as soon as they are rejected, the
+        # cells they carry into following rows are kept in the remainder
+        i = ctx.row_count
+        ctx.row_count += 1
+        if (
+            i < self.row_start
+            or (self.row_stop is not None and i >= self.row_stop)
+            or (self.row_filter is not None and not self.row_filter(row))
+        ):
+            ctx.table.rows.pop()
+        else:
+            ctx.kept_count += 1
+        if (
+            (self.row_stop is not None and ctx.row_count >= self.row_stop)
+            or (self.max_rows is not None and ctx.kept_count >= self.max_rows)
+        ):
+            # HTMLParser cannot seek, so the rest of the table is tokenized
+            # but passed over without building rows
+            self.skipping = True
+            self.skip_depth = 0
+
+
+    def _resolve_projection(self, ctx: _Context) -> None:
+        # Header names are looked up in the first row with cells, which is then projected
+        row = ctx.table.rows[-1]
+        keep = set(self.column_indexes or ())
+        for i, cell in enumerate(row.cells):
+            if _normalized_text(cell.inner_text()) in self.column_names:
+                keep.add(i)
+        row.cells = [cell for i, cell in enumerate(row.cells) if i in keep]
+        ctx.keep = ctx.row_keep = frozenset(keep)
+        ctx.resolve_keep = False
+
+
+    def _handle_nested_start(self, tag: str) -> None:
+        # Descendant tables are only counted when ignored, and reduced to
+        # their text when flattened
+        if tag == 'table':
+            self.nested_depth += 1
+            if self.nested == 'flatten_text':
+                self.flat_tables.append(_FlatTable())
+            return
+        if self.nested == 'ignore':
+            return
+        flat = self.flat_tables[-1]
+        if tag in ('thead', 'tbody', 'tfoot', 'tr'):
+            flat.end_row()
+            if tag == 'tr':
+                flat.row = []
+        elif tag in ('td', 'th') and flat.row is not None:
+            flat.end_cell()
+            flat.cell = []
+            flat.has_cells = True
+        elif tag == 'br' and flat.cell is not None:
+            flat.cell.append('\n')
+
+
+    def _handle_nested_end(self, tag: str) -> None:
+        if tag == 'table':
+            self.nested_depth -= 1
+            if self.nested == 'ignore':
+                return
+            flat = self.flat_tables.pop()
+            if not flat.has_cells:
+                return
+            text = flat.text()
+            if self.flat_tables:
+                parent = self.flat_tables[-1]
+                if parent.cell is not None:
+                    parent.cell.append(text)
+            else:
+                ctx = self.contexts[-1]
+                if ctx.in_td and ctx.text_parts is not None:
+                    ctx.text_parts.append(text)
+                elif ctx.in_td and ctx.cell is not None:
+                    _append_text(ctx.cell, text, ctx.in_a)
+            return
+        if self.nested == 'ignore':
+            return
+        flat = self.flat_tables[-1]
+        if tag in ('thead', 'tbody', 'tfoot', 'tr'):
+            flat.end_row()
+        elif tag in ('td', 'th'):
+            flat.end_cell()
+
+
     def handle_data(self, data: str):
+        if self.nested_depth:
+            if self.nested == 'flatten_text' and self.flat_tables[-1].cell is not None:
+                self.flat_tables[-1].cell.append(data.replace('\r\n', ' ').replace('\r', ' ').replace('\n', ' '))
+            return
+
         ctx = self.contexts[-1] if self.contexts else None
         if ctx is None:
             return
 
-        if ctx.in_td:
+        if ctx.in_td and ctx.cell is not None:
             text = data.replace('\r\n', ' ').replace('\r', ' ').replace('\n', ' ') # remove line breaks with space
-            cell = ctx.table.rows[-1].cells[-1]
-            if not cell.elements:
-                cell.elements.append(TText())
-            element = cell.elements[-1]
-            if ctx.in_a or type(element) is TText: # pylint: disable=unidiomatic-typecheck
-                element.text += text
+            if ctx.text_parts is not None:
+                ctx.text_parts.append(text)
             else:
-                cell.elements.append(TText(text=text))
+                _append_text(ctx.cell, text, ctx.in_a)
 
 
 def _parse_html_text(
     html_text: str,
-    match: str | re.Pattern | None = None,
-    attrs: dict[str, str | None] | None = None,
-    displayed_only: bool = True,
-    extract_links: Literal[None, 'thead', 'tbody', 'tfoot', 'all'] = None
+    options: _ParseOptions,
+    stats: ParseStats | None = None,
+    hooks: tuple[ParseHook, ...] = (),
 ) -> list[Table]:
-    p = _HtmlTableParser(
-        match,
-        attrs,
-        displayed_only,
-        extract_links
-    )
-    p.feed(html_text)
+    started = time.perf_counter()
+    offsets = None
+    if options.spans:
+        offsets = _SourceOffsets(html_text, options.encoding if options.spans == 'byte' else None)
+    p = _HtmlTableParser(options, offsets, hooks)
+    if options.windowed:
+        p.feed_windowed(html_text)
+    else:
+        p.feed(html_text)
+    if stats is not None:
+        stats.chars_in += len(html_text)
+        p.record_stats(stats, time.perf_counter() - started)
     return p.tables
 
 
@@ -306,7 +920,18 @@ def parse_html(
     encoding: str = 'utf-8',
     displayed_only: bool = True,
     extract_links: Literal[None, 'thead', 'tbody', 'tfoot', 'all'] = 'all',
-    request_headers: dict[str, str] | None = None
+    request_headers: dict[str, str] | None = None,
+    select: str | Selector | None = None,
+    columns: list[int | str] | None = None,
+    row_filter: Callable[[TRow], bool] | None = None,
+    row_slice: tuple[int, int | None] | None = None,
+    max_rows: int | None = None,
+    nested: Literal['ref', 'ignore', 'flatten_text'] = 'ref',
+    mode: Literal['elements', 'text'] = 'elements',
+    spans: Literal[None, 'char', 'byte'] = None,
+    lazy: bool = False,
+    stats: ParseStats | None = None,
+    hooks: list[ParseHook] | None = None
 ) -> list[Table]:
     r"""
     Parse HTML tables into a ``list`` of ``Table`` objects.
@@ -353,6 +978,114 @@ def parse_html(
         Applicable for URL source only. The specified request headers will be
         passed in while making the request.
 
+    select : str or Selector, optional
+        Tables matching this CSS-style selector will be returned, such as
+        ``'div.content > table:nth-of-type(2)'`` or ``'#main table[class~=data]'``.
+        The selector is evaluated against the open elements while the HTML is
+        read, so tables that are not selected are never built. Descendant
+        tables will be included if an ancestor table is a match. Combined with
+        `attrs` and `match`, a table must pass all of them.
+        Defaults to ``None`` where all tables found will be returned.
+
+        Supports type, ``#id``, ``.class`` and attribute selectors, including
+        ``^=``, ``$=``, ``*=`` and ``~=``, ``:nth-of-type()``, the descendant
+        and ``>`` combinators, and comma-separated selector lists.
+
+    columns : list of int or str, optional
+        Only these columns of the returned tables will be built, given as
+        zero-based positions after rowspan and colspan expansion or as header
+        texts. Header texts are looked up in the first row with cells,
+        ignoring surrounding whitespace. Columns keep their order in the
+        table and those not found are left out. Descendant tables inside
+        kept cells are returned whole.
+        Defaults to ``None`` where all columns will be returned.
+
+        Tables without any of the columns are treated as empty and are not
+        returned. Descendant tables in dropped cells are still parsed, so
+        table ids do not depend on the projection.
+
+    row_filter : callable, optional
+        Rows of the returned tables for which ``row_filter(row)`` is false
+        are dropped as soon as the row ends, so they are never held in
+        memory together. The row is a `TRow` with cells expanded from
+        rowspan and colspan, after any `columns` projection. Cells spanning
+        into following rows are still carried into them. Header rows are
+        passed too; check ``row.group`` or ``cell.header`` to keep them.
+        Defaults to ``None`` where all rows will be returned.
+
+        Tables with every row dropped are not returned.
+
+    row_slice : tuple of (int, int or None), optional
+        Only rows of the returned tables from position ``start`` up to but
+        not including ``stop`` will be kept, counting every ``<tr>`` from
+        zero including header rows. A `stop` of ``None`` keeps rows to the
+        end. Rows before the window build only the cells spanning into it.
+        Defaults to ``None`` where all rows will be returned.
+
+    max_rows : int, optional
+        At most this many rows of each returned table will be kept, counted
+        after `row_slice` and `row_filter`.
+        Defaults to ``None`` where all rows will be returned.
+
+        Once `max_rows` or the end of `row_slice` is reached, the rest of the
+        table up to its ``</table>`` is passed over without building rows.
+        `match` then only sees the kept rows, and descendant tables that were
+        passed over are not given ids.
+
+    nested : {{"ref", "ignore", "flatten_text"}}, default "ref"
+        How descendant tables are handled. With ``'ref'``, each becomes a
+        `Table` referenced by a `TRef` in its cell. With ``'ignore'``, their
+        content is skipped entirely. With ``'flatten_text'``, their text is
+        added to the cell as a `TText` without building a `Table`, with
+        cells separated by spaces and rows by newlines. Cells spanning
+        several rows or columns appear once in flattened text.
+
+        Descendant tables that are ignored or flattened are not given ids.
+
+    mode : {{"elements", "text"}}, default "elements"
+        With ``'elements'``, each cell is a `TCell` holding `TText`, `TLink`
+        and `TRef` elements. With ``'text'``, each cell is a `TTextCell`
+        holding only its normalized text, which saves memory and time when
+        only text is needed. Links are not extracted and descendant tables
+        are flattened unless `nested` is ``'ignore'``.
+
+    spans : {{None, "char", "byte"}}, optional
+        Whether to record where each `Table` and cell is in the source as a
+        ``(start, end)`` `span`, so their original HTML can be sliced out
+        later with ``source_html()`` instead of being kept as copies. With
+        ``'char'``, offsets index the source text. With ``'byte'``, offsets
+        index the source encoded with `encoding`, such as the bytes of the
+        file of a Path source, which may then be memory-mapped. Line endings
+        of a Path source are kept as they are when spans are recorded.
+        Defaults to ``None`` where no spans are recorded.
+
+        A cell ends after its end tag, or else where the tag that implies
+        its end starts.
+
+    lazy : bool, default False
+        Whether to return each Table as a `LazyTable` whose rows are only
+        parsed from its range of the source when first used. Tables are
+        found with a quick scan, and ids and the tables returned are the
+        same as when `lazy` is not set. With `match`, or when a table has
+        text only in descendant tables, the table is parsed once to check
+        its text and its rows are then dropped until used. Cannot be
+        combined with `select`, `columns`, `row_filter`, `row_slice` or
+        `max_rows`.
+
+    stats : ParseStats, optional
+        Records the time spent reading, decoding, parsing and filtering,
+        and counts of the tags, tables, cells, spans and links found, adding
+        to what it already holds. With `lazy`, only reading and decoding are
+        recorded, as tables are parsed later.
+        Defaults to ``None`` where nothing is recorded.
+
+    hooks : list of ParseHook, optional
+        Hooks receiving the events of this call, such as when each table
+        starts and ends, after the hooks registered with
+        ``register_hook()``. With `lazy`, only the end of the document is
+        reported.
+        Defaults to ``None`` where only registered hooks are called.
+
     Returns
     -------
     tables
@@ -362,11 +1095,50 @@ def parse_html(
     ------
     IOError
         When failing to retrieve a URL or Path resource.
+
+    ValueError
+        When `select` is not a valid selector, `columns` has a negative
+        position, `row_slice` has a negative position, `max_rows` is
+        less than 1, `nested`, `mode` or `spans` is not one of its options,
+        or `lazy` is combined with an option it does not support.
     """
+    options = _ParseOptions(
+        match=match,
+        attrs=attrs,
+        displayed_only=displayed_only,
+        extract_links=extract_links,
+        select=select,
+        columns=columns,
+        row_filter=row_filter,
+        row_slice=row_slice,
+        max_rows=max_rows,
+        nested=nested,
+        mode=mode,
+        spans=spans,
+        encoding=encoding,
+        lazy=lazy,
+    )
+    active_hooks = _active_hooks(hooks)
+    # Hooks are given the stats of this call alone
+    call_stats = ParseStats() if active_hooks else stats
     if isinstance(html_source, Path):
-        html_text = _read_file(html_source, encoding)
+        html_text = _read_file(html_source, encoding, '' if spans else None, call_stats)
     elif _is_http_url(html_source):
-        html_text = _request_http(html_source, encoding, request_headers)
+        html_text = _request_http(html_source, encoding, request_headers, call_stats)
     else:
         html_text = html_source
-    return _parse_html_text(html_text, match, attrs, displayed_only, extract_links)
+    if lazy:
+        if call_stats is not None:
+            call_stats.chars_in += len(html_text)
+        # Imported here as the lazy parse builds on the scan, which uses this module
+        from .lazy import _parse_html_lazy # pylint: disable=import-outside-toplevel
+        tables = _parse_html_lazy(html_text, options)
+    else:
+        tables = _parse_html_text(html_text, options, call_stats, active_hooks)
+    if active_hooks:
+        assert call_stats is not None
+        for hook in active_hooks:
+            hook.on_document_end(call_stats)
+        if stats is not None:
+            stats.add(call_stats)
+    return tables
@@ -0,0 +1,136 @@
+from dataclasses import dataclass, field, replace
+from functools import lru_cache, partial
+from hashlib import blake2b
+from pathlib import Path
+import re
+from typing import Literal
+
+from .lazy import _is_returned, _parse_range, _parse_root, _scan_root_tables
+from .parser import _ParseOptions, _SourceOffsets, _is_http_url, _parse_html_text, _read_file, _request_http
+from .scan import _shift_spans
+from .types import Table
+
+
+@dataclass
+class ReparseResult:
+    tables: list[Table] = field(default_factory=list)
+    # Ids of the returned tables that were parsed as they are new or changed
+    changed_ids: list[int] = field(default_factory=list)
+    # Ids the previously returned tables had, for those no longer found
+    removed_ids: list[int] = field(default_factory=list)
+
+
+class TableReparser:
+    """
+    Parses new versions of a document, such as a page polled for changes,
+    reusing the Tables of the previous version whose source is unchanged.
+
+    Each root table's range of the source is found with a quick scan and
+    hashed. Tables with the same hash as a previously returned Table are
+    not parsed again; the previous Table object is returned with its ids
+    and spans updated for where it now is. Tables are otherwise returned
+    as ``parse_html()`` returns them with the same options.
+
+    As reused Tables are updated in place, the ids and spans of Tables in
+    earlier results change along with them. Copy the Tables of a result
+    to keep them as they were.
+
+    Options are those of ``parse_html()`` that do not change which rows
+    are built while parsing.
+    """
+    def __init__(
+        self,
+        *,
+        match: str | re.Pattern | None = None,
+        attrs: dict[str, str | None] | None = None,
+        encoding: str = 'utf-8',
+        displayed_only: bool = True,
+        extract_links: Literal[None, 'thead', 'tbody', 'tfoot', 'all'] = 'all',
+        request_headers: dict[str, str] | None = None,
+        nested: Literal['ref', 'ignore', 'flatten_text'] = 'ref',
+        mode: Literal['elements', 'text'] = 'elements',
+        spans: Literal[None, 'char', 'byte'] = None,
+    ) -> None:
+        self.options = _ParseOptions(
+            match=match,
+            attrs=attrs,
+            displayed_only=displayed_only,
+            extract_links=extract_links,
+            nested=nested,
+            mode=mode,
+            spans=spans,
+            encoding=encoding,
+            lazy=True,
+        )
+        self.request_headers = request_headers
+        # Tables returned for the previous version by hash of their source
+        self._previous: dict[bytes, list[Table]] = {}
+        # Hashes of tables that were not returned, so are not parsed again
+        self._rejected: set[bytes] = set()
+
+
+    def parse(self, html_source: str | Path) -> ReparseResult:
+        """
+        Parses the new version of the document.
+
+        Returns the Tables with the ids of those parsed again, and of
+        previous Tables that were not reused.
+
+        Raises ``IOError`` when failing to retrieve a URL or Path resource.
+        """
+        options = self.options
+        if isinstance(html_source, Path):
+            html_text = _read_file(html_source, options.encoding, '' if options.spans else None)
+        elif _is_http_url(html_source):
+            html_text = _request_http(html_source, options.encoding, self.request_headers)
+        else:
+            html_text = html_source
+
+        byte_offsets = _SourceOffsets(html_text, options.encoding) if options.spans == 'byte' else None
+        # Parsed once if needed by any table, as in lazy mode
+        parse_document = lru_cache(maxsize=None)(partial(_parse_html_text, html_text, replace(options, match=None)))
+        range_options = replace(options, match=None, attrs=None)
+        result = ReparseResult()
+        current: dict[bytes, list[Table]] = {}
+        rejected: set[bytes] = set()
+        for info, table_id, has_text in _scan_root_tables(html_text, options):
+            start, end = info.span
+            digest = blake2b(html_text[start:end].encode('utf-8', 'surrogatepass'), digest_size=16).digest()
+            if digest in self._rejected:
+                rejected.add(digest)
+                continue
+            span = info.span
+            if byte_offsets is not None:
+                span = (byte_offsets.offset(start), byte_offsets.offset(end))
+
+            reusable = self._previous.get(digest)
+            if reusable:
+                table = reusable.pop()
+                _move_table(table, table_id, span[0] if options.spans else None)
+            else:
+                parse_range = partial(
+                    _parse_range, html_text, info, table_id, span[0] if options.spans else None, range_options,
+                )
+                parsed = _parse_root(parse_range, parse_document, table_id)
+                if parsed is None or ((options.match or not has_text) and not _is_returned(parsed, options.match)):
+                    rejected.add(digest)
+                    continue
+                table = parsed
+                result.changed_ids.append(table_id)
+            result.tables.append(table)
+            current.setdefault(digest, []).append(table)
+
+        result.removed_ids = sorted(t.id for tables in self._previous.values() for t in tables)
+        self._previous = current
+        self._rejected = rejected
+        return result
+
+
+def _move_table(table: Table, table_id: int, span_start: int | None) -> None:
+    # Gives a reused Table and its descendants the ids and spans of where it now is
+    id_offset = table_id - table.id
+    if id_offset:
+        for t in table.walk_tables():
+            t.id += id_offset
+    if span_start is not None and table.span is not None and span_start != table.span[0]:
+        _shift_spans(table, span_start - table.span[0])
@@ -0,0 +1,385 @@
+from dataclasses import dataclass, field
+from html import unescape
+from mmap import mmap
+from pathlib import Path
+import re
+from typing import Any, Literal
+
+from .parser import (
+    _RE_RAW_TEXT_END, _RE_SKIP_TAG, _SourceOffsets, _found_match_attributes, _has_style_display_none, _is_http_url,
+    _markup_end, _normalized_text, _parse_span, _read_file, _request_http, parse_html,
+)
+from .types import Table
+
+
+# Markup that the parser does not pass on as text
+_RE_DECLARATION = re.compile(r'<[!?][^>]*>')
+_SCANNED_TAGS = frozenset(['table', 'caption', 'thead', 'tbody', 'tfoot', 'tr', 'td', 'th', 'br'])
+_RE_ATTR = re.compile(r'''([^\s/>=]+)(?:\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s>]+)))?''')
+
+# Longest text of a cell kept in a preview
+_PREVIEW_TEXT_LENGTH = 40
+
+
+@dataclass
+class TableInfo:
+    """
+    What a scan found out about a table without building its cells.
+    """
+    # Position of the <table> among all tables in document order
+    index: int
+    # Index of the enclosing table, None for root tables
+    parent: int | None = None
+    depth: int = 0
+    attrs: dict[str, str | None] = field(default_factory=dict)
+    # Number of <tr> in the table, not counting those of descendant tables
+    row_count: int = 0
+    # Greatest number of cells in a row after rowspan and colspan expansion
+    max_width: int = 0
+    # Offsets of the table in the source, from its start tag to its end tag
+    span: tuple[int, int] = (0, 0)
+    caption: str | None = None
+    # Texts of the cells of the first row with cells, shortened
+    preview: list[str] = field(default_factory=list)
+
+
+def _is_blank(data: str) -> bool:
+    text = unescape(_RE_DECLARATION.sub('', data))
+    return not text or text.isspace()
+
+
+def _parse_attrs(s: str) -> dict[str, str | None]:
+    attrs: dict[str, str | None] = {}
+    for m in _RE_ATTR.finditer(s):
+        value = m[2] if m[2] is not None else m[3] if m[3] is not None else m[4]
+        attrs[m[1].lower()] = None if value is None else unescape(value)
+    return attrs
+
+
+@dataclass
+class _ScanContext:
+    info: TableInfo
+    in_tr: bool = False
+    in_td: bool = False
+    # Open row group, only ended by its own end tag as in the parser
+    group: str | None = None
+    # Cells of the current row, counted as the parser expands them
+    width: int = 0
+    # Remaining rowspans of cells carried into the current and next row
+    remainder: list[int] = field(default_factory=list)
+    next_remainder: list[int] = field(default_factory=list)
+    caption: list[str] | None = None
+    preview: list[str] | None = None
+    cell: list[str] | None = None
+
+
+class _TableScanner:
+    """
+    Finds tables with a skeleton pass over the tags of the source, the way
+    the end of a table is found when jumping over it while parsing. Only
+    the text of captions and previewed cells is decoded.
+    """
+    def __init__(
+        self,
+        offsets: _SourceOffsets,
+        displayed_only: bool = True,
+        attrs: dict[str, str | None] | None = None,
+    ) -> None:
+        self.offsets = offsets
+        self.displayed_only = displayed_only
+        # Tables outside any other are only scanned with these attributes, as in the parser
+        self.attrs = attrs
+        self.infos: list[TableInfo] = []
+        self.contexts: list[_ScanContext] = []
+        # Index of each table ended by its end tag, in order of the ends
+        self.ended: list[int] = []
+        # Whether each table has text of its own in its cells
+        self.has_text: list[bool] = []
+
+
+    def scan(self) -> None:
+        html_text = self.offsets.source
+        pos = 0
+        while True:
+            m = _RE_SKIP_TAG.search(html_text, pos)
+            ctx = self.contexts[-1] if self.contexts else None
+            if ctx is not None and (
+                ctx.cell is not None
+                or ctx.caption is not None
+                or (ctx.in_td and not self.has_text[ctx.info.index])
+            ):
+                self._handle_data(ctx, html_text[pos:m.start() if m else len(html_text)])
+            if m is None:
+                break
+            if m[2] is None:
+                pos = _markup_end(html_text, m.start())
+                if pos < 0:
+                    # The parser stops there
+                    break
+                continue
+            pos = m.end()
+            tag = m[2].lower()
+            if m[1]:
+                self._handle_endtag(tag, pos)
+            elif tag in _RE_RAW_TEXT_END:
+                raw_end = _RE_RAW_TEXT_END[tag].search(html_text, pos)
+                if raw_end is None:
+                    break
+                if ctx is not None and ctx.in_td and not _is_blank(html_text[pos:raw_end.start()]):
+                    # The parser passes on raw text such as scripts as text
+                    self.has_text[ctx.info.index] = True
+                pos = raw_end.start()
+            elif tag in _SCANNED_TAGS:
+                self._handle_starttag(tag, _parse_attrs(m[3]) if m[3] else {}, m.start())
+                if m[3].endswith('/'):
+                    # Self-closing tags also end as the parser ends them
+                    self._handle_endtag(tag, pos)
+        # Tables left open end with the source
+        while self.contexts:
+            ctx = self.contexts.pop()
+            if ctx.in_tr:
+                self._end_row(ctx)
+            ctx.info.span = (ctx.info.span[0], self.offsets.offset(len(html_text)))
+
+
+    def _handle_starttag(self, tag: str, attrs: dict[str, str | None], start: int) -> None:
+        if self.displayed_only and _has_style_display_none(attrs):
+            return
+
+        ctx = self.contexts[-1] if self.contexts else None
+        if tag == 'table':
+            if ctx is None and self.attrs is not None and not _found_match_attributes(attrs, self.attrs):
+                return
+            info = TableInfo(
+                index=len(self.infos),
+                parent=ctx.info.index if ctx else None,
+                depth=len(self.contexts),
+                attrs=attrs,
+                span=(self.offsets.offset(start), 0),
+            )
+            self.infos.append(info)
+            self.has_text.append(False)
+            self.contexts.append(_ScanContext(info))
+            return
+        if ctx is None:
+            return
+
+        if tag == 'caption' and ctx.caption is None and not ctx.info.row_count:
+            ctx.caption = []
+
+        elif tag in ('thead', 'tbody', 'tfoot'):
+            if ctx.in_tr:
+                self._end_row(ctx)
+            # rowspan must not cross row groups
+            ctx.remainder = []
+            ctx.group = tag
+            ctx.in_td = False
+
+        elif tag == 'tr':
+            if ctx.in_tr:
+                self._end_row(ctx)
+            ctx.info.row_count += 1
+            ctx.in_tr = True
+            ctx.in_td = False
+            ctx.width = 0
+            ctx.next_remainder = []
+            self._end_caption(ctx)
+
+        elif tag in ('td', 'th') and ctx.in_tr:
+            self._end_cell(ctx)
+            # Same limits as the parser
+            rowspan = min(max(0, _parse_span(attrs.get('rowspan') or '')), 65534) or 65534
+            colspan = min(max(1, _parse_span(attrs.get('colspan') or '')), 1000)
+            ctx.width += colspan
+            if rowspan > 1:
+                ctx.next_remainder.extend([rowspan - 1] * colspan)
+            ctx.in_td = True
+            if not ctx.info.preview:
+                if ctx.preview is None:
+                    ctx.preview = []
+                ctx.cell = []
+
+        elif tag == 'br' and ctx.cell is not None:
+            ctx.cell.append('\n')
+
+
+    def _handle_endtag(self, tag: str, end: int) -> None:
+        ctx = self.contexts[-1] if self.contexts else None
+        if ctx is None:
+            return
+
+        if tag == 'table':
+            if ctx.in_tr:
+                self._end_row(ctx)
+            self.contexts.pop()
+            self.ended.append(ctx.info.index)
+            ctx.info.span = (ctx.info.span[0], self.offsets.offset(end))
+
+        elif tag == 'caption':
+            self._end_caption(ctx)
+
+        elif tag == ctx.group:
+            if ctx.in_tr:
+                self._end_row(ctx)
+            ctx.remainder = []
+            ctx.group = None
+            ctx.in_td = False
+
+        elif tag == 'tr' and ctx.in_tr:
+            self._end_row(ctx)
+
+        elif tag in ('td', 'th'):
+            self._end_cell(ctx)
+            ctx.in_td = False
+
+
+    def _handle_data(self, ctx: _ScanContext, data: str) -> None:
+        if ctx.in_td and not self.has_text[ctx.info.index] and not _is_blank(data):
+            self.has_text[ctx.info.index] = True
+        if ctx.cell is not None:
+            ctx.cell.append(unescape(data))
+        elif ctx.caption is not None:
+            ctx.caption.append(unescape(data))
+
+
+    def _end_caption(self, ctx: _ScanContext) -> None:
+        if ctx.caption is not None:
+            ctx.info.caption = _normalized_text(''.join(ctx.caption))
+        ctx.caption = None
+
+
+    def _end_cell(self, ctx: _ScanContext) -> None:
+        if ctx.cell is not None and ctx.preview is not None:
+            text = _normalized_text(''.join(ctx.cell))
+            ctx.preview.append(text[:_PREVIEW_TEXT_LENGTH])
+        ctx.cell = None
+
+
+    def _end_row(self, ctx: _ScanContext) -> None:
+        self._end_cell(ctx)
+        if ctx.preview is not None:
+            # Only the first row with cells is previewed
+            ctx.info.preview = ctx.preview
+            ctx.preview = None
+        # Cells carried from previous rows all end up in this row
+        ctx.info.max_width = max(ctx.info.max_width, ctx.width + len(ctx.remainder))
+        ctx.remainder = [r - 1 for r in ctx.remainder if r > 1] + ctx.next_remainder
+        ctx.next_remainder = []
+        ctx.in_tr = False
+        ctx.in_td = False
+
+
+def scan_tables(
+    html_source: str | Path,
+    *,
+    encoding: str = 'utf-8',
+    displayed_only: bool = True,
+    request_headers: dict[str, str] | None = None,
+    spans: Literal['char', 'byte'] = 'char',
+) -> list[TableInfo]:
+    r"""
+    Lists the tables of the HTML source, including descendant tables,
+    without building their cells. Use this to decide which tables to parse
+    with ``parse_table_at()``.
+
+    Parameters
+    ----------
+    html_source : str or Path
+        The source as with ``parse_html()``.
+
+    encoding : str, optional
+        Applicable for URL and Path sources where the resource will be
+        interpreted according to this encoding. Defaults to ``'utf-8'``.
+
+    displayed_only : bool, default True
+        Whether elements with "display: none" should be scanned.
+
+    request_headers : dict of str to str, optional
+        Applicable for URL sources where these headers will be sent.
+
+    spans : {{"char", "byte"}}, default "char"
+        Whether the `span` of each table counts characters of the source
+        text or bytes of the source encoded with `encoding`. Byte spans
+        let a Path source be memory-mapped and passed to
+        ``parse_table_at()``.
+
+    Returns
+    -------
+    infos
+        A list of ``TableInfo`` in the order the tables start. Tables are
+        counted as ``parse_html()`` counts them, so ``row_count`` and
+        ``max_width`` match the parsed Table when none of its rows are
+        filtered.
+
+    Raises
+    ------
+    IOError
+        When failing to retrieve a URL or Path resource.
+
+    ValueError
+        When `spans` is not one of its options.
+    """
+    if spans not in ('char', 'byte'):
+        raise ValueError(f"spans must be 'char' or 'byte': {spans!r}")
+    if isinstance(html_source, Path):
+        html_text = _read_file(html_source, encoding, '')
+    elif _is_http_url(html_source):
+        html_text = _request_http(html_source, encoding, request_headers)
+    else:
+        html_text = html_source
+    scanner = _TableScanner(_SourceOffsets(html_text, encoding if spans == 'byte' else None), displayed_only)
+    scanner.scan()
+    return scanner.infos
+
+
+def parse_table_at(
+    source: str | bytes | mmap,
+    info: TableInfo,
+    *,
+    encoding: str = 'utf-8',
+    spans: bool = False,
+    **options: Any,
+) -> Table | None:
+    """
+    Parses only the table found by ``scan_tables()`` at `info`, slicing it
+    from the source by its span.
+
+    Pass the source text for spans counted in characters, or the encoded
+    bytes, such as a memory-mapped file, for spans counted in bytes. The
+    bytes are decoded with `encoding`. When `spans` is set, spans of the
+    Table and its cells are recorded as offsets into the source in the same
+    unit. Other `options` are passed to ``parse_html()``.
+
+    Returns the Table, or ``None`` when it has no cells or is filtered out
+    by the options. Ids are counted from 0 within the Table.
+    """
+    start, end = info.span
+    html_slice = source[start:end]
+    if isinstance(html_slice, bytes):
+        html_text = html_slice.decode(encoding)
+    else:
+        html_text = html_slice
+    tables = parse_html(
+        html_text,
+        encoding=encoding,
+        spans=('byte' if isinstance(html_slice, bytes) else 'char') if spans else None,
+        **options,
+    )
+    if not tables:
+        return None
+    if spans:
+        _shift_spans(tables[0], start)
+    return tables[0]
+
+
+def _shift_spans(table: Table, offset: int) -> None:
+    # Cells repeated by rowspan and colspan are shifted once
+    seen: set[int] = set()
+    for t in table.walk_tables():
+        if t.span is not None:
+            t.span = (t.span[0] + offset, t.span[1] + offset)
+        for row in t.rows:
+            for cell in row.cells:
+                if cell.span is not None and id(cell) not in seen:
+                    seen.add(id(cell))
+                    cell.span = (cell.span[0] + offset, cell.span[1] + offset)
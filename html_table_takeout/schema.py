@@ -0,0 +1,194 @@
+from dataclasses import dataclass, field
+import re
+from typing import TYPE_CHECKING, Any, Callable, Iterator, Literal, Sequence
+
+if TYPE_CHECKING:
+    from datetime import date
+    from decimal import Decimal
+
+
+ColumnType = Literal['int', 'float', 'decimal', 'date', 'str']
+
+
+# Whitespace, including non-breaking and thin spaces, is removed before matching
+_RE_SPACE = re.compile(r'\s+')
+_RE_NUMBER = re.compile(
+    r'(?P<open>\()?(?P<sign>[-+−])?[$€£¥]?(?P<sign2>[-+−])?'
+    r'(?P<int>\d{1,3}(?:,\d{3})+|\d*)(?:\.(?P<frac>\d*))?'
+    r'(?P<pct>%)?(?P<close>\))?'
+)
+_RE_ISO_DATE = re.compile(r'\d{4}-\d{2}-\d{2}')
+_NULL_TEXTS = frozenset(['', '-', '–', '—', '−', '..', '...', 'n/a', 'na', 'nan', 'null', 'none'])
+_DATE_FORMATS = (
+    'iso',
+    '%Y/%m/%d',
+    '%d %B %Y',
+    '%d %b %Y',
+    '%B %d, %Y',
+    '%b %d, %Y',
+    '%b. %d, %Y',
+)
+
+
+@dataclass
+class TypedColumn:
+    type: ColumnType = 'str'
+    values: list[Any] = field(default_factory=list)
+    errors: list[tuple[int, str]] = field(default_factory=list)
+
+
+def is_null_text(text: str) -> bool:
+    """
+    Whether the text stands for a missing value, such as '', '—' or "N/A".
+    """
+    return text.strip().lower() in _NULL_TEXTS
+
+
+def _parse_number(text: str) -> tuple[str, bool] | None:
+    # Returns the number as a plain decimal string and whether it is a percentage
+    m = _RE_NUMBER.fullmatch(_RE_SPACE.sub('', text))
+    if m is None or bool(m['open']) != bool(m['close']) or (m['sign'] and m['sign2']):
+        return None
+    digits = m['int'].replace(',', '')
+    frac = m['frac']
+    if not digits and not frac:
+        return None
+    negative = bool(m['open']) != ((m['sign'] or m['sign2']) in ('-', '−'))
+    number = ('-' if negative else '') + (digits or '0') + (f".{frac}" if frac else '')
+    return number, bool(m['pct'])
+
+
+def _to_int(text: str) -> int:
+    parsed = _parse_number(text)
+    if parsed is None or parsed[1] or '.' in parsed[0]:
+        raise ValueError(text)
+    return int(parsed[0])
+
+
+def _to_float(text: str) -> float:
+    parsed = _parse_number(text)
+    if parsed is None:
+        raise ValueError(text)
+    number, percent = parsed
+    return float(number) / 100 if percent else float(number)
+
+
+def _to_decimal(text: str) -> 'Decimal':
+    # Imported on first use as most columns are not decimal
+    from decimal import Decimal, InvalidOperation # pylint: disable=import-outside-toplevel,redefined-outer-name
+    parsed = _parse_number(text)
+    if parsed is None:
+        raise ValueError(text)
+    number, percent = parsed
+    try:
+        value = Decimal(number)
+    except InvalidOperation:
+        raise ValueError(text) from None
+    return value.scaleb(-2) if percent else value
+
+
+def _date_converter(date_format: str) -> Callable[[str], 'date']:
+    from datetime import date, datetime # pylint: disable=import-outside-toplevel,redefined-outer-name
+    if date_format == 'iso':
+        def to_iso_date(text: str) -> date:
+            text = text.strip()
+            if not _RE_ISO_DATE.fullmatch(text):
+                raise ValueError(text)
+            return date.fromisoformat(text)
+        return to_iso_date
+
+    def to_date(text: str) -> date:
+        return datetime.strptime(_RE_SPACE.sub(' ', text.strip()), date_format).date()
+    return to_date
+
+
+_CONVERTERS: dict[str, Callable[[str], Any]] = {
+    'int': _to_int,
+    'float': _to_float,
+    'decimal': _to_decimal,
+    'str': str,
+}
+_FAILED = object()
+
+
+def _sample(texts: Sequence[str], sample_size: int) -> list[str]:
+    # Spread the sample evenly so sorted columns are represented, then dedupe
+    non_null = [t for t in texts if not is_null_text(t)]
+    sample_size = max(1, sample_size)
+    if len(non_null) > sample_size:
+        step = len(non_null) / sample_size
+        non_null = [non_null[int(i * step)] for i in range(sample_size)]
+    return list(dict.fromkeys(non_null))
+
+
+def _all_convert(converter: Callable[[str], Any], texts: list[str]) -> bool:
+    try:
+        for t in texts:
+            converter(t)
+    except ValueError:
+        return False
+    return True
+
+
+def _find_date_format(sample: list[str]) -> str | None:
+    for date_format in _DATE_FORMATS:
+        if _all_convert(_date_converter(date_format), sample):
+            return date_format
+    return None
+
+
+def infer_column_type(texts: Sequence[str], sample_size: int = 100, decimal: bool = False) -> ColumnType:
+    """
+    Returns the type of the column from an evenly spread sample of its
+    non-null texts. Non-integer numbers are typed as ``'decimal'`` instead of
+    ``'float'`` when `decimal` is set.
+    """
+    sample = _sample(texts, sample_size)
+    if not sample:
+        return 'str'
+    if _all_convert(_to_int, sample):
+        return 'int'
+    if _all_convert(_to_float, sample):
+        return 'decimal' if decimal else 'float'
+    if _find_date_format(sample) is not None:
+        return 'date'
+    return 'str'
+
+
+def convert_column(texts: Sequence[str], column_type: ColumnType, sample_size: int = 100) -> TypedColumn:
+    """
+    Returns the column converted to the type. Null-like texts such as '' or
+    '—' become ``None`` except in ``'str'`` columns. Texts that fail to
+    convert also become ``None`` and are reported in `errors` with their
+    position in the column. The date format is found from a sample.
+    """
+    column = TypedColumn(type=column_type)
+    values = column.values
+    for i, (text, value) in enumerate(zip(texts, _iter_converted(texts, column_type, sample_size))):
+        if value is _FAILED:
+            column.errors.append((i, text))
+            value = None
+        values.append(value)
+    return column
+
+
+def _iter_converted(texts: Sequence[str], column_type: ColumnType, sample_size: int = 100) -> Iterator[Any]:
+    # Yields each text converted as in convert_column(), or _FAILED when it fails to convert
+    if column_type == 'date':
+        converter = _date_converter(_find_date_format(_sample(texts, sample_size)) or 'iso')
+    else:
+        converter = _CONVERTERS[column_type]
+    # Each distinct text is converted once
+    memo: dict[str, Any] = {}
+    for text in texts:
+        value = memo.get(text, _FAILED)
+        if value is _FAILED and text not in memo:
+            if column_type != 'str' and is_null_text(text):
+                value = None
+            else:
+                try:
+                    value = converter(text)
+                except ValueError:
+                    value = _FAILED
+            memo[text] = value
+        yield value
@@ -0,0 +1,263 @@
+from dataclasses import dataclass, field
+from functools import lru_cache
+import re
+
+
+# Elements that never have content or an end tag
+_VOID_TAGS = frozenset([
+    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'keygen',
+    'link', 'meta', 'param', 'source', 'track', 'wbr',
+])
+
+# An open <p> is closed by these start tags as in a standards mode document,
+# searched up to the boundaries of its button scope
+_P_CLOSE = (
+    frozenset(['p']),
+    frozenset(['applet', 'button', 'caption', 'html', 'marquee', 'object', 'table', 'td', 'template', 'th']),
+)
+_P_CLOSING_TAGS = [
+    'address', 'article', 'aside', 'blockquote', 'center', 'dd', 'details', 'dialog', 'dir', 'div', 'dl', 'dt',
+    'fieldset', 'figcaption', 'figure', 'footer', 'form', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'header', 'hgroup',
+    'hr', 'listing', 'main', 'menu', 'nav', 'ol', 'p', 'plaintext', 'pre', 'search', 'section', 'summary',
+    'table', 'ul', 'xmp',
+]
+
+# Open elements that a start tag implicitly closes, searched up to a boundary element
+_IMPLICIT_CLOSE: dict[str, tuple[frozenset[str], frozenset[str]]] = {
+    **dict.fromkeys(_P_CLOSING_TAGS, _P_CLOSE),
+    'td': (frozenset(['td', 'th']), frozenset(['tr', 'table'])),
+    'th': (frozenset(['td', 'th']), frozenset(['tr', 'table'])),
+    'tr': (frozenset(['td', 'th', 'tr']), frozenset(['table'])),
+    'thead': (frozenset(['td', 'th', 'tr', 'thead', 'tbody', 'tfoot']), frozenset(['table'])),
+    'tbody': (frozenset(['td', 'th', 'tr', 'thead', 'tbody', 'tfoot']), frozenset(['table'])),
+    'tfoot': (frozenset(['td', 'th', 'tr', 'thead', 'tbody', 'tfoot']), frozenset(['table'])),
+    'li': (frozenset(['li']), frozenset(['ul', 'ol', 'table'])),
+    'option': (frozenset(['option']), frozenset(['select', 'datalist', 'optgroup'])),
+}
+
+_RE_TOKEN = re.compile(r'''
+    (?P<space>\s+)
+    | (?P<combinator>[>,])
+    | (?P<tag>\*|[a-zA-Z][\w-]*)
+    | \#(?P<id>-?[_a-zA-Z][\w-]*)
+    | \.(?P<cls>-?[_a-zA-Z][\w-]*)
+    | \[\s*(?P<attr>[^\s=\]~^$*|]+)\s*
+        (?:(?P<op>[~^$*]?=)\s*(?:"(?P<dq>[^"]*)"|'(?P<sq>[^']*)'|(?P<value>[^\s\]"']+))\s*)?\]
+    | :nth-of-type\(\s*(?P<nth>[^)]*?)\s*\)
+''', re.VERBOSE)
+_RE_NTH = re.compile(r'(?P<a>[+-]?\d*)n(?:\s*(?P<sign>[+-])\s*(?P<b>\d+))?|(?P<index>[+-]?\d+)')
+
+
+class _Element:
+    __slots__ = ('tag', 'attrs', 'nth', 'child_counts')
+
+    def __init__(self, tag: str, attrs: dict[str, str | None], nth: int) -> None:
+        self.tag = tag
+        self.attrs = attrs
+        self.nth = nth
+        self.child_counts: dict[str, int] = {}
+
+
+class _ElementStack:
+    """
+    Open elements of the document while it is tokenized. An end tag closes
+    the nearest open element with the same tag along with anything left
+    open inside it. Common implied end tags such as those of <td> and <li>
+    are applied so position counts stay close to the browser's tree.
+    """
+    def __init__(self) -> None:
+        self.elements: list[_Element] = []
+        self.root_counts: dict[str, int] = {}
+
+    def push(self, tag: str, attrs: dict[str, str | None]) -> None:
+        elements = self.elements
+        if tag in _IMPLICIT_CLOSE:
+            closed, boundary = _IMPLICIT_CLOSE[tag]
+            for i in range(len(elements) - 1, -1, -1):
+                open_tag = elements[i].tag
+                if open_tag in closed:
+                    del elements[i:]
+                    break
+                if open_tag in boundary:
+                    break
+        counts = elements[-1].child_counts if elements else self.root_counts
+        nth = counts.get(tag, 0) + 1
+        counts[tag] = nth
+        if tag not in _VOID_TAGS:
+            elements.append(_Element(tag, attrs, nth))
+
+    def pop(self, tag: str) -> None:
+        elements = self.elements
+        for i in range(len(elements) - 1, -1, -1):
+            if elements[i].tag == tag:
+                del elements[i:]
+                return
+
+
+@dataclass
+class _Compound:
+    tag: str | None = None
+    ids: list[str] = field(default_factory=list)
+    classes: list[str] = field(default_factory=list)
+    attrs: list[tuple[str, str | None, str]] = field(default_factory=list)
+    nth: list[tuple[int, int]] = field(default_factory=list)
+    # Combinator to the compound on the left, ' ' for descendant or '>' for child
+    combinator: str = ' '
+
+    def is_empty(self) -> bool:
+        return self.tag is None and not (self.ids or self.classes or self.attrs or self.nth)
+
+    def matches(self, element: _Element) -> bool:
+        if self.tag is not None and self.tag != '*' and self.tag != element.tag:
+            return False
+        attrs = element.attrs
+        for id_ in self.ids:
+            if attrs.get('id') != id_:
+                return False
+        if self.classes:
+            class_names = (attrs.get('class') or '').split()
+            for class_name in self.classes:
+                if class_name not in class_names:
+                    return False
+        for name, op, value in self.attrs:
+            if name not in attrs:
+                return False
+            if op is None:
+                continue
+            actual = attrs[name] or ''
+            if not (
+                (op == '=' and actual == value)
+                or (op == '~=' and value in actual.split())
+                or (op == '^=' and value and actual.startswith(value))
+                or (op == '$=' and value and actual.endswith(value))
+                or (op == '*=' and value and value in actual)
+            ):
+                return False
+        for a, b in self.nth:
+            if a == 0:
+                if element.nth != b:
+                    return False
+            elif (element.nth - b) % a or (element.nth - b) // a < 0:
+                return False
+        return True
+
+
+def _parse_nth(expr: str, selector: str) -> tuple[int, int]:
+    expr = expr.strip().lower()
+    if expr == 'odd':
+        return 2, 1
+    if expr == 'even':
+        return 2, 0
+    m = _RE_NTH.fullmatch(expr)
+    if m is None:
+        raise ValueError(f"Invalid :nth-of-type() argument in selector: {selector!r}")
+    if m['index'] is not None:
+        return 0, int(m['index'])
+    a = m['a']
+    b = int(m['b'] or 0)
+    return int(a + '1' if a in ('', '+', '-') else a), -b if m['sign'] == '-' else b
+
+
+def _parse_selector(selector: str) -> list[list[_Compound]]:
+    groups: list[list[_Compound]] = []
+    compounds: list[_Compound] = []
+    compound = _Compound()
+    combinator = ' '
+
+    def end_compound() -> None:
+        nonlocal compound, combinator
+        if compound.is_empty():
+            return
+        compound.combinator = combinator
+        compounds.append(compound)
+        compound = _Compound()
+        combinator = ''
+
+    pos = 0
+    while pos < len(selector):
+        m = _RE_TOKEN.match(selector, pos)
+        if m is None:
+            raise ValueError(f"Invalid selector at position {pos}: {selector!r}")
+        pos = m.end()
+        if m['space'] is not None:
+            end_compound()
+            combinator = combinator or ' '
+        elif m['combinator'] == '>':
+            end_compound()
+            if not compounds or combinator == '>':
+                raise ValueError(f"Invalid selector: {selector!r}")
+            combinator = '>'
+        elif m['combinator'] == ',':
+            end_compound()
+            if not compounds or combinator == '>':
+                raise ValueError(f"Invalid selector: {selector!r}")
+            groups.append(compounds)
+            compounds = []
+            combinator = ' '
+        elif m['tag'] is not None:
+            if not compound.is_empty():
+                raise ValueError(f"Invalid selector: {selector!r}")
+            compound.tag = m['tag'].lower()
+        elif m['id'] is not None:
+            compound.ids.append(m['id'])
+        elif m['cls'] is not None:
+            compound.classes.append(m['cls'])
+        elif m['attr'] is not None:
+            value = m['dq'] if m['dq'] is not None else m['sq'] if m['sq'] is not None else m['value'] or ''
+            compound.attrs.append((m['attr'].lower(), m['op'], value))
+        else:
+            compound.nth.append(_parse_nth(m['nth'], selector))
+    end_compound()
+    if not compounds or combinator == '>':
+        raise ValueError(f"Invalid selector: {selector!r}")
+    groups.append(compounds)
+    return groups
+
+
+def _matches_at(compounds: list[_Compound], k: int, elements: list[_Element], i: int) -> bool:
+    # Whether compounds[:k + 1] match with compounds[k] at elements[i]
+    if not compounds[k].matches(elements[i]):
+        return False
+    if k == 0:
+        return True
+    if compounds[k].combinator == '>':
+        return i > 0 and _matches_at(compounds, k - 1, elements, i - 1)
+    return any(_matches_at(compounds, k - 1, elements, j) for j in range(i - 1, -1, -1))
+
+
+class Selector:
+    """
+    A compiled CSS-style selector for choosing tables by their own
+    attributes and those of their ancestors.
+
+    Supported are type (``table``, ``*``), ``#id``, ``.class`` and
+    attribute selectors (``[a]``, ``[a=v]``, ``[a~=v]``, ``[a^=v]``,
+    ``[a$=v]``, ``[a*=v]``), ``:nth-of-type()``, the descendant and child
+    (``>``) combinators, and comma-separated selector lists. The rightmost
+    compound selector applies to the ``<table>`` itself.
+
+    Raises ``ValueError`` for selectors that cannot be parsed.
+    """
+    def __init__(self, selector: str) -> None:
+        self.selector = selector
+        self._groups = _parse_selector(selector)
+
+    def __repr__(self) -> str:
+        return f"Selector({self.selector!r})"
+
+    def matches(self, elements: list[_Element]) -> bool:
+        """
+        Whether the last of the open `elements` is selected.
+        """
+        if not elements:
+            return False
+        last = len(elements) - 1
+        return any(_matches_at(compounds, len(compounds) - 1, elements, last) for compounds in self._groups)
+
+
+@lru_cache(maxsize=64)
+def compile_selector(selector: str) -> Selector:
+    """
+    Returns the compiled selector, reusing recently compiled ones.
+    """
+    return Selector(selector)
@@ -0,0 +1,54 @@
+from dataclasses import dataclass, field, fields
+
+
+@dataclass
+class ParseStats:
+    """
+    Time spent in each phase of ``parse_html()`` and counts of what it
+    found, recorded when passed as its `stats`. Times are wall times in
+    seconds. Everything adds up when the same object is passed to several
+    calls.
+    """
+    # Fetching the URL or reading the file, without decoding
+    read_time: float = 0.0
+    # Decoding the bytes read with the encoding
+    decode_time: float = 0.0
+    # Tokenizing and building tables, without filtering
+    feed_time: float = 0.0
+    # Checking the text of root tables for `match` and emptiness
+    filter_time: float = 0.0
+    # Size of the URL or file source read, 0 for text sources
+    bytes_in: int = 0
+    # Length of the source text
+    chars_in: int = 0
+    # Start tags, including those of hidden elements
+    tags_seen: int = 0
+    # Tables given an id, including descendant tables
+    tables_built: int = 0
+    # Root tables not returned by reason: 'attrs' or 'select' when their
+    # start tag does not match, 'empty' when they have no text and 'match'
+    # when their text does not match
+    tables_discarded: dict[str, int] = field(default_factory=dict)
+    # Cells built, each once however many rows and columns it spans
+    cells_created: int = 0
+    # Extra places filled by cells spanning rows or columns
+    span_expansions: int = 0
+    # Links built as a TLink
+    links_extracted: int = 0
+
+    def add(self, other: 'ParseStats') -> None:
+        """
+        Adds the times and counts of the other stats to these.
+        """
+        for f in fields(self):
+            if f.name == 'tables_discarded':
+                for reason, count in other.tables_discarded.items():
+                    self.tables_discarded[reason] = self.tables_discarded.get(reason, 0) + count
+            else:
+                setattr(self, f.name, getattr(self, f.name) + getattr(other, f.name))
+
+    def total_time(self) -> float:
+        """
+        Returns the time spent in all recorded phases.
+        """
+        return self.read_time + self.decode_time + self.feed_time + self.filter_time
@@ -1,18 +1,55 @@
-import csv
 from dataclasses import dataclass, field
+from functools import lru_cache
 import html
+import importlib
 import io
+from itertools import islice
 import re
-from typing import Literal
+from typing import TYPE_CHECKING, Any, Generator, Iterable, Iterator, Literal, Sequence, TextIO
+
+from .diff import TableDiff, diff_records
+from .schema import ColumnType, TypedColumn, convert_column, infer_column_type, is_null_text, _FAILED, _iter_converted
+
+if TYPE_CHECKING:
+    # csv, json, sqlite3 and hashlib are imported on first use to keep the
+    # import of the package fast
+    import csv
+    import json
+    from mmap import mmap
+    import sqlite3
 
 
 _RE_WHITESPACE_NEWLINE = re.compile(r'[\r\n]+|\s{2,}')
 _RE_WHITESPACE = re.compile(r'[^\S\r\n]') # whitespace but not newline
+_RE_SOURCE_START_TAG = re.compile(r'''<([^\s/>]+)(?:[^>"']+|"[^"]*"|'[^']*')*>''')
+_RE_SOURCE_END_TAG = {
+    'table': re.compile(r'</table\b[^>]*>\Z', re.IGNORECASE),
+    'td': re.compile(r'</t[dh]\b[^>]*>\Z', re.IGNORECASE),
+    'th': re.compile(r'</t[dh]\b[^>]*>\Z', re.IGNORECASE),
+}
+
+
+_CSV_FORMAT: dict[str, Any] = {
+    'delimiter': ',',
+    'quotechar': '"',
+    'escapechar': None,
+    'doublequote': True,
+    'skipinitialspace': False,
+    'lineterminator': '\n',
+}
 
 
-def _collapse_whitespace(s: str, include_newline: bool = True) -> str:
-    regex = _RE_WHITESPACE_NEWLINE if include_newline else _RE_WHITESPACE
-    return regex.sub(' ', s.strip())
+def _csv_writer(file_obj, dialect: 'str | csv.Dialect | type[csv.Dialect] | None', fmtparams: dict[str, Any]):
+    import csv # pylint: disable=import-outside-toplevel,redefined-outer-name
+    if dialect is None:
+        return csv.writer(file_obj, **{**_CSV_FORMAT, 'quoting': csv.QUOTE_MINIMAL, **fmtparams})
+    return csv.writer(file_obj, dialect, **fmtparams)
+
+
+@lru_cache(maxsize=None)
+def _json_encoder() -> 'json.JSONEncoder':
+    import json # pylint: disable=import-outside-toplevel,redefined-outer-name
+    return json.JSONEncoder(ensure_ascii=False, separators=(',', ':'))
 
 
 def _calc_space_newline(indent: int) -> tuple[str, str]:
@@ -46,19 +83,69 @@ class TLink(TText):
 class TCell:
     header: bool = False
     elements: list[TText] = field(default_factory=list)
+    # (start, end) offsets of the cell in the parsed source when recorded
+    span: tuple[int, int] | None = field(default=None, compare=False, repr=False)
 
     def __iter__(self):
         for element in self.elements:
             yield element
 
     def to_html(self, indent=0) -> str:
-        space, _ = _calc_space_newline(indent)
-        tag = 'th' if self.header else 'td'
-        html_content = _collapse_whitespace(''.join(e.to_html() for e in self.elements))
-        return f"{space}<{tag}>{html_content}</{tag}>"
+        return ''.join(_render_html(_iter_cell_html(self, indent)))
 
     def inner_text(self) -> str:
-        return _collapse_whitespace(''.join(e.inner_text() for e in self.elements), False)
+        if _has_table_ref(self):
+            return _render_text(_iter_cell_text(self))
+        return _RE_WHITESPACE.sub(' ', ''.join(e.inner_text() for e in self.elements).strip())
+
+    def fingerprint(self) -> str:
+        """
+        Returns a digest of the cell content. See `Table.fingerprint()`.
+        """
+        return _cell_digest(self, _ref_digests([self])).hex()
+
+    def source_html(self, source: 'str | bytes | mmap', inner: bool = False, encoding: str = 'utf-8') -> str:
+        """
+        Returns the original HTML of the cell sliced from the source it was
+        parsed from using its recorded `span`. See `Table.source_html()`.
+        """
+        return _source_html(self.span, source, inner, encoding)
+
+
+class TTextCell(TCell):
+    """
+    A cell holding only its text, already normalized as `inner_text()` would
+    return it. Built by ``parse_html(mode='text')`` instead of a `TCell` with
+    elements. For compatibility, `elements` is created from the text on
+    access as a tuple, so it cannot be changed in place. When `elements` is
+    passed instead of `text`, such as by ``dataclasses.replace()``, the
+    text is taken from them.
+    """
+    def __init__( # pylint: disable=super-init-not-called
+        self,
+        header: bool = False,
+        text: str = '',
+        span: tuple[int, int] | None = None,
+        elements: Sequence[TText] | None = None,
+    ) -> None:
+        self.header = header
+        self.text = text if text or elements is None else TCell(elements=list(elements)).inner_text()
+        self.span = span
+
+    def __repr__(self) -> str:
+        return f"TTextCell(header={self.header!r}, text={self.text!r})"
+
+    def __eq__(self, other: object) -> bool:
+        if other.__class__ is not self.__class__ or not isinstance(other, TTextCell):
+            return NotImplemented
+        return (self.header, self.text) == (other.header, other.text)
+
+    @property
+    def elements(self) -> tuple[TText, ...]: # type: ignore[override]
+        return (TText(text=self.text),) if self.text else ()
+
+    def inner_text(self) -> str:
+        return self.text
 
 
 @dataclass
@@ -71,16 +158,17 @@ class TRow:
             yield cell
 
     def to_html(self, indent=0) -> str:
-        space, newline = _calc_space_newline(indent)
-        html_content = (
-            newline + newline.join(c.to_html(indent * 2) for c in self.cells)
-            if self.cells else ''
-        )
-        return f"{space}<tr>{html_content}{newline}{space}</tr>"
+        return ''.join(_render_html(_iter_row_html(self, indent)))
 
     def inner_text(self) -> str:
         return ' '.join(c.inner_text() for c in self.cells)
 
+    def fingerprint(self) -> str:
+        """
+        Returns a digest of the row group and cells. See `Table.fingerprint()`.
+        """
+        return _row_digest(self, _ref_digests(self.cells)).hex()
+
 
     def contains_all_th(self) -> bool:
         """
@@ -106,6 +194,8 @@ class TRow:
 class Table:
     id: int = -1
     rows: list[TRow] = field(default_factory=list)
+    # (start, end) offsets of the table in the parsed source when recorded
+    span: tuple[int, int] | None = field(default=None, compare=False, repr=False)
 
     def __iter__(self):
         for row in self.rows:
@@ -115,23 +205,22 @@ class Table:
         """
         Returns the Table as HTML.
         """
-        _, newline = _calc_space_newline(indent)
-        # Insert <thead>, <tbody> or <tfoot> when row group differs from previous
-        html_content = ''
-        prev_row_group = ''
-        for r in self.rows:
-            if r.group != prev_row_group:
-                if prev_row_group:
-                    # Add end tag for previous group
-                    html_content += f"{newline}</{prev_row_group}>"
-                # Add start tag for current group
-                html_content += f"{newline}<{r.group}>"
-            html_content += f"{newline}{r.to_html(indent)}"
-            prev_row_group = r.group
-        # Add end tag for last group
-        if prev_row_group:
-            html_content += f"{newline}</{prev_row_group}>"
-        return f"<table data-table-id='{self.id}'>{html_content}{newline}</table>"
+        return ''.join(self.iter_html(indent))
+
+
+    def write_html(self, file_obj: TextIO, indent=2) -> None:
+        """
+        Writes the Table as HTML to a text file object. The output is the
+        same as `to_html()`.
+        """
+        file_obj.writelines(self.iter_html(indent))
+
+
+    def iter_html(self, indent=2) -> Iterator[str]:
+        """
+        Yields the Table as fragments of HTML that join up to `to_html()`.
+        """
+        return _render_html(_iter_table_html(self, indent))
 
 
     def to_csv(self) -> str:
@@ -139,26 +228,399 @@ class Table:
         Returns the Table as CSV.
         """
         output = io.StringIO()
-        writer = csv.writer(
-            output,
-            delimiter=',',
-            quotechar='"',
-            escapechar=None,
-            doublequote=True,
-            skipinitialspace=False,
-            lineterminator='\n',
-            quoting=csv.QUOTE_MINIMAL,
-        )
+        self.write_csv(output)
+        return output.getvalue()
+
+
+    def write_csv(
+        self,
+        file_obj: TextIO,
+        dialect: 'str | csv.Dialect | type[csv.Dialect] | None' = None,
+        batch_size: int = 1000,
+        **fmtparams: Any,
+    ) -> None:
+        """
+        Writes the Table as CSV to a text file object, `batch_size` rows at
+        a time. By default the output is the same as `to_csv()`. Pass a csv
+        `dialect` or formatting parameters such as `delimiter='\\t'` to
+        change the format.
+        """
+        writer = _csv_writer(file_obj, dialect, fmtparams)
+        rows = iter(self.rows)
+        batch_size = max(1, batch_size)
+        while batch := [[c.inner_text() for c in r.cells] for r in islice(rows, batch_size)]:
+            writer.writerows(batch)
+
+
+    def iter_csv_rows(
+        self,
+        dialect: 'str | csv.Dialect | type[csv.Dialect] | None' = None,
+        **fmtparams: Any,
+    ) -> Iterator[str]:
+        """
+        Yields each row of the Table as a line of CSV. Accepts the same
+        formatting options as `write_csv()`.
+        """
+        output = io.StringIO()
+        writer = _csv_writer(output, dialect, fmtparams)
         for r in self.rows:
             writer.writerow(c.inner_text() for c in r.cells)
-        return output.getvalue()
+            yield output.getvalue()
+            output.seek(0)
+            output.truncate()
+
+
+    def to_json(self) -> str:
+        """
+        Returns the Table as a JSON object in the form
+        `{"id": <id>, "tables": [{"id": <id>, "rows": [<row>, ...]}, ...]}`.
+        The Table and each descendant Table are listed once, descendants
+        first. A row is `{"group": <group>, "cells": [<cell>, ...]}`. A cell is
+        `{"header": <bool>, "elements": [<element>, ...]}`, or `{"same": <n>}`
+        when it repeats the n-th distinct cell of its Table due to rowspan or
+        colspan. An element is `{"text": <text>}` for `TText`,
+        `{"text": <text>, "href": <href>}` for `TLink` and `{"table": <id>}`
+        for `TRef`.
+
+        Descendant Tables are referenced by id, so ids must be unique within
+        the Table as they are from `parse_html()`.
+
+        Raises
+        ------
+        ValueError
+            When two different Tables have the same id.
+        """
+        encode = _json_encoder().encode
+        parts = [f'{{"id":{encode(self.id)},"tables":[']
+        for i, t in enumerate(_iter_tables_unique_id(self)):
+            parts.append(f'{"," if i else ""}{{"id":{encode(t.id)},"rows":[')
+            cell_numbers: dict[int, int] = {}
+            parts.append(','.join(encode(_json_row(r, cell_numbers)) for r in t.rows))
+            parts.append(']}')
+        parts.append(']}')
+        return ''.join(parts)
+
+
+    def write_jsonl(self, file_obj: TextIO) -> None:
+        """
+        Writes the Table as JSON lines to a text file object, one line per
+        row. Each Table starts with `{"type": "table", "id": <id>, "root":
+        <bool>}` and is followed by its rows as `{"type": "row", "group":
+        <group>, "cells": [<cell>, ...]}`. Cells and elements are the same
+        as in `to_json()`. Descendant Tables are written before the Tables
+        that contain them and the Table itself is last with `"root": true`.
+
+        Several Tables may be written to the same file. Read them back with
+        `Table.read_jsonl()`.
+
+        Raises
+        ------
+        ValueError
+            When two different Tables have the same id.
+        """
+        encode = _json_encoder().encode
+        for t in _iter_tables_unique_id(self):
+            file_obj.write(encode({'type': 'table', 'id': t.id, 'root': t is self}) + '\n')
+            cell_numbers: dict[int, int] = {}
+            for r in t.rows:
+                file_obj.write(encode({'type': 'row', **_json_row(r, cell_numbers)}) + '\n')
+
+
+    @classmethod
+    def from_json(cls, json_text: str) -> 'Table':
+        """
+        Returns the Table from JSON created by `to_json()`.
+        """
+        import json # pylint: disable=import-outside-toplevel,redefined-outer-name
+        data = json.loads(json_text)
+        tables: dict[int, Table] = {}
+        for t in data['tables']:
+            table = Table(id=t['id'])
+            cells: list[TCell] = []
+            for r in t['rows']:
+                table.rows.append(_json_to_row(r, cells, tables))
+            tables[table.id] = table
+        return tables[data['id']]
+
+
+    @classmethod
+    def read_jsonl(cls, file_obj: TextIO) -> Iterator['Table']:
+        """
+        Yields each Table from JSON lines written by `write_jsonl()`.
+        """
+        tables: dict[int, Table] = {}
+        table = None
+        cells: list[TCell] = []
+        root = False
+        import json # pylint: disable=import-outside-toplevel,redefined-outer-name
+        for line in file_obj:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if record['type'] == 'row':
+                if table is None:
+                    raise ValueError('Found row before table in JSON lines')
+                table.rows.append(_json_to_row(record, cells, tables))
+                continue
+            if table is not None and root:
+                yield table
+                tables = {}
+            table = Table(id=record['id'])
+            tables[table.id] = table
+            cells = []
+            root = record['root']
+        if table is not None and root:
+            yield table
+
+
+    def header(self, sep: str = ' ') -> tuple[str, ...]:
+        """
+        Returns the column names from the leading header-like rows, one for
+        each column up to `max_width()`. When there are several header rows,
+        the distinct texts in each column are joined by `sep`, so a "Price"
+        cell spanning over "Low" and "High" gives "Price Low" and
+        "Price High". Names are blank when there is no header row.
+
+        The names are cached on the Table and reused while the header rows,
+        their cells and the Table width are unchanged.
+        """
+        return _resolve_header(self, sep)[1]
+
+
+    def iter_records(
+        self,
+        as_dict: bool = False,
+        sep: str = ' ',
+    ) -> Iterator[tuple[str, ...]] | Iterator[dict[str, str]]:
+        """
+        Yields the text of each row after the header rows as a tuple padded
+        with blanks up to `max_width()`.
+
+        With `as_dict`, each record is a dict keyed by the names from
+        `header(sep)`. Blank names become "column_1", "column_2" and so on,
+        and repeated names get a suffix like "_2". Every record shares the
+        same key strings.
+        """
+        num_header_rows, names = _resolve_header(self, sep)
+        width = self.max_width()
+        records = _iter_row_texts(islice(self.rows, num_header_rows, None), width)
+        if not as_dict:
+            return records
+        keys = _unique_column_names(names, width)
+        return (dict(zip(keys, r)) for r in records)
+
+
+    def infer_schema(self, sample_size: int = 100, decimal: bool = False, sep: str = ' ') -> dict[str, ColumnType]:
+        """
+        Returns the type of each column after the header rows, keyed by the
+        names from `iter_records(as_dict=True, sep=sep)`. The type is one of
+        ``'int'``, ``'float'``, ``'decimal'``, ``'date'`` or ``'str'``, picked
+        from an evenly spread sample of up to `sample_size` texts.
+
+        Numbers may have thousands separators, a currency symbol, a percent
+        sign or parentheses for negatives, such as "(1,234.5)" or "3.4%".
+        Null-like texts such as '', "—" and "N/A" are not sampled.
+        Non-integer columns are typed as ``'decimal'`` when `decimal` is set.
+        """
+        keys, columns = _record_columns(self, sep)
+        return {k: infer_column_type(c, sample_size, decimal) for k, c in zip(keys, columns)}
+
+
+    def to_typed_columns(
+        self,
+        schema: dict[str, ColumnType] | None = None,
+        sample_size: int = 100,
+        decimal: bool = False,
+        sep: str = ' ',
+    ) -> dict[str, TypedColumn]:
+        """
+        Returns each column after the header rows converted to its type,
+        keyed by the names from `iter_records(as_dict=True, sep=sep)`. Types
+        are taken from `schema` or else inferred as in `infer_schema()`.
+
+        Null-like texts become ``None`` except in ``'str'`` columns. A text
+        that fails to convert also becomes ``None`` and is listed in the
+        column's `errors` with its record index, so nothing is raised.
+        Percentages are converted to fractions, so "3.4%" becomes 0.034.
+        """
+        schema = schema or {}
+        keys, columns = _record_columns(self, sep)
+        typed_columns = {}
+        for k, c in zip(keys, columns):
+            column_type = schema.get(k) or infer_column_type(c, sample_size, decimal)
+            typed_columns[k] = convert_column(c, column_type, sample_size)
+        return typed_columns
+
+
+    def to_numpy(self, dtype: Any = None, header: Literal['auto'] | bool = 'auto', structured: bool = False) -> Any:
+        """
+        Returns the rows after the header rows as a 2-D NumPy array padded
+        with blanks up to `max_width()`. Requires NumPy to be installed.
+
+        Parameters
+        ----------
+        dtype : numpy dtype, optional
+            Defaults to ``None`` for an object array of cell texts. A unicode
+            dtype such as ``str`` gives a unicode array. A numeric dtype such
+            as ``float`` converts each text as in `to_typed_columns()`, where
+            null-like texts become NaN for floats. A structured dtype gives a
+            1-D structured array with a field for each column.
+
+        header : {{"auto", True, False}}, default "auto"
+            Which leading rows are the header. For ``'auto'`` they are the
+            header-like rows as in `header()`. For ``True`` it is the first
+            row. For ``False`` there is no header.
+
+        structured : bool, default False
+            Whether to return a 1-D structured array with fields named after
+            the header as in `iter_records(as_dict=True)`. Field types are
+            inferred as in `infer_schema()` unless `dtype` is structured.
+
+        Raises
+        ------
+        ImportError
+            When NumPy is not installed.
+        ValueError
+            When a text cannot be converted to a numeric or date dtype.
+        """
+        return _numpy_array(self, dtype, header, structured)
+
+
+    def to_sqlite(
+        self,
+        conn: 'sqlite3.Connection',
+        name: str,
+        header: Literal['auto'] | bool = 'auto',
+        batch_size: int = 10000,
+        if_exists: Literal['fail', 'replace', 'append'] = 'fail',
+        nested: bool = False,
+    ) -> None:
+        """
+        Writes the Table to a SQLite table called `name` within a single
+        transaction. Columns are created with TEXT type and rows are inserted
+        `batch_size` at a time. Rows with fewer cells than the widest row are
+        padded with NULL.
+
+        Parameters
+        ----------
+        conn : sqlite3.Connection
+            Connection to the database.
+
+        name : str
+            Name of the SQLite table.
+
+        header : {{"auto", True, False}}, default "auto"
+            How column names are found. For ``'auto'`` they come from the
+            leading header-like rows as in `header()`. For ``True`` they come
+            from the first row. Columns without a name are called "column_1",
+            "column_2" and so on, and repeated names get a suffix like "_2".
+
+        batch_size : int, default 10000
+            Number of rows passed to each `executemany()`.
+
+        if_exists : {{"fail", "replace", "append"}}, default "fail"
+            What to do when the SQLite table already exists. For ``'fail'``
+            the error from SQLite is raised.
+
+        nested : bool, default False
+            Whether descendant Tables are also written. Each descendant Table
+            is written to a SQLite table called "<name>_<Table id>". A SQLite
+            table called "<name>_tables" links each written Table by id to the
+            row and column of the cell containing it, counted from zero.
+
+        Raises
+        ------
+        ValueError
+            When a Table to be written has no cells, or when `nested` is
+            enabled and two different Tables have the same id.
+        """
+        tables = list(_iter_tables_unique_id(self)) if nested else [self]
+        with conn:
+            if nested:
+                _sqlite_create(conn, f"{name}_tables", [
+                    ('id', 'INTEGER'),
+                    ('parent_id', 'INTEGER'),
+                    ('row_index', 'INTEGER'),
+                    ('column_index', 'INTEGER'),
+                    ('table_name', 'TEXT'),
+                ], if_exists)
+                conn.executemany(
+                    f"INSERT INTO {_sqlite_quote(name + '_tables')} VALUES (?, ?, ?, ?, ?)",
+                    _iter_sqlite_links(self, name, tables),
+                )
+            for t in tables:
+                _sqlite_insert_table(conn, t, name if t is self else f"{name}_{t.id}", header, batch_size, if_exists)
 
 
     def inner_text(self) -> str:
         """
         Returns the Table as text with whitespaces collapsed.
         """
-        return '\n'.join(r.inner_text() for r in self.rows)
+        return _render_text(_iter_table_text(self))
+
+
+    def source_html(self, source: 'str | bytes | mmap', inner: bool = False, encoding: str = 'utf-8') -> str:
+        """
+        Returns the original HTML of the Table sliced from the source it was
+        parsed from, without reparsing or rendering.
+
+        Parameters
+        ----------
+        source : str, bytes or mmap
+            The source passed to ``parse_html()``. Pass the text for spans
+            recorded with ``spans='char'``, or the encoded bytes, such as a
+            memory-mapped file, for ``spans='byte'``.
+
+        inner : bool, default False
+            Whether to leave out the start and end tags.
+
+        encoding : str, default 'utf-8'
+            Used to decode the slice when the source is bytes.
+
+        Returns
+        -------
+        html
+            The HTML as it appears in the source.
+
+        Raises
+        ------
+        ValueError
+            When no span was recorded for the Table.
+        """
+        return _source_html(self.span, source, inner, encoding)
+
+
+    def fingerprint(self) -> str:
+        """
+        Returns a digest of the content of the Table, usable as a dict key to
+        find duplicate Tables. Tables with the same row groups, header cells,
+        text, links and descendant Tables get the same fingerprint whatever
+        their id or span.
+
+        The fingerprint is computed from the content on each call, so it
+        follows changes made to the Table in place. A descendant Table
+        referenced more than once is hashed once per call.
+        """
+        return _table_digests(self)[id(self)].hex()
+
+
+    def walk_tables(self) -> Iterator['Table']:
+        """
+        Yields this Table followed by each descendant Table in document
+        order. A Table referenced more than once is yielded once. Tables are
+        visited with an explicit stack so any nesting depth is supported.
+        """
+        seen = {id(self)}
+        stack = [self]
+        while stack:
+            table = stack.pop()
+            yield table
+            children = []
+            for child in _child_tables(table):
+                if id(child) not in seen:
+                    seen.add(id(child))
+                    children.append(child)
+            stack.extend(reversed(children))
 
 
     def max_width(self) -> int:
@@ -200,6 +662,45 @@ class Table:
                 r.cells.append(TCell())
 
 
+    def diff(self, other: 'Table', key: int | Sequence[int] | None = None) -> TableDiff:
+        """
+        Compares the rows of this Table with those of another version of it.
+        Rows are compared by the text of their cells, with rows of both
+        Tables padded with empty cells to the same width, so a Table equals
+        itself after `rectangify()`. Descendant Tables are compared by text.
+
+        Parameters
+        ----------
+        other : Table
+            The version to compare with, such as a newer parse of the page.
+
+        key : int or sequence of int, optional
+            Index of the column, or columns, identifying each row. Rows with
+            the same key values are matched wherever they are in the Tables.
+            When not given, the rows are aligned in order so that as many
+            equal rows as possible are matched, as in a text diff, and runs
+            of replaced rows are paired as changed rows.
+
+        Returns
+        -------
+        TableDiff
+            Indexes of the rows added in `other`, removed from this Table,
+            and pairs of indexes of the matched rows with changed cells.
+
+        Raises
+        ------
+        ValueError
+            When a key column is not within the width of the Tables.
+        """
+        width = max(self.max_width(), other.max_width())
+        key_columns = (key,) if isinstance(key, int) else key
+        if key_columns is not None and width and not all(0 <= k < width for k in key_columns):
+            raise ValueError(f"Key columns {key_columns} must be between 0 and {width - 1}")
+        old = list(_iter_row_texts(iter(self.rows), width))
+        new = list(_iter_row_texts(iter(other.rows), width))
+        return diff_records(old, new, key_columns)
+
+
 @dataclass
 class TRef(TText):
     table: Table = field(default_factory=Table)
@@ -210,3 +711,527 @@ class TRef(TText):
 
     def inner_text(self) -> str:
         return self.table.inner_text()
+
+
+def _iter_tables_unique_id(table: Table) -> Iterator[Table]:
+    ids: dict[int, Table] = {}
+    for t in _iter_tables_post_order(table):
+        if ids.setdefault(t.id, t) is not t:
+            raise ValueError(f"Found different tables with the same id {t.id}")
+        yield t
+
+
+def _table_digests(table: Table) -> dict[int, bytes]:
+    # Digests of the Table and its descendant Tables by id(), each Table
+    # hashed after the Tables it contains
+    from hashlib import blake2b # pylint: disable=import-outside-toplevel
+    digests: dict[int, bytes] = {}
+    for t in _iter_tables_post_order(table):
+        h = blake2b(b'table', digest_size=16)
+        for r in t.rows:
+            h.update(_row_digest(r, digests))
+        digests[id(t)] = h.digest()
+    return digests
+
+
+def _ref_digests(cells: Iterable[TCell]) -> dict[int, bytes]:
+    # Digests of the Tables referenced from the cells and their descendant Tables
+    digests: dict[int, bytes] = {}
+    for c in cells:
+        for e in c.elements:
+            if isinstance(e, TRef) and id(e.table) not in digests:
+                digests.update(_table_digests(e.table))
+    return digests
+
+
+def _cell_digest(cell: TCell, digests: dict[int, bytes]) -> bytes:
+    # Texts are length prefixed so that different elements cannot run together the same
+    parts = ['th' if cell.header else 'td']
+    for e in cell.elements:
+        if isinstance(e, TRef):
+            parts.append(f"r{digests[id(e.table)].hex()}")
+        elif isinstance(e, TLink):
+            parts.append(f"a{len(e.text)}:{e.text}h{len(e.href)}:{e.href}")
+        else:
+            parts.append(f"t{len(e.text)}:{e.text}")
+    from hashlib import blake2b # pylint: disable=import-outside-toplevel
+    return blake2b(''.join(parts).encode('utf-8', 'surrogatepass'), digest_size=16).digest()
+
+
+def _row_digest(row: TRow, digests: dict[int, bytes]) -> bytes:
+    from hashlib import blake2b # pylint: disable=import-outside-toplevel
+    h = blake2b(row.group.encode('utf-8'), digest_size=16)
+    prev_cell = None
+    prev_digest = b''
+    for c in row.cells:
+        if c is not prev_cell:
+            # Cells repeated by colspan are hashed once
+            prev_cell = c
+            prev_digest = _cell_digest(c, digests)
+        h.update(prev_digest)
+    return h.digest()
+
+
+def _source_html(span: tuple[int, int] | None, source: 'str | bytes | mmap', inner: bool, encoding: str) -> str:
+    if span is None:
+        raise ValueError("No source span was recorded. Parse with spans='char' or spans='byte'.")
+    start, end = span
+    raw = source[start:end]
+    text = raw if isinstance(raw, str) else raw.decode(encoding)
+    start_tag = _RE_SOURCE_START_TAG.match(text) if inner else None
+    if start_tag:
+        # Cells may end without an end tag
+        end_tag_pattern = _RE_SOURCE_END_TAG.get(start_tag[1].lower())
+        end_tag = end_tag_pattern.search(text) if end_tag_pattern else None
+        text = text[start_tag.end():end_tag.start() if end_tag else len(text)]
+    return text
+
+
+def _json_row(row: TRow, cell_numbers: dict[int, int]) -> dict[str, Any]:
+    # cell_numbers maps each distinct cell seen so far in the table to its number
+    cells: list[dict[str, Any]] = []
+    for c in row.cells:
+        n = cell_numbers.get(id(c))
+        if n is not None:
+            cells.append({'same': n})
+            continue
+        cell_numbers[id(c)] = len(cell_numbers)
+        elements: list[dict[str, Any]] = []
+        for e in c.elements:
+            if isinstance(e, TRef):
+                elements.append({'table': e.table.id})
+            elif isinstance(e, TLink):
+                elements.append({'text': e.text, 'href': e.href})
+            else:
+                elements.append({'text': e.text})
+        cells.append({'header': c.header, 'elements': elements})
+    return {'group': row.group, 'cells': cells}
+
+
+def _json_to_row(record: dict[str, Any], cells: list[TCell], tables: dict[int, Table]) -> TRow:
+    row = TRow(group=record['group'])
+    for c in record['cells']:
+        if 'same' in c:
+            row.cells.append(cells[c['same']])
+            continue
+        elements: list[TText] = []
+        for e in c['elements']:
+            if 'table' in e:
+                elements.append(TRef(table=tables[e['table']]))
+            elif 'href' in e:
+                elements.append(TLink(text=e['text'], href=e['href']))
+            else:
+                elements.append(TText(text=e['text']))
+        cell = TCell(header=c['header'], elements=elements)
+        cells.append(cell)
+        row.cells.append(cell)
+    return row
+
+
+def _sqlite_quote(identifier: str) -> str:
+    return '"' + identifier.replace('"', '""') + '"'
+
+
+def _sqlite_create(conn: 'sqlite3.Connection', name: str, columns: list[tuple[str, str]], if_exists: str) -> None:
+    if if_exists == 'replace':
+        conn.execute(f"DROP TABLE IF EXISTS {_sqlite_quote(name)}")
+    exists_clause = 'IF NOT EXISTS ' if if_exists == 'append' else ''
+    column_defs = ', '.join(f"{_sqlite_quote(c)} {column_type}" for c, column_type in columns)
+    conn.execute(f"CREATE TABLE {exists_clause}{_sqlite_quote(name)} ({column_defs})")
+
+
+def _unique_column_names(names: tuple[str, ...], width: int) -> tuple[str, ...]:
+    # Blank names are numbered and repeats get a suffix, ignoring case like SQLite
+    columns: list[str] = []
+    seen: set[str] = set()
+    for i in range(width):
+        name = (names[i] if i < len(names) else '') or f"column_{i + 1}"
+        column = name
+        suffix = 2
+        while column.lower() in seen:
+            column = f"{name}_{suffix}"
+            suffix += 1
+        seen.add(column.lower())
+        columns.append(column)
+    return tuple(columns)
+
+
+def _iter_row_texts(rows: Iterator[TRow], width: int) -> Iterator[tuple[str, ...]]:
+    padding = ('',) * width
+    prev_texts: dict[int, str] = {}
+    for r in rows:
+        # Reuse text of cells repeated by rowspan or colspan
+        texts: dict[int, str] = {}
+        record = []
+        for c in r.cells:
+            text = texts.get(id(c))
+            if text is None:
+                text = prev_texts.get(id(c))
+                if text is None:
+                    text = c.inner_text()
+                texts[id(c)] = text
+            record.append(text)
+        prev_texts = texts
+        yield tuple(record) + padding[len(record):]
+
+
+def _select_header(table: Table, header: Literal['auto'] | bool) -> tuple[int, tuple[str, ...]]:
+    if header == 'auto':
+        return _resolve_header(table, ' ')
+    if header and table.rows:
+        return 1, tuple(c.inner_text() for c in table.rows[0].cells)
+    return 0, ()
+
+
+def _numpy_array(table: Table, dtype: Any, header: Literal['auto'] | bool, structured: bool) -> Any:
+    try:
+        # Imported on first use since NumPy is optional
+        np: Any = importlib.import_module('numpy')
+    except ImportError as e:
+        raise ImportError("NumPy is required for to_numpy(). Install it with 'pip install numpy'.") from e
+
+    num_header_rows, names = _select_header(table, header)
+    width = table.max_width()
+    num_rows = max(0, len(table.rows) - num_header_rows)
+    # Texts of cells repeated by rowspan or colspan are shared, not copied
+    texts = np.full((num_rows, width), '', dtype=object)
+    for i, record in enumerate(_iter_row_texts(islice(table.rows, num_header_rows, None), width)):
+        texts[i] = record
+
+    dt = np.dtype(object if dtype is None else dtype)
+    if structured or dt.names:
+        if dt.names:
+            fields = [(n, dt.fields[n][0]) for n in dt.names]
+        else:
+            fields = [
+                (k, _numpy_infer_dtype(texts[:, j]))
+                for j, k in enumerate(_unique_column_names(names, width))
+            ]
+        if len(fields) != width:
+            raise ValueError(f"Expected {width} fields in structured dtype but got {len(fields)}")
+        columns = [_numpy_column(np, texts[:, j], np.dtype(f)) for j, (_, f) in enumerate(fields)]
+        # Size unicode fields to fit the column
+        fields = [(n, c.dtype if c.dtype.kind == 'U' else f) for (n, f), c in zip(fields, columns)]
+        array = np.empty(num_rows, dtype=fields)
+        for (n, _), c in zip(fields, columns):
+            array[n] = c
+        return array
+    if dt.kind == 'O':
+        return texts
+    if dt.kind in 'US':
+        return texts.astype(dt)
+    array = np.empty((num_rows, width), dtype=dt)
+    for j in range(width):
+        array[:, j] = _numpy_column(np, texts[:, j], dt)
+    return array
+
+
+_NUMPY_DTYPES: dict[str, str] = {
+    'int': 'int64',
+    'float': 'float64',
+    'decimal': 'object',
+    'date': 'datetime64[D]',
+    'str': 'U',
+}
+
+
+def _numpy_infer_dtype(texts: Any) -> str:
+    column_type = infer_column_type(texts)
+    if column_type == 'int' and any(is_null_text(t) for t in texts):
+        # Integer arrays cannot hold nulls so use NaN instead
+        return 'float64'
+    return _NUMPY_DTYPES[column_type]
+
+
+def _numpy_column(np: Any, texts: Any, dt: Any) -> Any:
+    if dt.kind in 'OUS':
+        return texts.astype(dt)
+    column_type: ColumnType
+    if dt.kind in 'iu':
+        column_type = 'int'
+    elif dt.kind == 'f':
+        column_type = 'float'
+    elif dt.kind == 'M':
+        column_type = 'date'
+    else:
+        column_type = 'str'
+    values = _iter_numpy_values(texts, column_type, dt)
+    if dt.kind in 'iufM':
+        # Fixed size values are written straight into the array
+        return np.fromiter(values, dtype=dt, count=len(texts))
+    return np.array(list(values), dtype=dt)
+
+
+def _iter_numpy_values(texts: Any, column_type: ColumnType, dt: Any) -> Iterator[Any]:
+    # None is kept for NaN and NaT, but integer arrays cannot hold it
+    for i, (text, value) in enumerate(zip(texts, _iter_converted(texts, column_type))):
+        if value is _FAILED or (value is None and dt.kind in 'iu'):
+            raise ValueError(f"Failed to convert {text!r} in record {i} to {dt}")
+        yield value
+
+
+def _record_columns(table: Table, sep: str) -> tuple[tuple[str, ...], list[tuple[str, ...]]]:
+    num_header_rows, names = _resolve_header(table, sep)
+    width = table.max_width()
+    records = list(_iter_row_texts(islice(table.rows, num_header_rows, None), width))
+    columns: list[tuple[str, ...]] = list(zip(*records)) if records else [()] * width
+    return _unique_column_names(names, width), columns
+
+
+def _resolve_header(table: Table, sep: str) -> tuple[int, tuple[str, ...]]:
+    """
+    Returns the number of leading header-like rows and the column names
+    from them. The result is cached on the Table and reused while the header
+    rows, their cells and the Table width are unchanged.
+    """
+    header_rows = []
+    for r in table.rows:
+        if not r.is_header_like():
+            break
+        header_rows.append(r)
+    width = table.max_width()
+    header_cells = [c for r in header_rows for c in r.cells]
+    cache = table.__dict__.get('_header_cache')
+    if (cache is not None
+        and cache[0] == (sep, width, len(header_rows), len(header_cells))
+        and all(a is b for a, b in zip(cache[1], header_cells))):
+        return len(header_rows), cache[2]
+
+    texts: dict[int, str] = {}
+    names = []
+    for i in range(width):
+        parts: list[str] = []
+        prev_cell = None
+        for r in header_rows:
+            if i >= len(r.cells) or r.cells[i] is prev_cell:
+                # Skip repeats from rowspan
+                continue
+            prev_cell = r.cells[i]
+            text = texts.get(id(prev_cell))
+            if text is None:
+                text = texts[id(prev_cell)] = prev_cell.inner_text()
+            if text and (not parts or parts[-1] != text):
+                parts.append(text)
+        names.append(sep.join(parts))
+    result = tuple(names)
+    table.__dict__['_header_cache'] = ((sep, width, len(header_rows), len(header_cells)), header_cells, result)
+    return len(header_rows), result
+
+
+def _sqlite_insert_table(
+    conn: 'sqlite3.Connection',
+    table: Table,
+    name: str,
+    header: Literal['auto'] | bool,
+    batch_size: int,
+    if_exists: str,
+) -> None:
+    width = table.max_width()
+    if width <= 0:
+        raise ValueError(f"Table {table.id} has no cells to write")
+    num_header_rows, names = _select_header(table, header)
+    rows = islice(table.rows, num_header_rows, None)
+    _sqlite_create(conn, name, [(c, 'TEXT') for c in _unique_column_names(names, width)], if_exists)
+
+    insert_sql = f"INSERT INTO {_sqlite_quote(name)} VALUES ({', '.join('?' * width)})"
+    padding = [None] * width
+    batch_size = max(1, batch_size)
+    while batch := [
+        [c.inner_text() for c in r.cells] + padding[len(r.cells):]
+        for r in islice(rows, batch_size)
+    ]:
+        conn.executemany(insert_sql, batch)
+
+
+def _iter_sqlite_links(root: Table, name: str, tables: list[Table]) -> Iterator[tuple]:
+    yield (root.id, None, None, None, name)
+    for t in tables:
+        seen: set[int] = set()
+        for row_index, r in enumerate(t.rows):
+            for column_index, c in enumerate(r.cells):
+                if id(c) in seen:
+                    # Skip repeats from rowspan and colspan
+                    continue
+                seen.add(id(c))
+                for e in c.elements:
+                    if isinstance(e, TRef):
+                        yield (e.table.id, t.id, row_index, column_index, f"{name}_{e.table.id}")
+
+
+def _child_tables(table: Table) -> list[Table]:
+    children = []
+    prev_cell = None
+    for r in table.rows:
+        for c in r.cells:
+            if c is prev_cell:
+                # Skip repeats from colspan
+                continue
+            prev_cell = c
+            for e in c.elements:
+                if isinstance(e, TRef):
+                    children.append(e.table)
+    return children
+
+
+def _iter_tables_post_order(table: Table) -> Iterator[Table]:
+    # Every descendant Table comes before the Tables that contain it
+    seen = {id(table)}
+    stack = [(table, iter(_child_tables(table)))]
+    while stack:
+        t, children = stack[-1]
+        for child in children:
+            if id(child) not in seen:
+                seen.add(id(child))
+                stack.append((child, iter(_child_tables(child))))
+                break
+        else:
+            stack.pop()
+            yield t
+
+
+# Renderers for nested Tables. These avoid recursion so that deeply nested
+# Tables do not hit the recursion limit, and they process each cell once.
+
+
+def _has_table_ref(cell: TCell) -> bool:
+    for e in cell.elements:
+        if isinstance(e, TRef):
+            return True
+    return False
+
+
+def _render_text(fragments: Generator[Table, str, str]) -> str:
+    """
+    Returns the text from the generator. When it yields a nested Table, the
+    Table's text is sent back to it. Nested Tables are handled with an
+    explicit stack of generators and the text of each is built once.
+    """
+    stack: list[tuple[Generator[Table, str, str], Table | None]] = [(fragments, None)]
+    table_texts: dict[int, str] = {}
+    text = None
+    while True:
+        try:
+            table = stack[-1][0].send(text) # type: ignore[arg-type]
+        except StopIteration as stop:
+            _, done_table = stack.pop()
+            text = stop.value
+            if not stack:
+                return text
+            table_texts[id(done_table)] = text
+            continue
+        text = table_texts.get(id(table))
+        if text is None:
+            stack.append((_iter_table_text(table), table))
+
+
+def _iter_table_text(table: Table) -> Generator[Table, str, str]:
+    row_texts = []
+    for r in table.rows:
+        cell_texts = []
+        for c in r.cells:
+            if _has_table_ref(c):
+                cell_texts.append((yield from _iter_cell_text(c)))
+            else:
+                cell_texts.append(_RE_WHITESPACE.sub(' ', ''.join(e.inner_text() for e in c.elements).strip()))
+        row_texts.append(' '.join(cell_texts))
+    return '\n'.join(row_texts)
+
+
+def _iter_cell_text(cell: TCell) -> Generator[Table, str, str]:
+    # Text from nested tables is already collapsed and would be unchanged by
+    # collapsing again, so only the text around nested tables is collapsed.
+    texts = []
+    segment: list[str] = []
+    for e in cell.elements:
+        if isinstance(e, TRef):
+            texts.append(_RE_WHITESPACE.sub(' ', ''.join(segment)))
+            texts.append((yield e.table))
+            segment = []
+        else:
+            segment.append(e.inner_text())
+    texts.append(_RE_WHITESPACE.sub(' ', ''.join(segment)))
+    return ''.join(texts).strip()
+
+
+def _render_html(fragments: Iterator[str | Table]) -> Iterator[str]:
+    """
+    Yields HTML from the fragments, descending into each nested Table found
+    among them using an explicit stack of generators.
+    """
+    stack = [fragments]
+    while stack:
+        for fragment in stack[-1]:
+            if isinstance(fragment, Table):
+                # Nested tables are always compact
+                stack.append(_iter_table_html(fragment, -1, True))
+                break
+            yield fragment
+        else:
+            stack.pop()
+
+
+def _iter_table_html(table: Table, indent: int, nested: bool = False) -> Iterator[str | Table]:
+    _, newline = _calc_space_newline(indent)
+    yield f"<table data-table-id='{table.id}'>"
+    # Insert <thead>, <tbody> or <tfoot> when row group differs from previous
+    prev_row_group = ''
+    for r in table.rows:
+        if r.group != prev_row_group:
+            if prev_row_group:
+                # Add end tag for previous group
+                yield f"{newline}</{prev_row_group}>"
+            # Add start tag for current group
+            yield f"{newline}<{r.group}>"
+        yield newline
+        yield from _iter_row_html(r, indent, nested)
+        prev_row_group = r.group
+    # Add end tag for last group
+    if prev_row_group:
+        yield f"{newline}</{prev_row_group}>"
+    yield f"{newline}</table>"
+
+
+def _iter_row_html(row: TRow, indent: int, nested: bool = False) -> Iterator[str | Table]:
+    space, newline = _calc_space_newline(indent)
+    yield f"{space}<tr>"
+    cell_space, _ = _calc_space_newline(indent * 2)
+    for c in row.cells:
+        if _has_table_ref(c):
+            yield newline
+            yield from _iter_cell_html(c, indent * 2, nested)
+        else:
+            tag = 'th' if c.header else 'td'
+            html_content = _collapse_html_segment(''.join(e.to_html() for e in c.elements), True, True, nested)
+            yield f"{newline}{cell_space}<{tag}>{html_content}</{tag}>"
+    yield f"{newline}{space}</tr>"
+
+
+def _iter_cell_html(cell: TCell, indent: int, nested: bool = False) -> Iterator[str | Table]:
+    space, _ = _calc_space_newline(indent)
+    tag = 'th' if cell.header else 'td'
+    yield f"{space}<{tag}>"
+    # Nested table HTML never starts or ends with whitespace, so the text
+    # around each nested table is collapsed on its own while the cell content
+    # is stripped as a whole. Text inside a nested table is collapsed once
+    # more by the enclosing cell, and a second pass leaves nothing to collapse.
+    segment: list[str] = []
+    first = True
+    for e in cell.elements:
+        if isinstance(e, TRef):
+            yield _collapse_html_segment(''.join(segment), first, False, nested)
+            yield e.table
+            segment = []
+            first = False
+        else:
+            segment.append(e.to_html())
+    yield _collapse_html_segment(''.join(segment), first, True, nested)
+    yield f"</{tag}>"
+
+
+def _collapse_html_segment(s: str, first: bool, last: bool, twice: bool) -> str:
+    if first:
+        s = s.lstrip()
+    if last:
+        s = s.rstrip()
+    s = _RE_WHITESPACE_NEWLINE.sub(' ', s)
+    return _RE_WHITESPACE_NEWLINE.sub(' ', s) if twice else s
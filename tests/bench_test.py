@@ -0,0 +1,57 @@
+import json
+import random
+import pytest
+
+from html_table_takeout import parse_html
+from html_table_takeout.bench import CORPORA, main, run_benchmarks
+
+
+#########################################################
+# corpus generators
+#########################################################
+
+
+@pytest.mark.parametrize('name', list(CORPORA))
+def test_corpus_has_tables(name):
+    html_text = CORPORA[name](random.Random(0), 0.05)
+    assert html_text == CORPORA[name](random.Random(0), 0.05)
+    assert html_text != CORPORA[name](random.Random(1), 0.05)
+    assert parse_html(html_text)
+
+
+def test_corpus_hidden_tables():
+    html_text = CORPORA['hidden'](random.Random(0), 0.1)
+    displayed = parse_html(html_text)
+    assert len(displayed) * 2 == len(parse_html(html_text, displayed_only=False))
+    assert 'display' not in ''.join(t.to_html() for t in displayed)
+
+
+#########################################################
+# run_benchmarks
+#########################################################
+
+
+def test_run_benchmarks():
+    report = run_benchmarks(['tall', 'nested'], scale=0.02, repeat=3)
+    assert report['repeat'] == 3
+    assert list(report['results']) == ['tall', 'nested']
+    result = report['results']['tall']
+    assert result['tables'] == 1
+    assert result['cells'] == 6 * (1 + 40)
+    assert list(result['operations']) == ['parse_html', 'to_csv', 'to_html', 'inner_text']
+    for m in result['operations'].values():
+        assert m['min'] <= m['p50'] <= m['p90'] <= m['max']
+        assert m['mb_per_s'] > 0
+        assert m['cells_per_s'] > 0
+
+
+def test_main_json(tmp_path, capsys):
+    json_path = tmp_path / 'results.json'
+    assert main(['--corpus', 'spans', '--scale', '0.02', '--repeat', '1', '--json', str(json_path)]) == 0
+    report = json.loads(json_path.read_text(encoding='utf-8'))
+    assert list(report['results']) == ['spans']
+
+    assert main(['--corpus', 'spans', '--scale', '0.02', '--repeat', '1', '--compare', str(json_path)]) == 0
+    lines = capsys.readouterr().out.splitlines()
+    assert lines[-4].startswith('spans      parse_html')
+    assert lines[-1].endswith('%')
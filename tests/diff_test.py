@@ -0,0 +1,128 @@
+import random
+import pytest
+
+from html_table_takeout import Table, TRow, TCell, TText, TableDiff
+
+
+#########################################################
+# test helpers
+#########################################################
+
+
+def create_table(records: list[tuple[str, ...]]) -> Table:
+    return Table(rows=[
+        TRow(cells=[TCell(elements=[TText(text=t)]) for t in r])
+        for r in records
+    ])
+
+
+#########################################################
+# Table diff
+#########################################################
+
+
+@pytest.mark.parametrize(
+    '_desc,old,new,expected',
+    [
+        ('it finds no changes in equal tables',
+            [('1', 'a'), ('2', 'b')],
+            [('1', 'a'), ('2', 'b')],
+            TableDiff(),
+        ),
+        ('it finds added rows',
+            [('1', 'a'), ('3', 'c')],
+            [('0', 'z'), ('1', 'a'), ('2', 'b'), ('3', 'c'), ('4', 'd')],
+            TableDiff(added=[0, 2, 4]),
+        ),
+        ('it finds removed rows',
+            [('1', 'a'), ('2', 'b'), ('3', 'c')],
+            [('2', 'b')],
+            TableDiff(removed=[0, 2]),
+        ),
+        ('it pairs replaced rows as changed rows',
+            [('1', 'a'), ('2', 'b'), ('3', 'c'), ('4', 'd')],
+            [('1', 'a'), ('2', 'B'), ('3', 'C'), ('5', 'e'), ('4', 'd')],
+            TableDiff(added=[3], changed=[(1, 1), (2, 2)]),
+        ),
+        ('it matches moved rows in order',
+            [('1', 'a'), ('2', 'b'), ('3', 'c')],
+            [('3', 'c'), ('1', 'a'), ('2', 'b')],
+            TableDiff(added=[0], removed=[2]),
+        ),
+        ('it matches repeated rows',
+            [('x',), ('y',), ('x',), ('y',)],
+            [('y',), ('x',), ('y',), ('x',)],
+            TableDiff(added=[0], removed=[3]),
+        ),
+        ('it compares tables of different widths as rectangular',
+            [('1',), ('2', 'b')],
+            [('1', ''), ('2', 'b', '')],
+            TableDiff(),
+        ),
+        ('it finds a changed column',
+            [('1', 'a'), ('2', 'b')],
+            [('1', 'a', 'x'), ('2', 'b', '')],
+            TableDiff(changed=[(0, 0)]),
+        ),
+        ('it compares empty tables',
+            [],
+            [('1',)],
+            TableDiff(added=[0]),
+        ),
+    ]
+)
+def test_table_diff(_desc, old, new, expected):
+    assert create_table(old).diff(create_table(new)) == expected
+
+
+@pytest.mark.parametrize(
+    '_desc,old,new,key,expected',
+    [
+        ('it matches rows by key column',
+            [('1', 'a'), ('2', 'b'), ('3', 'c')],
+            [('3', 'C'), ('1', 'a'), ('4', 'd')],
+            0,
+            TableDiff(added=[2], removed=[1], changed=[(2, 0)]),
+        ),
+        ('it matches rows by key columns',
+            [('1', 'x', 'a'), ('1', 'y', 'b')],
+            [('1', 'y', 'B'), ('1', 'x', 'a')],
+            [0, 1],
+            TableDiff(changed=[(1, 0)]),
+        ),
+        ('it matches repeated keys in order',
+            [('1', 'a'), ('1', 'b'), ('1', 'c')],
+            [('1', 'a'), ('1', 'c')],
+            0,
+            TableDiff(removed=[2], changed=[(1, 1)]),
+        ),
+    ]
+)
+def test_table_diff_key(_desc, old, new, key, expected):
+    assert create_table(old).diff(create_table(new), key=key) == expected
+
+
+def test_table_diff_rectangify():
+    old = create_table([('1', 'a'), ('2',)])
+    new = create_table([('1', 'a'), ('2',)])
+    new.rectangify()
+    assert old.diff(new) == TableDiff()
+    assert old.diff(new, key=1) == TableDiff()
+
+
+def test_table_diff_shuffled():
+    records = [(str(i), f"row {i}") for i in range(5000)]
+    shuffled = records[:]
+    random.Random(0).shuffle(shuffled)
+    diff = create_table(records).diff(create_table(shuffled))
+    # Rows left unmatched in the same place are paired as changed rows
+    assert len(diff.added) == len(diff.removed)
+    assert len(diff.added) + len(diff.changed) < len(records)
+    diff = create_table(records).diff(create_table(shuffled), key=0)
+    assert diff == TableDiff()
+
+
+def test_table_diff_bad_key():
+    table = create_table([('1', 'a')])
+    with pytest.raises(ValueError):
+        table.diff(table, key=2)
@@ -0,0 +1,147 @@
+import pytest
+
+from html_table_takeout import (
+    Histogram, HistogramHook, ParseHook, ParseStats, Table, parse_html, register_hook, unregister_hook,
+)
+
+
+#########################################################
+# test helpers
+#########################################################
+
+
+class RecordingHook(ParseHook):
+    def __init__(self, slow_table_threshold: float | None = None) -> None:
+        self.slow_table_threshold = slow_table_threshold
+        self.events: list[tuple] = []
+
+    def on_table_start(self, attrs: dict[str, str | None], depth: int) -> None:
+        self.events.append(('start', attrs, depth))
+
+    def on_table_end(self, table: Table, depth: int, discarded_reason: str | None, elapsed: float) -> None:
+        assert elapsed >= 0
+        self.events.append(('end', table.id, depth, discarded_reason))
+
+    def on_slow_table(self, table: Table, depth: int, elapsed: float) -> None:
+        self.events.append(('slow', table.id, depth))
+
+    def on_document_end(self, stats: ParseStats) -> None:
+        self.events.append(('document', stats.tables_built))
+
+
+HTML_TEXT = """
+<table id='a'><tr><td>1<table><tr><td>2</td></tr></table></td></tr></table>
+<table><tr><td> </td></tr></table>
+<table id='b'><tr><td>3</td></tr></table>"""
+
+
+#########################################################
+# ParseHook
+#########################################################
+
+
+def test_hook_events():
+    hook = RecordingHook()
+    parse_html(HTML_TEXT, match='1', hooks=[hook])
+    assert hook.events == [
+        ('start', {'id': 'a'}, 0),
+        ('start', {}, 1),
+        ('end', 0, 1, None),
+        ('end', 1, 0, None),
+        ('start', {}, 0),
+        ('end', 2, 0, 'empty'),
+        ('start', {'id': 'b'}, 0),
+        ('end', 3, 0, 'match'),
+        ('document', 4),
+    ]
+
+
+def test_hook_events_columns():
+    hook = RecordingHook()
+    parse_html("<table><tr><td>1</td><td><table><tr><td>2</td></tr></table></td></tr></table>", columns=[0], hooks=[hook])
+    assert [e for e in hook.events if e[0] == 'end'] == [('end', 0, 1, 'columns'), ('end', 1, 0, None)]
+
+
+def test_hook_events_orphan():
+    hook = RecordingHook()
+    parse_html("<table><table><tr><td>1</td></tr></table><tr><td>2</td></tr></table>", hooks=[hook])
+    assert [e for e in hook.events if e[0] == 'end'] == [('end', 0, 1, 'orphan'), ('end', 1, 0, None)]
+
+
+def test_hook_slow_table():
+    hook = RecordingHook(slow_table_threshold=0.0)
+    parse_html(HTML_TEXT, attrs={'id': 'b'}, hooks=[hook])
+    assert hook.events == [
+        ('start', {'id': 'b'}, 0),
+        ('end', 0, 0, None),
+        ('slow', 0, 0),
+        ('document', 1),
+    ]
+
+
+def test_hook_registered():
+    registered = RecordingHook()
+    per_call = RecordingHook()
+    register_hook(registered)
+    register_hook(registered)
+    try:
+        parse_html(HTML_TEXT, attrs={'id': 'b'}, hooks=[per_call])
+    finally:
+        unregister_hook(registered)
+    unregister_hook(registered)
+    parse_html(HTML_TEXT)
+    assert registered.events == per_call.events
+    assert len(registered.events) == 3
+
+
+def test_hook_stats():
+    stats = ParseStats()
+    hook = RecordingHook()
+    parse_html(HTML_TEXT, stats=stats, hooks=[hook])
+    parse_html(HTML_TEXT, stats=stats, hooks=[hook])
+    # Hooks see the stats of each call, which are added to those passed
+    assert [e for e in hook.events if e[0] == 'document'] == [('document', 4), ('document', 4)]
+    assert stats.tables_built == 8
+    assert stats.tables_discarded == {'empty': 2}
+
+
+def test_hook_lazy():
+    hook = RecordingHook()
+    tables = parse_html(HTML_TEXT, lazy=True, hooks=[hook])
+    assert len(tables[0].rows) == 1
+    assert hook.events == [('document', 0)]
+
+
+#########################################################
+# HistogramHook
+#########################################################
+
+
+def test_histogram_hook():
+    hook = HistogramHook()
+    parse_html(HTML_TEXT, hooks=[hook])
+    parse_html("<table><tr><td>1</td><td>2</td></tr><tr><td>3</td></tr></table>", hooks=[hook])
+    assert hook.table_rows.count == 4
+    assert hook.table_rows.total == 5
+    assert hook.table_cells.total == 6
+    assert hook.table_cells.max == 3
+    assert hook.table_latency.count == 5
+    assert hook.document_latency.count == 2
+    assert hook.discarded == {'empty': 1}
+
+
+@pytest.mark.parametrize(
+    '_desc,values,q,expected',
+    [
+        ('it returns 0 when empty', [], 0.5, 0.0),
+        ('it returns the upper bound of the bucket', [1, 3, 4, 30], 0.5, 5),
+        ('it returns the lowest bucket with values', [3, 4, 30], 0.0, 5),
+        ('it returns the max above the last bound', [1, 150], 1.0, 150),
+    ]
+)
+def test_histogram_quantile(_desc, values, q, expected):
+    histogram = Histogram((1, 5, 10, 100))
+    for v in values:
+        histogram.observe(v)
+    assert histogram.quantile(q) == expected
+    assert sum(histogram.counts) == len(values)
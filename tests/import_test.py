@@ -0,0 +1,76 @@
+import subprocess
+import sys
+import pytest
+
+import html_table_takeout
+
+
+# Modules only needed to fetch URLs, export or index, loaded on first use
+HEAVY_MODULES = [
+    'urllib.request', 'http.client', 'ssl', 'email', 'csv', 'json', 'sqlite3', 'decimal', 'difflib',
+    'html_table_takeout.index',
+]
+# Cumulative microseconds to import the package, a few times what it takes on
+# a laptop so that only a heavy new import fails it
+IMPORT_BUDGET_US = 200_000
+
+
+#########################################################
+# test helpers
+#########################################################
+
+
+def import_times(statement: str) -> dict[str, int]:
+    # Cumulative import time in microseconds by module, as printed by -X importtime
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', statement],
+        capture_output=True, text=True, check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        _self, cumulative, name = line[len('import time:'):].split('|')
+        if cumulative.strip().isdigit():
+            times[name.strip()] = int(cumulative)
+    return times
+
+
+#########################################################
+# import time
+#########################################################
+
+
+def test_import_budget():
+    times = import_times('import html_table_takeout')
+    assert times['html_table_takeout'] < IMPORT_BUDGET_US
+    assert [m for m in HEAVY_MODULES if m in times] == []
+
+
+@pytest.mark.parametrize(
+    '_desc,statement,module',
+    [
+        ('it loads csv to export', "import html_table_takeout as h; h.parse_html('<table><tr><td>1</td></tr></table>')[0].to_csv()", 'csv'),
+        ('it loads json to export', "import html_table_takeout as h; h.parse_html('<table><tr><td>1</td></tr></table>')[0].to_json()", 'json'),
+        ('it loads the index on first access', 'from html_table_takeout import TableIndex', 'sqlite3'),
+    ]
+)
+def test_import_on_first_use(_desc, statement, module):
+    assert module in import_times(statement)
+
+
+#########################################################
+# lazy exports
+#########################################################
+
+
+@pytest.mark.parametrize('name', ['TableInfo', 'scan_tables', 'parse_table_at', 'TableIndex', 'IndexedTable', 'LazyTable', 'TableReparser', 'ReparseResult'])
+def test_lazy_export(name):
+    assert name in dir(html_table_takeout)
+    value = getattr(html_table_takeout, name)
+    assert value.__module__.startswith('html_table_takeout.')
+
+
+def test_lazy_export_missing():
+    with pytest.raises(AttributeError):
+        getattr(html_table_takeout, 'Missing')
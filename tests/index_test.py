@@ -0,0 +1,107 @@
+import os
+import pytest
+
+from html_table_takeout import TableIndex, parse_html
+
+
+#########################################################
+# test helpers
+#########################################################
+
+
+def write_html(path, html_text: str, mtime_ns: int = 1_000_000_000) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(html_text.encode('utf-8'))
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+PRICES_HTML = """<p>é</p>
+<table id='prices'><caption>Prices</caption>
+    <tr><th>Year</th><th>Price</th></tr>
+    <tr><td>2024</td><td>1 €</td></tr>
+</table>"""
+
+NAMES_HTML = """<table class='names'><tr><td>Ann</td><td><table><tr><td>x</td></tr></table></td></tr></table>"""
+
+
+#########################################################
+# TableIndex
+#########################################################
+
+
+def test_index_query_and_parse(tmp_path):
+    write_html(tmp_path / 'docs' / 'a.html', PRICES_HTML)
+    write_html(tmp_path / 'docs' / 'sub' / 'b.html', NAMES_HTML)
+    with TableIndex(tmp_path / 'index.sqlite') as index:
+        assert index.update(tmp_path / 'docs') == 2
+        entries = list(index.query())
+        assert [(e.path.name, e.info.index) for e in entries] == [('a.html', 0), ('b.html', 0), ('b.html', 1)]
+
+        entries = list(index.query(match='price', min_rows=2, min_width=2))
+        assert [e.info.attrs for e in entries] == [{'id': 'prices'}]
+        assert index.parse(entries[0]) == parse_html(PRICES_HTML)[0]
+
+        assert [e.info.depth for e in index.query(attrs={'class': 'names'})] == [0]
+        assert [e.info.parent for e in index.query(depth=1)] == [0]
+
+
+def test_index_fingerprint(tmp_path):
+    write_html(tmp_path / 'a.html', "<table><tr><td>1 &amp; 2</td></tr></table>")
+    write_html(tmp_path / 'b.html', "<table border=1>\n<tr> <td><b>1 &amp;</b>  2</td> </tr></table>")
+    write_html(tmp_path / 'c.html', "<table><tr><td>1 2</td></tr></table>")
+    with TableIndex(tmp_path / 'index.sqlite') as index:
+        index.update(tmp_path)
+        entries = list(index.query())
+        assert entries[0].fingerprint == entries[1].fingerprint != entries[2].fingerprint
+        assert [e.path.name for e in index.query(fingerprint=entries[0].fingerprint)] == ['a.html', 'b.html']
+
+
+def test_index_update_incremental(tmp_path):
+    docs = tmp_path / 'docs'
+    write_html(docs / 'a.html', PRICES_HTML)
+    write_html(docs / 'b.html', NAMES_HTML)
+    with TableIndex(tmp_path / 'index.sqlite') as index:
+        assert index.update(docs) == 2
+        assert index.update(docs) == 0
+
+        write_html(docs / 'b.html', PRICES_HTML, mtime_ns=2_000_000_000)
+        (docs / 'a.html').unlink()
+        assert index.update(docs) == 1
+        assert [(e.path.name, e.info.attrs) for e in index.query()] == [('b.html', {'id': 'prices'})]
+
+    # The index is kept on disk
+    with TableIndex(tmp_path / 'index.sqlite') as index:
+        assert index.update(docs) == 0
+        assert len(list(index.query())) == 1
+
+
+def test_index_update_keeps_other_patterns(tmp_path):
+    docs = tmp_path / 'docs'
+    write_html(docs / 'a.html', PRICES_HTML)
+    write_html(docs / 'sub' / 'b.htm', NAMES_HTML)
+    write_html(docs / 'sub' / 'c.htm', NAMES_HTML)
+    with TableIndex(tmp_path / 'index.sqlite') as index:
+        assert index.update(docs) == 1
+        assert index.update(docs, pattern='**/*.htm') == 2
+        (docs / 'sub' / 'c.htm').unlink()
+        assert index.update(docs) == 0
+        assert index.update(docs, pattern='sub/*.htm') == 0
+        assert sorted({e.path.name for e in index.query()}) == ['a.html', 'b.htm']
+
+
+def test_index_parse_changed_file(tmp_path):
+    write_html(tmp_path / 'a.html', PRICES_HTML)
+    with TableIndex(tmp_path / 'index.sqlite') as index:
+        index.update(tmp_path)
+        entry = next(index.query())
+        write_html(tmp_path / 'a.html', PRICES_HTML + ' ')
+        with pytest.raises(ValueError, match='changed since it was indexed'):
+            index.parse(entry)
+
+
+def test_index_undecodable_file(tmp_path):
+    (tmp_path / 'a.html').write_bytes(b'<table><tr><td>\xff</td></tr></table>')
+    with TableIndex(tmp_path / 'index.sqlite') as index:
+        assert index.update(tmp_path) == 1
+        assert not list(index.query())
+        assert index.update(tmp_path) == 0
@@ -1,9 +1,11 @@
 # pylint: disable=too-many-lines
+import dataclasses
+from mmap import mmap, ACCESS_READ
 from pathlib import Path
 import re
 import pytest
 
-from html_table_takeout import Table, TRow, TCell, TLink, TRef, TText, parse_html
+from html_table_takeout import Table, TRow, TCell, TTextCell, TLink, TRef, TText, LazyTable, ParseStats, parse_html
 
 
 #########################################################
@@ -20,6 +22,11 @@ def create_table_html_with_rowspan(num_rows: int) -> str:
     return f"<table>{table_content}</table>"
 
 
+def create_table_html_with_rows(num_rows: int) -> str:
+    rows = ''.join(f"<tr><td>{r}</td></tr>" for r in range(num_rows))
+    return f"<table>{rows}</table>"
+
+
 def create_table(num_rows: int, num_cols: int) -> Table:
     num_rows = max(1, num_rows)
     num_cols = max(1, num_cols)
@@ -1647,6 +1654,742 @@ def test_extract_links(_desc, html_text, extract_links, expected):
         assert table == expected[idx]
 
 
+#########################################################
+# filtering - select
+#########################################################
+
+
+@pytest.mark.parametrize(
+    '_desc,html_text,select,expected_texts',
+    [
+        ('it selects tables by ancestor class', """
+<div class='nav'><table><tr><td>0</td></tr></table></div>
+<div class='content main'>
+    <section><table><tr><td>1</td></tr></table></section>
+</div>
+<table><tr><td>2</td></tr></table>
+        """,
+        'div.content table',
+        ['1']),
+        ('it selects tables by position', """
+<div>
+    <table><tr><td>0</td></tr></table>
+    <p>text<br>text</p>
+    <table><tr><td>1</td></tr></table>
+    <table><tr><td>2</td></tr></table>
+</div>
+        """,
+        'div > table:nth-of-type(2)',
+        ['1']),
+        ('it selects tables by attribute prefix', """
+<table id='stats-2023'><tr><td>0</td></tr></table>
+<table id='nav'><tr><td>1</td></tr></table>
+<table id='stats-2024'><tr><td>2</td></tr></table>
+        """,
+        '[id^=stats-]',
+        ['0', '2']),
+        ('it selects nested table as root when ancestor table is not selected', """
+<table>
+    <tr><td>0</td><td><table class='data'><tr><td>1</td></tr></table></td></tr>
+</table>
+        """,
+        'td > table.data',
+        ['1']),
+        ('it keeps positions after implied end tags', """
+<ul><li>a<li><table><tr><td>0</td></tr></table></ul>
+        """,
+        'li:nth-of-type(2) > table',
+        ['0']),
+        ('it selects tables after unclosed paragraphs', """
+<div id='content'>
+    <p>intro
+    <table><tr><td>0</td></tr></table>
+    <p>more
+    <table><tr><td>1</td></tr></table>
+</div>
+        """,
+        '#content > table:nth-of-type(2)',
+        ['1']),
+        ('it returns no tables when none selected', """
+<table><tr><td>0</td></tr></table>
+        """,
+        'div table',
+        []),
+    ]
+)
+def test_match_select(_desc, html_text, select, expected_texts):
+    actual = parse_html(html_text, select=select)
+    assert [t.inner_text() for t in actual] == expected_texts
+
+
+def test_match_select_includes_descendants():
+    html_text = """
+<table id='A'>
+    <tr><td>1</td><td><table><tr><td>2</td></tr></table></td></tr>
+</table>"""
+    actual = parse_html(html_text, select='#A', attrs={'id': 'A'})
+    assert len(actual) == 1
+    assert actual[0].id == 1
+    nested = actual[0].rows[0].cells[1].elements[0]
+    assert isinstance(nested, TRef) and nested.table.id == 0
+
+
+def test_match_select_invalid():
+    with pytest.raises(ValueError):
+        parse_html(Path('does-not-exist.html'), select='table >')
+
+
+#########################################################
+# filtering - columns
+#########################################################
+
+
+@pytest.mark.parametrize(
+    '_desc,html_text,columns',
+    [
+        ('it keeps columns by position', """
+<table>
+    <tr><td>a</td><td>b</td><td>c</td><td>d</td></tr>
+    <tr><td>1</td><td>2</td><td>3</td><td>4</td></tr>
+</table>
+        """,
+        [0, 2]),
+        ('it keeps columns in table order', """
+<table>
+    <tr><td>a</td><td>b</td><td>c</td></tr>
+</table>
+        """,
+        [2, 0, 2]),
+        ('it keeps columns with rowspan and colspan', """
+<table>
+    <tr><td rowspan='3'>a</td><td colspan='2'>b</td><td>c</td></tr>
+    <tr><td>1</td><td rowspan='2'><a href='x'>2</a></td><td>3</td></tr>
+    <tr><td>4</td><td>5<br>6</td></tr>
+    <tr><td colspan='4'>7</td></tr>
+</table>
+        """,
+        [1, 3]),
+        ('it keeps columns with rowspan beyond the last cell', """
+<table>
+    <tr><td>a</td><td>b</td><td rowspan='2'>c</td></tr>
+    <tr><td>1</td></tr>
+</table>
+        """,
+        [2]),
+    ]
+)
+def test_match_columns(_desc, html_text, columns):
+    keep = set(columns)
+    expected = parse_html(html_text)
+    for table in expected:
+        for row in table.rows:
+            row.cells = [cell for i, cell in enumerate(row.cells) if i in keep]
+
+    actual = parse_html(html_text, columns=columns)
+    assert actual == expected
+
+
+def test_match_columns_by_header():
+    html_text = """
+<table>
+    <thead><tr><th>Name</th><th> Price </th><th>Stock</th></tr></thead>
+    <tbody>
+        <tr><td>a</td><td>1</td><td>10</td></tr>
+        <tr><td>b</td><td>2</td><td>20</td></tr>
+    </tbody>
+</table>"""
+    actual = parse_html(html_text, columns=['Price', 0, 'Missing'])
+    assert len(actual) == 1
+    assert actual[0].to_csv() == 'Name,Price\na,1\nb,2\n'
+
+
+def test_match_columns_drops_nested_tables():
+    html_text = """
+<table>
+    <tr>
+        <td><table><tr><td>1</td></tr></table></td>
+        <td><table><tr><td>2</td></tr></table></td>
+    </tr>
+</table>"""
+    actual = parse_html(html_text, columns=[1])
+    assert len(actual) == 1
+    assert actual[0].id == 2
+    assert len(actual[0].rows[0].cells) == 1
+    nested = actual[0].rows[0].cells[0].elements[0]
+    assert isinstance(nested, TRef) and nested.table.id == 1
+
+
+def test_match_columns_skips_tables_without_columns():
+    html_text = """
+<table><tr><td>a</td></tr></table>
+<table><tr><td>b</td><td>c</td></tr></table>"""
+    actual = parse_html(html_text, columns=[1])
+    assert [t.inner_text() for t in actual] == ['c']
+
+
+def test_match_columns_invalid():
+    with pytest.raises(ValueError):
+        parse_html('<table><tr><td>a</td></tr></table>', columns=[-1])
+
+
+#########################################################
+# filtering - row filter
+#########################################################
+
+
+def row_texts(row: TRow) -> list[str]:
+    return [cell.inner_text() for cell in row.cells]
+
+
+@pytest.mark.parametrize(
+    '_desc,html_text,row_filter',
+    [
+        ('it drops rejected rows', """
+<table>
+    <tr><td>a</td><td>1</td></tr>
+    <tr><td>b</td><td>2</td></tr>
+    <tr><td>c</td><td>3</td></tr>
+</table>
+        """,
+        lambda row: row_texts(row)[0] in ('a', 'c')),
+        ('it keeps rowspan from rejected rows', """
+<table>
+    <tr><td rowspan='3'>x</td><td>drop</td></tr>
+    <tr><td>keep</td></tr>
+    <tr><td colspan='2'>drop</td></tr>
+    <tr><td>keep</td><td>y</td></tr>
+</table>
+        """,
+        lambda row: 'drop' not in row_texts(row)),
+        ('it filters rows ended by row group', """
+<table>
+    <thead><tr><th>h</th></thead>
+    <tbody><tr><td>1</td><tr><td>2</td></tbody>
+</table>
+        """,
+        lambda row: row.group == 'thead' or row_texts(row) == ['2']),
+    ]
+)
+def test_match_row_filter(_desc, html_text, row_filter):
+    expected = parse_html(html_text)
+    for table in expected:
+        table.rows = [row for row in table.rows if row_filter(row)]
+
+    actual = parse_html(html_text, row_filter=row_filter)
+    assert actual == expected
+
+
+def test_match_row_filter_keeps_nested_rows():
+    html_text = """
+<table>
+    <tr><td>a</td><td><table><tr><td>b</td></tr><tr><td>c</td></tr></table></td></tr>
+    <tr><td>d</td><td>e</td></tr>
+</table>"""
+    seen = []
+    def row_filter(row):
+        seen.append(row_texts(row)[0])
+        return row_texts(row)[0] == 'a'
+
+    actual = parse_html(html_text, row_filter=row_filter)
+    assert seen == ['a', 'd']
+    assert len(actual) == 1
+    assert actual[0].inner_text() == 'a b\nc'
+
+
+def test_match_row_filter_skips_tables_without_rows():
+    html_text = """
+<table><tr><td>a</td></tr></table>
+<table><tr><td>b</td></tr></table>"""
+    actual = parse_html(html_text, row_filter=lambda row: row_texts(row) == ['b'])
+    assert [t.inner_text() for t in actual] == ['b']
+    assert actual[0].id == 1
+
+
+#########################################################
+# filtering - row window
+#########################################################
+
+
+@pytest.mark.parametrize(
+    '_desc,row_slice,max_rows,expected_texts',
+    [
+        ('it keeps rows up to max rows', None, 2, ['0', '1']),
+        ('it keeps rows in slice', (1, 3), None, ['1', '2']),
+        ('it keeps rows from slice start to end', (3, None), None, ['3', '4']),
+        ('it keeps rows in slice up to max rows', (1, None), 2, ['1', '2']),
+        ('it keeps no rows in empty slice', (2, 2), None, []),
+        ('it keeps no rows in slice past the end', (9, None), None, []),
+    ]
+)
+def test_match_row_window(_desc, row_slice, max_rows, expected_texts):
+    html_text = create_table_html_with_rows(5)
+    actual = parse_html(html_text, row_slice=row_slice, max_rows=max_rows)
+    assert [row.cells[0].inner_text() for t in actual for row in t.rows] == expected_texts
+
+
+def test_match_row_window_keeps_rowspan_from_skipped_rows():
+    html_text = """
+<table>
+    <tr><td rowspan='3'>a</td><td>0</td></tr>
+    <tr><td>1</td></tr>
+    <tr><td>2</td></tr>
+    <tr><td>b</td><td>3</td></tr>
+</table>"""
+    actual = parse_html(html_text, row_slice=(2, None), max_rows=1)
+    assert len(actual) == 1
+    assert actual[0].inner_text() == 'a 2'
+
+
+def test_match_row_window_passes_over_rest_of_table():
+    nested = '<table><tr><td>n</td></tr></table>'
+    html_text = f"""
+<table>
+    <tr><td>0</td></tr>
+    <tr><td>1{nested}</td></tr>
+    <tr><td>2<!-- </table> --><script>"</table>"</script>{nested}</td></tr>
+</table>
+<table><tr><td>z</td></tr></table>"""
+    actual = parse_html(html_text, max_rows=1)
+    assert [t.inner_text() for t in actual] == ['0', 'z']
+    assert [t.id for t in actual] == [0, 1]
+
+
+@pytest.mark.parametrize(
+    '_desc,markup',
+    [
+        ('it skips CDATA sections', '<![CDATA[ </table> ]]>'),
+        ('it skips conditional comments', '<![if </table>]>'),
+        ('it skips processing instructions', '<?php echo "</table>" ?>'),
+        ('it skips declarations', '<!x </table>'),
+        ('it skips end tags without a name', '</ 3</table>'),
+        ('it skips comments ending with spaces', '<!-- </table> -- >'),
+    ]
+)
+def test_match_row_window_skips_markup(_desc, markup):
+    # Enough rows for the rest of the table to be jumped over
+    rows = ''.join(f"<tr><td>{r}</td></tr>" for r in range(5000))
+    html_text = f"""
+<table>
+    {rows}
+    <tr><td>1{markup}<table><tr><td>n</td></tr></table></td></tr>
+</table>
+<table><tr><td>z</td></tr></table>"""
+    actual = parse_html(html_text, max_rows=1)
+    assert [t.inner_text() for t in actual] == ['0', 'z']
+    assert [t.id for t in actual] == [0, 1]
+
+
+def test_match_row_window_jumps_over_large_table():
+    html_text = create_table_html_with_rows(20000) + create_table_html_with_rows(3)
+    actual = parse_html(html_text, max_rows=2)
+    assert [[row.cells[0].inner_text() for row in t.rows] for t in actual] == [['0', '1'], ['0', '1']]
+
+
+@pytest.mark.parametrize('spans', ['char', 'byte'])
+def test_match_row_window_spans_after_jump(spans):
+    rows = ''.join(f"<tr><td>é{r}</td></tr>\n" for r in range(20000))
+    html_text = f"<table>\n{rows}</table>\n<p>€</p><table><tr><td>z</td></tr></table>"
+    actual = parse_html(html_text, max_rows=1, spans=spans)
+    source = html_text if spans == 'char' else html_text.encode('utf-8')
+    assert actual[1].source_html(source) == '<table><tr><td>z</td></tr></table>'
+    assert actual[1].rows[0].cells[0].source_html(source, inner=True) == 'z'
+
+
+def test_match_row_window_does_not_jump_in_script():
+    # The chunk fed to the parser ends within the script
+    script = f"<script>{'x' * 70000}'</table><table><tr><td>y</td></tr></table>'</script>"
+    html_text = f"<table><tr><td>0</td></tr><tr><td>{script}</td></tr></table><table><tr><td>z</td></tr></table>"
+    actual = parse_html(html_text, max_rows=1)
+    assert [t.inner_text() for t in actual] == ['0', 'z']
+
+
+@pytest.mark.parametrize(
+    '_desc,row_slice,max_rows',
+    [
+        ('it rejects negative start', (-1, None), None),
+        ('it rejects negative stop', (0, -1), None),
+        ('it rejects zero max rows', None, 0),
+    ]
+)
+def test_match_row_window_invalid(_desc, row_slice, max_rows):
+    with pytest.raises(ValueError):
+        parse_html(create_table_html_with_rows(1), row_slice=row_slice, max_rows=max_rows)
+
+
+#########################################################
+# nested tables
+#########################################################
+
+
+@pytest.mark.parametrize(
+    '_desc,nested,expected',
+    [
+        ('it references nested tables', 'ref',
+        [
+            Table(id=2, rows=[
+                TRow(group='tbody', cells=[
+                    TCell(header=False, elements=[
+                        TText(text='a '),
+                        TRef(table=Table(id=1, rows=[
+                            TRow(group='tbody', cells=[
+                                TCell(header=False, elements=[TText(text=' b ')]),
+                                TCell(header=False, elements=[
+                                    TRef(table=Table(id=0, rows=[
+                                        TRow(group='tbody', cells=[
+                                            TCell(header=False, elements=[TText(text='c')]),
+                                        ]),
+                                    ])),
+                                ]),
+                            ]),
+                            TRow(group='tbody', cells=[
+                                TCell(header=False, elements=[TText(text='d')]),
+                            ]),
+                        ])),
+                        TText(text=' e'),
+                    ]),
+                ]),
+            ]),
+        ]),
+        ('it ignores nested tables', 'ignore',
+        [
+            Table(id=0, rows=[
+                TRow(group='tbody', cells=[
+                    TCell(header=False, elements=[
+                        TText(text='a  e'),
+                    ]),
+                ]),
+            ]),
+        ]),
+        ('it flattens nested tables to text', 'flatten_text',
+        [
+            Table(id=0, rows=[
+                TRow(group='tbody', cells=[
+                    TCell(header=False, elements=[
+                        TText(text='a b c\nd e'),
+                    ]),
+                ]),
+            ]),
+        ]),
+    ]
+)
+def test_nested(_desc, nested, expected):
+    html_text = """
+<table>
+    <tr><td>a <table>
+        <tr><td> b </td><td><table><tr><td>c</td></tr></table></td></tr>
+        <tr><td>d<table></table></td></tr>
+    </table> e</td></tr>
+</table>"""
+    actual = parse_html(html_text, nested=nested)
+    assert actual == expected
+
+
+@pytest.mark.parametrize('nested', ['ref', 'ignore', 'flatten_text'])
+def test_nested_keeps_following_tables(nested):
+    html_text = """
+<table><tr><td>a<table><tr><td>b</td></tr></table></td><td>c</td></tr></table>
+<table><tr><td>d</td></tr></table>"""
+    actual = parse_html(html_text, nested=nested)
+    assert [[c.inner_text() for c in t.rows[0].cells] for t in actual] == [
+        ['ab' if nested != 'ignore' else 'a', 'c'],
+        ['d'],
+    ]
+
+
+@pytest.mark.parametrize(
+    '_desc,html_text,columns,expected',
+    [
+        ('it attaches a table after the row to the last cell of the row',
+        "<table><tr><td>A</td><td rowspan='2'>B</td></tr><tr><td>C</td></tr><table><tr><td>N</td></tr></table></table>",
+        None, [['A', 'BN'], ['C', 'BN']]),
+        ('it drops a table after the row with the last cell outside the projection',
+        "<table><tr><td>A</td><td>B</td></tr><table><tr><td>N</td></tr></table></table>",
+        [0], [['A']]),
+        ('it drops a table before any cell',
+        "<table><table><tr><td>N</td></tr></table><tr><td>A</td></tr></table>",
+        None, [['A']]),
+    ]
+)
+def test_nested_outside_cell(_desc, html_text, columns, expected):
+    actual = parse_html(html_text, columns=columns)
+    assert [[c.inner_text() for c in row.cells] for row in actual[0].rows] == expected
+
+
+def test_nested_invalid():
+    with pytest.raises(ValueError):
+        parse_html('<table><tr><td>a</td></tr></table>', nested='flatten')
+
+
+#########################################################
+# text mode
+#########################################################
+
+
+def test_text_mode():
+    html_text = """
+<table>
+    <tr><th> A\n  b </th><th rowspan='2'><a href='x'>link</a><br>text</th></tr>
+    <tr><td>1 <table><tr><td>2</td><td>3</td></tr></table></td></tr>
+</table>"""
+    spanned = TTextCell(header=True, text='link\ntext')
+    expected = [
+        Table(id=0, rows=[
+            TRow(group='tbody', cells=[
+                TTextCell(header=True, text='A   b'),
+                spanned,
+            ]),
+            TRow(group='tbody', cells=[
+                TTextCell(header=False, text='1 2 3'),
+                spanned,
+            ]),
+        ]),
+    ]
+    actual = parse_html(html_text, mode='text')
+    assert actual == expected
+    assert actual[0].rows[0].cells[1] is actual[0].rows[1].cells[1]
+
+
+def test_text_mode_matches_elements_mode_text():
+    html_text = """
+<table>
+    <tr><td colspan='2'>a &amp; <b>b</b></td><td>  </td></tr>
+    <tr><td>c<br/>d</td><td><a href='y'>e</a> f</td><td>g</td></tr>
+</table>"""
+    expected = parse_html(html_text)
+    actual = parse_html(html_text, mode='text')
+    assert actual[0].to_csv() == expected[0].to_csv()
+    assert actual[0].to_html() == expected[0].to_html().replace("<a href='y'>e</a>", 'e')
+
+
+def test_text_cell_elements():
+    cell = TTextCell(text='a')
+    assert cell.elements == (TText(text='a'),)
+    assert not TTextCell().elements
+    assert cell.inner_text() == 'a'
+    with pytest.raises(AttributeError):
+        cell.elements.append(TText(text='b'))  # type: ignore[attr-defined]
+
+
+def test_text_cell_replace():
+    cell = TTextCell(header=True, text='a b', span=(1, 2))
+    assert dataclasses.replace(cell) == cell
+    assert dataclasses.replace(cell, span=(3, 4)).span == (3, 4)
+    assert dataclasses.replace(cell, text='c').text == 'c'
+    assert dataclasses.replace(cell, elements=[TText(text=' d '), TLink(text='e')]).text == 'd e'
+
+
+#########################################################
+# source spans
+#########################################################
+
+
+def test_spans_char():
+    html_text = """<p>before</p>
+<table id='t'>
+    <tr><th>A</th><td class='x'>1 <b>2</b></td></tr>
+    <tr><td>3<td>4
+</table>"""
+    actual = parse_html(html_text, spans='char')
+    table = actual[0]
+    assert table.source_html(html_text) == html_text[html_text.index('<table'):]
+    assert table.source_html(html_text, inner=True) == html_text[html_text.index('\n    <tr>'):html_text.index('</table>')]
+    cells = [cell for row in table.rows for cell in row.cells]
+    assert [cell.source_html(html_text) for cell in cells] == [
+        '<th>A</th>',
+        "<td class='x'>1 <b>2</b></td>",
+        '<td>3',
+        '<td>4\n',
+    ]
+    assert [cell.source_html(html_text, inner=True) for cell in cells] == ['A', '1 <b>2</b>', '3', '4\n']
+
+
+def test_spans_nested():
+    html_text = "<table><tr><td>a<table><tr><td>b</td></tr></table></td></tr></table>"
+    actual = parse_html(html_text, spans='char')
+    cell = actual[0].rows[0].cells[0]
+    assert actual[0].source_html(html_text) == html_text
+    assert cell.source_html(html_text, inner=True) == 'a<table><tr><td>b</td></tr></table>'
+    child = cell.elements[1].table
+    assert child.source_html(html_text) == '<table><tr><td>b</td></tr></table>'
+    assert child.rows[0].cells[0].source_html(html_text) == '<td>b</td>'
+
+
+def test_spans_text_mode():
+    html_text = "<table><tr><td>a</td><td>b</table>"
+    actual = parse_html(html_text, spans='char', mode='text')
+    assert [cell.source_html(html_text) for cell in actual[0].rows[0].cells] == ['<td>a</td>', '<td>b']
+
+
+def test_spans_byte(tmp_path):
+    html_text = "<table>\r\n<tr><td>é</td><td>€ 5</td></tr>\r\n</table>"
+    file_path = tmp_path / 'spans.html'
+    file_path.write_bytes(html_text.encode('utf-8'))
+    actual = parse_html(file_path, spans='byte')
+    with file_path.open('rb') as file, mmap(file.fileno(), 0, access=ACCESS_READ) as source:
+        assert actual[0].source_html(source) == html_text
+        assert [cell.source_html(source, inner=True) for cell in actual[0].rows[0].cells] == ['é', '€ 5']
+    assert actual[0].rows[0].cells[1].source_html(html_text.encode('utf-8')) == '<td>€ 5</td>'
+
+
+def test_spans_not_recorded():
+    html_text = "<table><tr><td>a</td></tr></table>"
+    actual = parse_html(html_text)
+    assert actual[0].span is None
+    assert actual[0].rows[0].cells[0].span is None
+    with pytest.raises(ValueError, match='No source span'):
+        actual[0].source_html(html_text)
+
+
+def test_spans_invalid():
+    with pytest.raises(ValueError, match='spans must be'):
+        parse_html('', spans='line')
+
+
+#########################################################
+# lazy tables
+#########################################################
+
+
+def test_lazy():
+    html_text = """
+<table id='a'><tr><td>1<table><tr><td>2</td></tr></table></td></tr></table>
+<table><tr><td> </td></tr></table>
+<table><tr><td><table><tr><td>3</td></tr></table></td></tr></table>
+<table id='b'><tr><th colspan='2'>4</th></tr></table>"""
+    expected = parse_html(html_text)
+    actual = parse_html(html_text, lazy=True)
+    assert [t.id for t in actual] == [1, 4, 5]
+    assert all(isinstance(t, LazyTable) for t in actual)
+    assert not any(t.is_loaded() for t in actual)
+    assert actual[2].info.attrs == {'id': 'b'}
+    assert (actual[2].info.row_count, actual[2].info.max_width) == (1, 2)
+
+    assert actual[2] == expected[2]
+    assert actual[2].is_loaded()
+    assert not actual[0].is_loaded()
+    assert actual == expected
+
+
+@pytest.mark.parametrize(
+    '_desc,options',
+    [
+        ('it matches text', {'match': '3'}),
+        ('it matches attributes', {'attrs': {'id': 'c'}}),
+        ('it ignores nested tables', {'nested': 'ignore'}),
+        ('it flattens nested tables', {'nested': 'flatten_text'}),
+        ('it builds text cells', {'mode': 'text'}),
+        ('it includes hidden tables', {'displayed_only': False}),
+    ]
+)
+def test_lazy_same_as_eager(_desc, options):
+    html_text = """
+<table><tr><td>1<table id='c'><tr><td>2</td></tr></table></td></tr></table>
+<table style='display: none'><tr><td><table><tr><td>3</td></tr></table></td></tr></table>
+<table id='c'><tr><td><a href='x'>4</a></td></tr></table>"""
+    expected = parse_html(html_text, **options)
+    actual = parse_html(html_text, lazy=True, **options)
+    assert [t.id for t in actual] == [t.id for t in expected]
+    assert actual == expected
+
+
+def test_lazy_skips_markup():
+    html_text = """
+<table><tr><td>a<![CDATA[ </table> ]]><table><tr><td>n</td></tr></table></td></tr></table>
+<table><tr><td>b</td></tr></table>"""
+    expected = parse_html(html_text)
+    actual = parse_html(html_text, lazy=True)
+    assert [t.id for t in actual] == [1, 2]
+    assert [t.inner_text() for t in actual] == [t.inner_text() for t in expected]
+
+
+def test_lazy_falls_back_to_document(monkeypatch):
+    html_text = """
+<table><tr><td>1<table><tr><td>2</td></tr></table></td></tr></table>
+<table><tr><td>3</td></tr></table>"""
+    expected = parse_html(html_text)
+    actual = parse_html(html_text, lazy=True)
+    # As when the scan finds a range that does not parse to the table
+    monkeypatch.setattr('html_table_takeout.lazy._parse_range', lambda *args: None)
+    assert actual == expected
+    assert parse_html(html_text, lazy=True, match='3') == parse_html(html_text, match='3')
+
+
+def test_lazy_spans():
+    html_text = "<p>é</p><table><tr><td>a</td><td>€<table><tr><td>b</td></tr></table></td></tr></table>"
+    table = parse_html(html_text, lazy=True, spans='byte')[0]
+    source = html_text.encode('utf-8')
+    assert table.source_html(source) == html_text[html_text.index('<table'):]
+    child = table.rows[0].cells[1].elements[1].table
+    assert child.source_html(source) == '<table><tr><td>b</td></tr></table>'
+    assert child.rows[0].cells[0].source_html(source, inner=True) == 'b'
+
+
+@pytest.mark.parametrize(
+    'options',
+    [
+        {'select': 'table'},
+        {'columns': [0]},
+        {'row_filter': bool},
+        {'row_slice': (0, 1)},
+        {'max_rows': 1},
+    ]
+)
+def test_lazy_invalid(options):
+    with pytest.raises(ValueError, match='lazy cannot be combined'):
+        parse_html('', lazy=True, **options)
+
+
+#########################################################
+# parse stats
+#########################################################
+
+
+def test_stats():
+    html_text = """
+<table class='a'><tr><td rowspan='2' colspan='3'><a href='x'>1</a></td><td>2</td></tr><tr><td>3</td></tr></table>
+<table><tr><td> </td></tr></table>
+<table><tr><td>4<table><tr><th>5</th></tr></table></td></tr></table>
+<table id='b'><tr><td>6</td></tr></table>
+<table></table>"""
+    stats = ParseStats()
+    tables = parse_html(html_text, match='1', attrs={'class': 'a'}, stats=stats)
+    assert [t.id for t in tables] == [0]
+    assert stats.bytes_in == 0
+    assert stats.chars_in == len(html_text)
+    assert stats.tags_seen == 20
+    assert stats.tables_built == 1
+    # Tables outside of the matching table are each checked as root tables
+    assert stats.tables_discarded == {'attrs': 5}
+    assert stats.cells_created == 3
+    # colspan fills 2 more places in the first row and rowspan 3 in the next
+    assert stats.span_expansions == 5
+    assert stats.links_extracted == 1
+    assert stats.feed_time > 0
+    assert stats.read_time == stats.decode_time == 0
+
+    stats = ParseStats()
+    parse_html(html_text, match='1', stats=stats)
+    assert stats.tables_built == 5
+    assert stats.tables_discarded == {'empty': 2, 'match': 2}
+    assert stats.cells_created == 7
+
+    parse_html(html_text, select='table#b', stats=stats)
+    assert stats.tables_discarded == {'empty': 2, 'match': 2, 'select': 5}
+    assert stats.tables_built == 6
+
+
+def test_stats_file(tmp_path):
+    file_path = tmp_path / 'stats.html'
+    file_path.write_bytes('<table><tr><td>é</td></tr></table>'.encode('utf-8'))
+    stats = ParseStats()
+    parse_html(file_path, stats=stats)
+    assert stats.bytes_in == 35
+    assert stats.chars_in == 34
+    assert stats.read_time > 0
+    assert stats.decode_time > 0
+    assert stats.total_time() == stats.read_time + stats.decode_time + stats.feed_time + stats.filter_time
+
+
 #########################################################
 # filtering - combination
 #########################################################
@@ -1812,6 +2555,13 @@ def test_file_does_not_exist():
         parse_html(file_path)
 
 
+def test_file_line_endings(tmp_path):
+    file_path = tmp_path / 'line_endings.html'
+    file_path.write_bytes(b'<table><tr><td>1<br>\r\n2\r3</td></tr></table>\r\n')
+    assert parse_html(file_path, mode='text')[0].rows[0].cells[0].text == '1\n 2 3'
+    assert parse_html(file_path, spans='char')[0].span == (0, 43)
+
+
 #########################################################
 # test url input
 #########################################################
@@ -0,0 +1,88 @@
+import pytest
+
+from html_table_takeout import TableReparser, parse_html
+
+
+#########################################################
+# test helpers
+#########################################################
+
+
+def create_html(texts: list[str]) -> str:
+    # A page with a root table for each text, the first with a descendant table
+    tables = [f"<table><tr><td>{texts[0]}<table><tr><td>child</td></tr></table></td></tr></table>"]
+    tables += [f"<table><tr><td>{t}</td></tr></table>" for t in texts[1:]]
+    return '\n<p>é</p>\n'.join(tables)
+
+
+#########################################################
+# TableReparser
+#########################################################
+
+
+def test_reparse_reuses_unchanged_tables():
+    reparser = TableReparser()
+    first = reparser.parse(create_html(['a', 'b', 'c']))
+    assert first.tables == parse_html(create_html(['a', 'b', 'c']))
+    assert first.changed_ids == [1, 2, 3]
+    assert not first.removed_ids
+
+    html_text = create_html(['a', 'B', 'c'])
+    second = reparser.parse(html_text)
+    assert second.tables == parse_html(html_text)
+    assert second.changed_ids == [2]
+    assert second.removed_ids == [2]
+    assert second.tables[0] is first.tables[0]
+    assert second.tables[2] is first.tables[2]
+
+
+def test_reparse_renumbers_moved_tables():
+    reparser = TableReparser()
+    first = reparser.parse(create_html(['a', 'b']))
+    html_text = create_html(['x', 'y', 'a', 'b'])
+    second = reparser.parse(html_text)
+    assert second.tables == parse_html(html_text)
+    assert [t.id for t in second.tables] == [1, 2, 3, 4]
+    # 'a' no longer has the descendant table
+    assert second.changed_ids == [1, 2, 3]
+    assert second.removed_ids == [1]
+    assert second.tables[3] is first.tables[1]
+
+
+def test_reparse_spans():
+    reparser = TableReparser(spans='byte')
+    reparser.parse(create_html(['a', 'b']))
+    html_text = create_html(['€', 'b'])
+    table = reparser.parse(html_text).tables[1]
+    assert table.source_html(html_text.encode('utf-8')) == '<table><tr><td>b</td></tr></table>'
+    assert table.rows[0].cells[0].source_html(html_text.encode('utf-8'), inner=True) == 'b'
+
+
+def test_reparse_match():
+    reparser = TableReparser(match='b')
+    assert reparser.parse(create_html(['a', 'b'])).changed_ids == [2]
+    result = reparser.parse(create_html(['a', 'b', 'ab']))
+    assert result.tables == parse_html(create_html(['a', 'b', 'ab']), match='b')
+    assert result.changed_ids == [3]
+
+
+def test_reparse_updates_previous_tables():
+    reparser = TableReparser()
+    first = reparser.parse(create_html(['a', 'b']))
+    second = reparser.parse(create_html(['x', 'a', 'b']))
+    assert second.tables[2] is first.tables[1]
+    assert first.tables[1].id == 3
+
+
+def test_reparse_falls_back_to_document(monkeypatch):
+    html_text = create_html(['a', 'b'])
+    # As when the scan finds a range that does not parse to the table
+    monkeypatch.setattr('html_table_takeout.reparse._parse_range', lambda *args: None)
+    result = TableReparser().parse(html_text)
+    assert result.tables == parse_html(html_text)
+    assert result.changed_ids == [1, 2]
+
+
+def test_reparse_invalid():
+    with pytest.raises(ValueError, match='mode must be'):
+        TableReparser(mode='rows')
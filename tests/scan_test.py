@@ -0,0 +1,155 @@
+from mmap import mmap, ACCESS_READ
+import pytest
+
+from html_table_takeout import Table, TRow, TCell, TText, TableInfo, parse_html, scan_tables, parse_table_at
+
+
+#########################################################
+# test helpers
+#########################################################
+
+
+HTML_TEXT = """<p>before</p>
+<table id='a' class='wide'>
+    <caption> Prices  by year </caption>
+    <thead><tr><th>Year</th><th colspan='2'>Price</th></tr></thead>
+    <tr><td rowspan='2'>2024</td><td>1</td><td>2<table id='b'><tr><td>x</td></tr></table></td></tr>
+    <tr><td>3</td><td>4</td></tr>
+</table>
+<table style='display: none'><tr><td>hidden</td></tr></table>
+<table id='c'><tr><td>é €</td></tr></table>"""
+
+
+#########################################################
+# scan_tables
+#########################################################
+
+
+def test_scan_tables():
+    outer_start = HTML_TEXT.index("<table id='a'")
+    inner_start = HTML_TEXT.index("<table id='b'")
+    last_start = HTML_TEXT.index("<table id='c'")
+    assert scan_tables(HTML_TEXT) == [
+        TableInfo(
+            index=0, parent=None, depth=0, attrs={'id': 'a', 'class': 'wide'},
+            row_count=3, max_width=3,
+            span=(outer_start, HTML_TEXT.index('</table>\n<table style') + len('</table>')),
+            caption='Prices by year', preview=['Year', 'Price'],
+        ),
+        TableInfo(
+            index=1, parent=0, depth=1, attrs={'id': 'b'},
+            row_count=1, max_width=1,
+            span=(inner_start, HTML_TEXT.index('</table>', inner_start) + len('</table>')),
+            preview=['x'],
+        ),
+        TableInfo(
+            index=2, parent=None, depth=0, attrs={'id': 'c'},
+            row_count=1, max_width=1,
+            span=(last_start, len(HTML_TEXT)),
+            preview=['é €'],
+        ),
+    ]
+
+
+def test_scan_tables_hidden():
+    infos = scan_tables(HTML_TEXT, displayed_only=False)
+    assert [info.attrs.get('id') for info in infos] == ['a', 'b', None, 'c']
+
+
+@pytest.mark.parametrize(
+    '_desc,html_text,expected_row_count,expected_max_width',
+    [
+        ('it counts empty rows', '<table><tr></tr><tr><td>1</td></tr></table>', 2, 1),
+        ('it counts cells carried by rowspan', '<table><tr><td rowspan=3>1</td></tr><tr></tr><tr><td>2</td></tr></table>', 3, 2),
+        ('it does not carry rowspan across row groups', '<table><tr><td rowspan=2>1</td></tr><tbody><tr><td>2</td></tr></table>', 2, 1),
+        ('it ignores cells outside rows', '<table><td>1</td><td>2</td></table>', 0, 0),
+        ('it does not count descendant rows', '<table><tr><td><table><tr><td>1</td><td>2</td></tr></table></td></tr></table>', 1, 1),
+    ]
+)
+def test_scan_tables_dimensions(_desc, html_text, expected_row_count, expected_max_width):
+    info = scan_tables(html_text)[0]
+    assert info.row_count == expected_row_count
+    assert info.max_width == expected_max_width
+
+
+@pytest.mark.parametrize(
+    '_desc,markup',
+    [
+        ('it skips comments', '<!-- </table> -->'),
+        ('it skips CDATA sections', '<![CDATA[ </table> ]]>'),
+        ('it skips processing instructions', '<?php echo "</table>" ?>'),
+        ('it skips declarations', '<!x </table>'),
+        ('it skips end tags without a name', '</ 3</table>'),
+        ('it skips spaced end tags with attributes', '</ table x>'),
+        ('it skips a table in CDATA sections', '<![CDATA[ <table> ]]>'),
+    ]
+)
+def test_scan_tables_skips_markup(_desc, markup):
+    html_text = f"""
+<table><tr><td>a{markup}<table><tr><td>n</td></tr></table></td></tr></table>
+<table><tr><td>b</td></tr></table>"""
+    infos = scan_tables(html_text)
+    assert [(info.parent, info.depth, info.row_count) for info in infos] == [(None, 0, 1), (0, 1, 1), (None, 0, 1)]
+    expected = [t.inner_text() for t in parse_html(html_text)]
+    assert [parse_table_at(html_text, info).inner_text() for info in infos if info.depth == 0] == expected
+
+
+def test_scan_tables_spaced_end_tag():
+    html_text = '<table><tr><td>a</td></tr></ table><table><tr><td>b</td></tr></table>'
+    assert [(info.depth, info.span) for info in scan_tables(html_text)] == [(0, (0, 35)), (0, (35, 69))]
+    assert len(parse_html(html_text)) == 2
+
+
+def test_scan_tables_unclosed():
+    html_text = '<table><tr><td>1</td></tr>'
+    info = scan_tables(html_text)[0]
+    assert info.span == (0, len(html_text))
+    # Unclosed tables are not returned by parse_html either
+    assert parse_table_at(html_text, info) is None
+
+
+def test_scan_tables_preview_length():
+    info = scan_tables(f"<table><tr><td>{'x' * 100}</td></tr></table>")[0]
+    assert info.preview == ['x' * 40]
+
+
+def test_scan_tables_invalid_spans():
+    with pytest.raises(ValueError, match='spans must be'):
+        scan_tables(HTML_TEXT, spans='line')
+
+
+#########################################################
+# parse_table_at
+#########################################################
+
+
+def test_parse_table_at():
+    infos = scan_tables(HTML_TEXT)
+    expected = Table(id=0, rows=[
+        TRow(group='tbody', cells=[TCell(header=False, elements=[TText(text='x')])]),
+    ])
+    assert parse_table_at(HTML_TEXT, infos[1]) == expected
+    assert parse_table_at(HTML_TEXT, infos[0]) == parse_html(HTML_TEXT)[0]
+    assert parse_table_at(HTML_TEXT, infos[0], columns=[0]).max_width() == 1
+
+
+def test_parse_table_at_spans():
+    infos = scan_tables(HTML_TEXT)
+    table = parse_table_at(HTML_TEXT, infos[0], spans=True)
+    assert table.source_html(HTML_TEXT) == HTML_TEXT[infos[0].span[0]:infos[0].span[1]]
+    assert table.rows[1].cells[0].source_html(HTML_TEXT) == "<td rowspan='2'>2024</td>"
+
+
+def test_parse_table_at_bytes(tmp_path):
+    file_path = tmp_path / 'tables.html'
+    file_path.write_bytes(HTML_TEXT.encode('utf-8'))
+    infos = scan_tables(file_path, spans='byte')
+    with file_path.open('rb') as file, mmap(file.fileno(), 0, access=ACCESS_READ) as source:
+        table = parse_table_at(source, infos[-1], spans=True)
+        assert table.inner_text() == 'é €'
+        assert table.rows[0].cells[0].source_html(source, inner=True) == 'é €'
+
+
+def test_parse_table_at_no_cells():
+    info = scan_tables('<table><tr></tr></table>')[0]
+    assert parse_table_at('<table><tr></tr></table>', info) is None
@@ -0,0 +1,125 @@
+from datetime import date
+from decimal import Decimal
+import pytest
+
+from html_table_takeout import Table, TRow, TCell, TText, TypedColumn
+from html_table_takeout.schema import convert_column, infer_column_type
+
+
+#########################################################
+# test helpers
+#########################################################
+
+
+def create_table(header: list[str], rows: list[list[str]]) -> Table:
+    table = Table(id=0, rows=[
+        TRow(group='thead', cells=[TCell(header=True, elements=[TText(text=h)]) for h in header]),
+    ])
+    for r in rows:
+        table.rows.append(TRow(group='tbody', cells=[TCell(header=False, elements=[TText(text=t)]) for t in r]))
+    return table
+
+
+#########################################################
+# infer_column_type
+#########################################################
+
+
+@pytest.mark.parametrize(
+    '_desc,texts,decimal,expected',
+    [
+        ('it infers int', ['1', '-2', '1,234', '(12)', '+5', '$3'], False, 'int'),
+        ('it infers float', ['1.5', '1,234.5', '(12.0)', '.5', '7'], False, 'float'),
+        ('it infers float for percentage', ['3.4%', '5%'], False, 'float'),
+        ('it infers decimal', ['1.50', '2'], True, 'decimal'),
+        ('it keeps int when decimal is set', ['1', '2'], True, 'int'),
+        ('it infers iso date', ['2024-01-31', '1999-12-01'], False, 'date'),
+        ('it infers date with month name', ['January 5, 2024', 'March 10, 2023'], False, 'date'),
+        ('it infers str', ['1', 'abc'], False, 'str'),
+        ('it infers str for bad number', ['1,23'], False, 'str'),
+        ('it infers str for unbalanced parentheses', ['(1'], False, 'str'),
+        ('it infers str for invalid date', ['2024-02-30'], False, 'str'),
+        ('it ignores null texts', ['—', '', 'N/A', '4', '-'], False, 'int'),
+        ('it infers str when all null', ['—', ''], False, 'str'),
+        ('it infers str when empty', [], False, 'str'),
+    ]
+)
+def test_infer_column_type(_desc, texts, decimal, expected):
+    assert infer_column_type(texts, decimal=decimal) == expected
+
+
+def test_infer_column_type_sample_spread():
+    texts = ['1'] * 100 + ['x']
+    assert infer_column_type(texts, sample_size=10) == 'int'
+    assert infer_column_type(texts, sample_size=101) == 'str'
+
+
+#########################################################
+# convert_column
+#########################################################
+
+
+@pytest.mark.parametrize(
+    '_desc,texts,column_type,expected',
+    [
+        ('it converts int', ['1,234', '(12)', '—', '−3'], 'int',
+            TypedColumn(type='int', values=[1234, -12, None, -3])),
+        ('it converts float', ['1,234.5', '(12.0)', '3.4%', '', '- 2'], 'float',
+            TypedColumn(type='float', values=[1234.5, -12.0, 0.034, None, -2.0])),
+        ('it converts decimal', ['1,234.50', '(0.1)', '3.4%'], 'decimal',
+            TypedColumn(type='decimal', values=[Decimal('1234.50'), Decimal('-0.1'), Decimal('0.034')])),
+        ('it converts date', ['5 Jan 2024', '10 Mar 2023', 'n/a'], 'date',
+            TypedColumn(type='date', values=[date(2024, 1, 5), date(2023, 3, 10), None])),
+        ('it keeps str including null texts', ['a', '—'], 'str',
+            TypedColumn(type='str', values=['a', '—'])),
+        ('it reports failures', ['1', 'x', '2', 'x', '3.5'], 'int',
+            TypedColumn(type='int', values=[1, None, 2, None, None], errors=[(1, 'x'), (3, 'x'), (4, '3.5')])),
+    ]
+)
+def test_convert_column(_desc, texts, column_type, expected):
+    assert convert_column(texts, column_type) == expected
+
+
+#########################################################
+# Table infer_schema, to_typed_columns
+#########################################################
+
+
+def test_table_infer_schema():
+    table = create_table(
+        ['Name', 'Price', 'Change', 'Date', ''],
+        [
+            ['A', '1,234.5', '3.4%', '2024-01-31', '1'],
+            ['B', '(12.0)', '—', '2024-02-01', '2'],
+            ['C', '7'],
+        ],
+    )
+    assert table.infer_schema() == {
+        'Name': 'str',
+        'Price': 'float',
+        'Change': 'float',
+        'Date': 'date',
+        'column_5': 'int',
+    }
+    assert table.infer_schema(decimal=True)['Price'] == 'decimal'
+
+
+def test_table_to_typed_columns():
+    table = create_table(
+        ['Name', 'Price', 'Qty'],
+        [
+            ['A', '1,234.5', '1'],
+            ['B', '(12.0)', 'many'],
+            ['C', '—', '3'],
+        ],
+    )
+    assert table.to_typed_columns(schema={'Qty': 'int'}) == {
+        'Name': TypedColumn(type='str', values=['A', 'B', 'C']),
+        'Price': TypedColumn(type='float', values=[1234.5, -12.0, None]),
+        'Qty': TypedColumn(type='int', values=[1, None, 3], errors=[(1, 'many')]),
+    }
+
+
+def test_table_to_typed_columns_no_records():
+    table = create_table(['Name'], [])
+    assert table.to_typed_columns() == {'Name': TypedColumn(type='str')}
@@ -0,0 +1,118 @@
+import pytest
+
+from html_table_takeout import Selector
+from html_table_takeout.selector import _ElementStack
+
+
+#########################################################
+# test helpers
+#########################################################
+
+
+def create_stack(tags: list[str | tuple[str, dict[str, str | None]]]) -> _ElementStack:
+    # '/tag' closes an element, any other tag opens one
+    stack = _ElementStack()
+    for tag in tags:
+        if isinstance(tag, tuple):
+            stack.push(*tag)
+        elif tag.startswith('/'):
+            stack.pop(tag[1:])
+        else:
+            stack.push(tag, {})
+    return stack
+
+
+#########################################################
+# Selector
+#########################################################
+
+
+@pytest.mark.parametrize(
+    '_desc,selector,tags,expected',
+    [
+        ('it matches type', 'table',
+        ['table'], True),
+        ('it does not match other type', 'div',
+        ['table'], False),
+        ('it matches universal', '*',
+        ['table'], True),
+        ('it matches id', 'table#a',
+        [('table', {'id': 'a'})], True),
+        ('it does not match other id', '#a',
+        [('table', {'id': 'ab'})], False),
+        ('it matches one of many classes', '.data',
+        [('table', {'class': 'wide  data sortable'})], True),
+        ('it matches all classes', '.data.wide',
+        [('table', {'class': 'wide data'})], True),
+        ('it does not match class substring', '.data',
+        [('table', {'class': 'database'})], False),
+        ('it matches attribute presence', '[border]',
+        [('table', {'border': None})], True),
+        ('it matches attribute value', '[border="1"]',
+        [('table', {'border': '1'})], True),
+        ('it matches attribute prefix', '[id^=stats-]',
+        [('table', {'id': 'stats-2024'})], True),
+        ('it does not match empty attribute prefix', '[id^=""]',
+        [('table', {'id': 'stats-2024'})], False),
+        ('it matches attribute suffix', "[id$='-2024']",
+        [('table', {'id': 'stats-2024'})], True),
+        ('it matches attribute substring', '[summary*="per capita"]',
+        [('table', {'summary': 'GDP per capita by year'})], True),
+        ('it matches attribute word', '[class~=data]',
+        [('table', {'class': 'wide data'})], True),
+        ('it matches descendant', 'div.content table',
+        [('div', {'class': 'content'}), 'section', 'table'], True),
+        ('it does not match missing ancestor', 'div.content table',
+        ['div', 'table'], False),
+        ('it does not match closed ancestor', 'section table',
+        ['section', '/section', 'table'], False),
+        ('it matches child', 'section > table',
+        ['section', 'table'], True),
+        ('it does not match grandchild as child', 'section > table',
+        ['section', 'div', 'table'], False),
+        ('it backtracks over ancestors', 'div > section table',
+        ['div', 'section', 'section', 'table'], True),
+        ('it matches nth-of-type', 'table:nth-of-type(2)',
+        ['table', '/table', 'p', 'br', '/p', 'table'], True),
+        ('it does not match other nth-of-type', 'table:nth-of-type(1)',
+        ['table', '/table', 'table'], False),
+        ('it matches nth-of-type formula', 'table:nth-of-type(2n+1)',
+        ['table', '/table', 'table', '/table', 'table'], True),
+        ('it matches nth-of-type odd', 'table:nth-of-type(odd)',
+        ['table', '/table', 'table'], False),
+        ('it matches any selector in list', '#a, #b',
+        [('table', {'id': 'b'})], True),
+        ('it closes implied cells', 'td:nth-of-type(2) > table',
+        ['table', 'tr', 'td', 'td', 'table'], True),
+        ('it closes paragraphs at tables', 'div > table',
+        ['div', 'p', 'table'], True),
+        ('it closes paragraphs at blocks', 'div > h2',
+        ['div', 'p', 'span', 'h2'], True),
+        ('it closes paragraphs at void blocks', 'section > table',
+        ['section', 'p', 'hr', 'table'], True),
+        ('it counts tables after paragraphs', 'div > table:nth-of-type(2)',
+        ['div', 'p', 'table', '/table', 'p', 'table'], True),
+        ('it does not close paragraphs outside buttons', 'p div',
+        ['p', 'button', 'div'], True),
+    ]
+)
+def test_selector_matches(_desc, selector, tags, expected):
+    stack = create_stack(tags)
+    assert Selector(selector).matches(stack.elements) is expected
+
+
+@pytest.mark.parametrize(
+    '_desc,selector',
+    [
+        ('it rejects empty selector', ''),
+        ('it rejects leading combinator', '> table'),
+        ('it rejects trailing combinator', 'div >'),
+        ('it rejects empty selector in list', 'table,,div'),
+        ('it rejects unclosed attribute', 'table[id'),
+        ('it rejects unknown pseudo-class', 'table:first-child'),
+        ('it rejects bad nth-of-type', 'table:nth-of-type(x)'),
+    ]
+)
+def test_selector_invalid(_desc, selector):
+    with pytest.raises(ValueError):
+        Selector(selector)
@@ -1,7 +1,85 @@
 # pylint: disable=line-too-long,too-many-lines
+import copy
+import csv
+import io
+import sqlite3
+import sys
 import pytest
 
-from html_table_takeout import Table, TRow, TCell, TLink, TRef, TText
+from html_table_takeout import Table, TRow, TCell, TLink, TRef, TText, TTextCell
+
+
+#########################################################
+# test helpers
+#########################################################
+
+
+def create_nested_tables(depth: int) -> Table:
+    # Each table is nested in the only cell of the next, too deep to write out
+    table = Table(id=0, rows=[
+        TRow(group='tbody', cells=[
+            TCell(header=False, elements=[
+                TText(text=' 0 '),
+            ]),
+        ]),
+    ])
+    for i in range(1, depth):
+        table = Table(id=i, rows=[
+            TRow(group='tbody', cells=[
+                TCell(header=False, elements=[
+                    TText(text=f'\t{i}  '),
+                    TRef(table=table),
+                ]),
+            ]),
+        ])
+    return table
+
+
+# Edge inputs shared by the export sections
+SPANNED_CELL = TCell(header=False, elements=[
+    TText(text='a'),
+])
+
+SPAN_TABLE = Table(id=0, rows=[
+    TRow(group='tbody', cells=[
+        SPANNED_CELL,
+        SPANNED_CELL,
+    ]),
+    TRow(group='tbody', cells=[
+        SPANNED_CELL,
+        TCell(header=False, elements=[
+            TText(text='b'),
+        ]),
+    ]),
+])
+
+NESTED_TABLE = Table(id=1, rows=[
+    TRow(group='tbody', cells=[
+        TCell(header=False, elements=[
+            TText(text='a '),
+            TRef(table=Table(id=0, rows=[
+                TRow(group='tbody', cells=[
+                    TCell(header=False, elements=[
+                        TText(text='n'),
+                    ]),
+                    TCell(header=False, elements=[
+                        TText(text='m'),
+                    ]),
+                ]),
+            ])),
+        ]),
+    ]),
+])
+
+TEXT_CELLS_TABLE = Table(id=0, rows=[
+    TRow(group='tbody', cells=[
+        TTextCell(header=False, text='1'),
+        TCell(header=False),
+        TCell(header=False, elements=[
+            TLink(href='#', text='l'),
+        ]),
+    ]),
+])
 
 
 #########################################################
@@ -297,6 +375,37 @@ def test_table_nested_to_html():
     assert table_three.to_html(indent=4) == expected.lstrip()
 
 
+@pytest.mark.parametrize('indent', [-1, 0, 2, 4])
+def test_table_write_html(indent):
+    table_one = Table(id=0, rows=[
+        TRow(group='tbody', cells=[
+            TCell(header=False, elements=[
+                TText(text='  3\n<4> '),
+            ]),
+        ]),
+    ])
+    table_two = Table(id=1, rows=[
+        TRow(group='thead', cells=[
+            TCell(header=True, elements=[
+                TLink(href='#1', text='1'),
+            ]),
+        ]),
+        TRow(group='tbody', cells=[
+            TCell(header=False, elements=[
+                TText(text='2 '),
+                TRef(table=table_one),
+            ]),
+            TCell(header=False),
+        ]),
+        TRow(group='tfoot'),
+    ])
+    expected = table_two.to_html(indent=indent)
+    output = io.StringIO()
+    table_two.write_html(output, indent=indent)
+    assert output.getvalue() == expected
+    assert ''.join(table_two.iter_html(indent=indent)) == expected
+
+
 #########################################################
 # Table to_csv
 #########################################################
@@ -519,6 +628,823 @@ def test_table_nested_to_csv():
     assert table_three.to_csv() == expected
 
 
+#########################################################
+# Table write_csv, iter_csv_rows
+#########################################################
+
+
+CSV_TABLE = Table(id=0, rows=[
+    TRow(group='thead', cells=[
+        TCell(header=True, elements=[
+            TText(text='Name'),
+        ]),
+        TCell(header=True, elements=[
+            TText(text='Quote'),
+        ]),
+    ]),
+    TRow(group='tbody', cells=[
+        TCell(header=False, elements=[
+            TText(text='Arthur'),
+        ]),
+        TCell(header=False, elements=[
+            TText(text='"Ni!"\tsaid the knight'),
+        ]),
+    ]),
+    TRow(group='tbody', cells=[
+        TCell(header=False, elements=[
+            TText(text='Brian, '),
+            TLink(href='#1', text='of Nazareth'),
+        ]),
+    ]),
+])
+
+
+@pytest.mark.parametrize(
+    '_desc,table,expected',
+    [
+        ('it writes table with no rows',
+            Table(id=0),
+            []
+        ),
+        ('it writes table with no cells',
+            Table(id=0, rows=[
+                TRow(group='tbody'),
+            ]),
+            ['\n']
+        ),
+        ('it writes quoted text and links',
+            CSV_TABLE,
+            ['Name,Quote\n', 'Arthur,"""Ni!"" said the knight"\n', '"Brian, of Nazareth"\n']
+        ),
+        ('it writes rowspan and colspan cells in each position',
+            SPAN_TABLE,
+            ['a,a\n', 'a,b\n']
+        ),
+        ('it writes nested tables as text',
+            NESTED_TABLE,
+            ['a n m\n']
+        ),
+        ('it writes text cells and empty cells',
+            TEXT_CELLS_TABLE,
+            ['1,,l\n']
+        ),
+    ]
+)
+@pytest.mark.parametrize('batch_size', [1, 2, 1000])
+def test_table_write_csv(_desc, table: Table, expected, batch_size):
+    output = io.StringIO()
+    table.write_csv(output, batch_size=batch_size)
+    assert output.getvalue() == ''.join(expected)
+    assert table.to_csv() == ''.join(expected)
+    assert list(table.iter_csv_rows()) == expected
+
+
+@pytest.mark.parametrize(
+    '_desc,dialect,fmtparams,expected',
+    [
+        ('it writes tsv with format parameters', None, {'delimiter': '\t'},
+            'Name\tQuote\nArthur\t"""Ni!"" said the knight"\nBrian, of Nazareth\n'),
+        ('it writes with csv dialect', 'excel-tab', {},
+            'Name\tQuote\r\nArthur\t"""Ni!"" said the knight"\r\nBrian, of Nazareth\r\n'),
+        ('it writes with csv dialect and format parameters', 'excel', {'quoting': csv.QUOTE_ALL, 'lineterminator': '\n'},
+            '"Name","Quote"\n"Arthur","""Ni!"" said the knight"\n"Brian, of Nazareth"\n'),
+    ]
+)
+def test_table_write_csv_format(_desc, dialect, fmtparams, expected):
+    output = io.StringIO()
+    CSV_TABLE.write_csv(output, dialect, **fmtparams)
+    assert output.getvalue() == expected
+    assert ''.join(CSV_TABLE.iter_csv_rows(dialect, **fmtparams)) == expected
+
+
+#########################################################
+# Table to_json, write_jsonl
+#########################################################
+
+
+JSON_SPANNED_CELL = TCell(header=True, elements=[
+    TText(text='1 '),
+    TLink(href='#1', text='link'),
+])
+
+JSON_TABLE = Table(id=1, rows=[
+    TRow(group='thead', cells=[
+        JSON_SPANNED_CELL,
+        JSON_SPANNED_CELL,
+    ]),
+    TRow(group='tbody', cells=[
+        TCell(header=False, elements=[
+            TText(text='2\n"é"'),
+            TRef(table=Table(id=0, rows=[
+                TRow(group='tbody', cells=[
+                    TCell(header=False, elements=[
+                        TText(text='3'),
+                    ]),
+                ]),
+            ])),
+        ]),
+        TCell(header=False),
+    ]),
+])
+
+
+@pytest.mark.parametrize(
+    '_desc,table,expected',
+    [
+        ('it converts table with no rows to json',
+            Table(id=0),
+            '{"id":0,"tables":[{"id":0,"rows":[]}]}'
+        ),
+        ('it converts table with no cells to json',
+            Table(id=0, rows=[
+                TRow(group='tbody'),
+            ]),
+            '{"id":0,"tables":[{"id":0,"rows":[{"group":"tbody","cells":[]}]}]}'
+        ),
+        ('it converts rowspan and colspan cells to references to the first',
+            SPAN_TABLE,
+            '{"id":0,"tables":[{"id":0,"rows":['
+            '{"group":"tbody","cells":[{"header":false,"elements":[{"text":"a"}]},{"same":0}]},'
+            '{"group":"tbody","cells":[{"same":0},{"header":false,"elements":[{"text":"b"}]}]}'
+            ']}]}'
+        ),
+        ('it converts nested tables before the tables containing them',
+            JSON_TABLE,
+            '{"id":1,"tables":['
+            '{"id":0,"rows":[{"group":"tbody","cells":[{"header":false,"elements":[{"text":"3"}]}]}]},'
+            '{"id":1,"rows":['
+            '{"group":"thead","cells":[{"header":true,"elements":[{"text":"1 "},{"text":"link","href":"#1"}]},{"same":0}]},'
+            '{"group":"tbody","cells":[{"header":false,"elements":[{"text":"2\\n\\"é\\""},{"table":0}]},{"header":false,"elements":[]}]}'
+            ']}'
+            ']}'
+        ),
+        ('it converts text cells and empty cells to json',
+            TEXT_CELLS_TABLE,
+            '{"id":0,"tables":[{"id":0,"rows":[{"group":"tbody","cells":['
+            '{"header":false,"elements":[{"text":"1"}]},{"header":false,"elements":[]},{"header":false,"elements":[{"text":"l","href":"#"}]}'
+            ']}]}]}'
+        ),
+    ]
+)
+def test_table_to_json(_desc, table: Table, expected):
+    assert table.to_json() == expected
+    assert Table.from_json(expected).to_json() == expected
+
+
+@pytest.mark.parametrize(
+    '_desc,table,expected',
+    [
+        ('it writes table with no rows as jsonl',
+            Table(id=0),
+            ['{"type":"table","id":0,"root":true}']
+        ),
+        ('it writes table with no cells as jsonl',
+            Table(id=0, rows=[
+                TRow(group='tbody'),
+            ]),
+            ['{"type":"table","id":0,"root":true}', '{"type":"row","group":"tbody","cells":[]}']
+        ),
+        ('it writes rowspan and colspan cells as references to the first',
+            SPAN_TABLE,
+            [
+                '{"type":"table","id":0,"root":true}',
+                '{"type":"row","group":"tbody","cells":[{"header":false,"elements":[{"text":"a"}]},{"same":0}]}',
+                '{"type":"row","group":"tbody","cells":[{"same":0},{"header":false,"elements":[{"text":"b"}]}]}',
+            ]
+        ),
+        ('it writes nested tables before the tables containing them',
+            JSON_TABLE,
+            [
+                '{"type":"table","id":0,"root":false}',
+                '{"type":"row","group":"tbody","cells":[{"header":false,"elements":[{"text":"3"}]}]}',
+                '{"type":"table","id":1,"root":true}',
+                '{"type":"row","group":"thead","cells":[{"header":true,"elements":[{"text":"1 "},{"text":"link","href":"#1"}]},{"same":0}]}',
+                '{"type":"row","group":"tbody","cells":[{"header":false,"elements":[{"text":"2\\n\\"é\\""},{"table":0}]},{"header":false,"elements":[]}]}',
+            ]
+        ),
+    ]
+)
+def test_table_write_jsonl(_desc, table: Table, expected):
+    output = io.StringIO()
+    table.write_jsonl(output)
+    assert output.getvalue().splitlines() == expected
+
+
+def test_table_read_jsonl():
+    tables = [JSON_TABLE, Table(id=0), SPAN_TABLE, NESTED_TABLE, create_nested_tables(3)]
+    output = io.StringIO()
+    for table in tables:
+        table.write_jsonl(output)
+    output.seek(0)
+
+    actual = list(Table.read_jsonl(output))
+    assert actual == tables
+    assert actual[0].rows[0].cells[0] is actual[0].rows[0].cells[1]
+    assert actual[2].rows[0].cells[0] is actual[2].rows[1].cells[0]
+
+
+def test_table_from_json_shared_cells():
+    actual = Table.from_json(JSON_TABLE.to_json())
+    assert actual == JSON_TABLE
+    assert actual.rows[0].cells[0] is actual.rows[0].cells[1]
+
+
+def test_table_to_json_deeply_nested():
+    depth = 5000
+    table = create_nested_tables(depth)
+    actual = Table.from_json(table.to_json())
+    assert actual.inner_text() == table.inner_text()
+
+
+def test_table_to_json_duplicate_id():
+    table = Table(id=0, rows=[
+        TRow(group='tbody', cells=[
+            TCell(header=False, elements=[
+                TRef(table=Table(id=0)),
+            ]),
+        ]),
+    ])
+    with pytest.raises(ValueError, match='same id 0'):
+        table.to_json()
+    with pytest.raises(ValueError, match='same id 0'):
+        table.write_jsonl(io.StringIO())
+
+
+#########################################################
+# Table header, iter_records
+#########################################################
+
+
+RECORDS_NAME_CELL = TCell(header=True, elements=[
+    TText(text='Name'),
+])
+RECORDS_PRICE_CELL = TCell(header=True, elements=[
+    TText(text='Price'),
+])
+
+RECORDS_TABLE = Table(id=0, rows=[
+    TRow(group='thead', cells=[
+        RECORDS_NAME_CELL,
+        RECORDS_PRICE_CELL,
+        RECORDS_PRICE_CELL,
+        TCell(header=True),
+    ]),
+    TRow(group='thead', cells=[
+        RECORDS_NAME_CELL,
+        TCell(header=True, elements=[
+            TText(text='Low'),
+        ]),
+        TCell(header=True, elements=[
+            TText(text='High'),
+        ]),
+        TCell(header=True, elements=[
+            TText(text='Name'),
+        ]),
+    ]),
+    TRow(group='tbody', cells=[
+        TCell(header=False, elements=[
+            TText(text='A'),
+        ]),
+        TCell(header=False, elements=[
+            TText(text='1'),
+        ]),
+        TCell(header=False, elements=[
+            TText(text='2'),
+        ]),
+        TCell(header=False, elements=[
+            TText(text='x'),
+        ]),
+    ]),
+    TRow(group='tbody', cells=[
+        TCell(header=True, elements=[
+            TText(text='B'),
+        ]),
+    ]),
+])
+
+NO_HEADER_TABLE = Table(id=0, rows=[
+    TRow(group='tbody', cells=[
+        TCell(header=False, elements=[
+            TText(text='1'),
+        ]),
+    ]),
+    TRow(group='tbody', cells=[
+        TCell(header=False, elements=[
+            TText(text='2'),
+        ]),
+        TCell(header=False, elements=[
+            TText(text='3'),
+        ]),
+    ]),
+])
+
+
+@pytest.mark.parametrize(
+    '_desc,table,sep,expected',
+    [
+        ('it returns no names for table with no rows',
+            Table(id=0),
+            ' ',
+            ()
+        ),
+        ('it returns blank names without header-like rows',
+            SPAN_TABLE,
+            ' ',
+            ('', '')
+        ),
+        ('it joins the texts of header rows spanned by rowspan and colspan',
+            RECORDS_TABLE,
+            ' ',
+            ('Name', 'Price Low', 'Price High', 'Name')
+        ),
+        ('it joins the texts of header rows with separator',
+            RECORDS_TABLE,
+            '/',
+            ('Name', 'Price/Low', 'Price/High', 'Name')
+        ),
+        ('it renders nested tables in header cells as text',
+            Table(id=1, rows=[
+                TRow(group='thead', cells=[
+                    TCell(header=True, elements=[
+                        TText(text='h '),
+                        TRef(table=Table(id=0, rows=[
+                            TRow(group='tbody', cells=[
+                                TCell(header=False, elements=[
+                                    TText(text='n'),
+                                ]),
+                            ]),
+                        ])),
+                    ]),
+                ]),
+            ]),
+            ' ',
+            ('h n',)
+        ),
+        ('it reads header text cells',
+            Table(id=0, rows=[
+                TRow(group='thead', cells=[
+                    TTextCell(header=True, text='h'),
+                ]),
+                TRow(group='tbody', cells=[
+                    TTextCell(header=False, text='1'),
+                ]),
+            ]),
+            ' ',
+            ('h',)
+        ),
+    ]
+)
+def test_table_header(_desc, table: Table, sep, expected):
+    assert table.header(sep=sep) == expected
+
+
+def test_table_header_cache_reset():
+    table = copy.deepcopy(RECORDS_TABLE)
+    assert table.header() is table.header()
+    table.rows[1].cells[1] = TCell(header=True, elements=[TText(text='Min')])
+    assert table.header() == ('Name', 'Price Min', 'Price High', 'Name')
+    table.rows[2].cells.append(TCell())
+    assert table.header() == ('Name', 'Price Min', 'Price High', 'Name', '')
+    table.rows[1].group = 'tbody'
+    table.rows[1].cells[0] = TCell()
+    assert table.header() == ('Name', 'Price', 'Price', '', '')
+
+
+@pytest.mark.parametrize(
+    '_desc,table,expected,expected_dicts',
+    [
+        ('it yields no records for table with no rows',
+            Table(id=0),
+            [],
+            []
+        ),
+        ('it yields the rows after header rows padded to the table width',
+            RECORDS_TABLE,
+            [('A', '1', '2', 'x'), ('B', '', '', '')],
+            [
+                {'Name': 'A', 'Price Low': '1', 'Price High': '2', 'Name_2': 'x'},
+                {'Name': 'B', 'Price Low': '', 'Price High': '', 'Name_2': ''},
+            ]
+        ),
+        ('it yields every row without header-like rows',
+            NO_HEADER_TABLE,
+            [('1', ''), ('2', '3')],
+            [{'column_1': '1', 'column_2': ''}, {'column_1': '2', 'column_2': '3'}]
+        ),
+        ('it yields rowspan and colspan cells in each position',
+            SPAN_TABLE,
+            [('a', 'a'), ('a', 'b')],
+            [{'column_1': 'a', 'column_2': 'a'}, {'column_1': 'a', 'column_2': 'b'}]
+        ),
+        ('it yields nested tables as text',
+            NESTED_TABLE,
+            [('a n m',)],
+            [{'column_1': 'a n m'}]
+        ),
+        ('it yields text cells and empty cells',
+            TEXT_CELLS_TABLE,
+            [('1', '', 'l')],
+            [{'column_1': '1', 'column_2': '', 'column_3': 'l'}]
+        ),
+    ]
+)
+def test_table_iter_records(_desc, table: Table, expected, expected_dicts):
+    assert list(table.iter_records()) == expected
+    assert list(table.iter_records(as_dict=True)) == expected_dicts
+
+
+def test_table_iter_records_shares_keys():
+    records = list(RECORDS_TABLE.iter_records(as_dict=True))
+    assert all(a is b for a, b in zip(records[0], records[1]))
+
+
+#########################################################
+# Table to_sqlite
+#########################################################
+
+
+SQLITE_TABLE = Table(id=0, rows=[
+    TRow(group='thead', cells=[
+        TCell(header=True, elements=[
+            TText(text='Name'),
+        ]),
+        TCell(header=True, elements=[
+            TText(text='name'),
+        ]),
+        TCell(header=True),
+    ]),
+    TRow(group='tbody', cells=[
+        TCell(header=False, elements=[
+            TText(text='1'),
+        ]),
+        TCell(header=False, elements=[
+            TText(text='2'),
+        ]),
+        TCell(header=False, elements=[
+            TText(text='3'),
+        ]),
+    ]),
+    TRow(group='tbody', cells=[
+        TCell(header=False, elements=[
+            TText(text='4'),
+        ]),
+    ]),
+])
+
+
+def select_sqlite(conn: sqlite3.Connection, name: str) -> tuple[list[str], list[tuple]]:
+    cursor = conn.execute(f'SELECT * FROM "{name}"')
+    return [d[0] for d in cursor.description], cursor.fetchall()
+
+
+@pytest.mark.parametrize(
+    '_desc,table,header,expected',
+    [
+        ('it uses header-like rows for auto header',
+            SQLITE_TABLE,
+            'auto',
+            (['Name', 'name_2', 'column_3'], [('1', '2', '3'), ('4', None, None)])
+        ),
+        ('it uses first row for header',
+            SQLITE_TABLE,
+            True,
+            (['Name', 'name_2', 'column_3'], [('1', '2', '3'), ('4', None, None)])
+        ),
+        ('it uses no header',
+            SQLITE_TABLE,
+            False,
+            (['column_1', 'column_2', 'column_3'], [('Name', 'name', ''), ('1', '2', '3'), ('4', None, None)])
+        ),
+        ('it uses no header for auto header when first row is not header-like',
+            Table(id=0, rows=[
+                TRow(group='tbody', cells=[
+                    TCell(header=False, elements=[
+                        TText(text='Name'),
+                    ]),
+                    TCell(header=True, elements=[
+                        TText(text='name'),
+                    ]),
+                ]),
+                TRow(group='tbody', cells=[
+                    TCell(header=False, elements=[
+                        TText(text='1'),
+                    ]),
+                ]),
+            ]),
+            'auto',
+            (['column_1', 'column_2'], [('Name', 'name'), ('1', None)])
+        ),
+        ('it joins multiple header rows',
+            RECORDS_TABLE,
+            'auto',
+            (['Name', 'Price Low', 'Price High', 'Name_2'], [('A', '1', '2', 'x'), ('B', None, None, None)])
+        ),
+        ('it writes rowspan and colspan cells in each position',
+            SPAN_TABLE,
+            'auto',
+            (['column_1', 'column_2'], [('a', 'a'), ('a', 'b')])
+        ),
+        ('it writes nested tables as text',
+            NESTED_TABLE,
+            'auto',
+            (['column_1'], [('a n m',)])
+        ),
+        ('it writes text cells and empty cells',
+            TEXT_CELLS_TABLE,
+            'auto',
+            (['column_1', 'column_2', 'column_3'], [('1', '', 'l')])
+        ),
+    ]
+)
+@pytest.mark.parametrize('batch_size', [1, 2, 1000])
+def test_table_to_sqlite(_desc, table: Table, header, expected, batch_size):
+    conn = sqlite3.connect(':memory:')
+    table.to_sqlite(conn, 'my "table"', header=header, batch_size=batch_size)
+    assert select_sqlite(conn, 'my ""table""') == expected
+
+
+def test_table_to_sqlite_if_exists():
+    conn = sqlite3.connect(':memory:')
+    SQLITE_TABLE.to_sqlite(conn, 't')
+    with pytest.raises(sqlite3.OperationalError, match='already exists'):
+        SQLITE_TABLE.to_sqlite(conn, 't')
+    SQLITE_TABLE.to_sqlite(conn, 't', if_exists='append')
+    assert len(select_sqlite(conn, 't')[1]) == 4
+    SQLITE_TABLE.to_sqlite(conn, 't', if_exists='replace')
+    assert len(select_sqlite(conn, 't')[1]) == 2
+
+
+def test_table_to_sqlite_nested():
+    conn = sqlite3.connect(':memory:')
+    table = Table(id=2, rows=[
+        TRow(group='tbody', cells=[
+            TCell(header=False, elements=[
+                TText(text='\t2  '),
+                TRef(table=Table(id=1, rows=[
+                    TRow(group='tbody', cells=[
+                        TCell(header=False, elements=[
+                            TText(text='\t1  '),
+                            TRef(table=Table(id=0, rows=[
+                                TRow(group='tbody', cells=[
+                                    TCell(header=False, elements=[
+                                        TText(text=' 0 '),
+                                    ]),
+                                ]),
+                            ])),
+                        ]),
+                    ]),
+                ])),
+            ]),
+        ]),
+        TRow(group='tbody', cells=[
+            TCell(header=False, elements=[
+                TRef(table=Table(id=5, rows=[
+                    TRow(group='tbody', cells=[
+                        TCell(header=False, elements=[
+                            TText(text='5'),
+                        ]),
+                    ]),
+                ])),
+            ]),
+        ]),
+    ])
+    table.to_sqlite(conn, 't', nested=True)
+    assert select_sqlite(conn, 't') == (['column_1'], [('2  1  0',), ('5',)])
+    assert select_sqlite(conn, 't_1') == (['column_1'], [('1  0',)])
+    assert select_sqlite(conn, 't_0') == (['column_1'], [('0',)])
+    assert select_sqlite(conn, 't_5') == (['column_1'], [('5',)])
+    assert select_sqlite(conn, 't_tables') == (
+        ['id', 'parent_id', 'row_index', 'column_index', 'table_name'],
+        [(2, None, None, None, 't'), (0, 1, 0, 0, 't_0'), (1, 2, 0, 0, 't_1'), (5, 2, 1, 0, 't_5')],
+    )
+
+
+@pytest.mark.parametrize(
+    '_desc,table',
+    [
+        ('it rejects table with no rows', Table(id=0)),
+        ('it rejects table with no cells', Table(id=0, rows=[TRow(group='tbody')])),
+    ]
+)
+def test_table_to_sqlite_no_cells(_desc, table: Table):
+    conn = sqlite3.connect(':memory:')
+    with pytest.raises(ValueError, match='no cells'):
+        table.to_sqlite(conn, 't')
+    assert not conn.execute("SELECT name FROM sqlite_master").fetchall()
+
+
+#########################################################
+# Table to_numpy
+#########################################################
+
+
+NUMPY_SPANNED_CELL = TCell(header=False, elements=[
+    TText(text='1,000'),
+])
+
+NUMPY_TABLE = Table(id=0, rows=[
+    TRow(group='thead', cells=[
+        TCell(header=True, elements=[
+            TText(text='Name'),
+        ]),
+        TCell(header=True, elements=[
+            TText(text='Qty'),
+        ]),
+        TCell(header=True, elements=[
+            TText(text='Price'),
+        ]),
+    ]),
+    TRow(group='tbody', cells=[
+        TCell(header=False, elements=[
+            TText(text='A'),
+        ]),
+        NUMPY_SPANNED_CELL,
+        NUMPY_SPANNED_CELL,
+    ]),
+    TRow(group='tbody', cells=[
+        TCell(header=False, elements=[
+            TText(text='Bb'),
+        ]),
+        TCell(header=False, elements=[
+            TText(text='(2)'),
+        ]),
+    ]),
+])
+
+NUMPY_NUMERIC_TABLE = Table(id=0, rows=[
+    TRow(group='tbody', cells=[
+        TCell(header=False, elements=[
+            TText(text='5%'),
+        ]),
+        NUMPY_SPANNED_CELL,
+        NUMPY_SPANNED_CELL,
+    ]),
+    TRow(group='tbody', cells=[
+        TTextCell(header=False, text='3'),
+        TCell(header=False, elements=[
+            TText(text='(2)'),
+        ]),
+    ]),
+])
+
+
+@pytest.mark.parametrize(
+    '_desc,table,header,expected',
+    [
+        ('it converts table with no rows to an empty array',
+            Table(id=0),
+            'auto',
+            []
+        ),
+        ('it converts the rows after header rows padded with blanks',
+            NUMPY_TABLE,
+            'auto',
+            [['A', '1,000', '1,000'], ['Bb', '(2)', '']]
+        ),
+        ('it converts every row without header',
+            NUMPY_TABLE,
+            False,
+            [['Name', 'Qty', 'Price'], ['A', '1,000', '1,000'], ['Bb', '(2)', '']]
+        ),
+        ('it converts nested tables as text',
+            NESTED_TABLE,
+            'auto',
+            [['a n m']]
+        ),
+        ('it converts text cells and empty cells',
+            TEXT_CELLS_TABLE,
+            'auto',
+            [['1', '', 'l']]
+        ),
+    ]
+)
+@pytest.mark.parametrize('dtype', [None, str])
+def test_table_to_numpy(_desc, table: Table, header, expected, dtype):
+    pytest.importorskip('numpy')
+    actual = table.to_numpy(dtype=dtype, header=header)
+    assert actual.dtype.kind == ('O' if dtype is None else 'U')
+    assert actual.tolist() == expected
+
+
+def test_table_to_numpy_shares_spanned_texts():
+    pytest.importorskip('numpy')
+    actual = SPAN_TABLE.to_numpy()
+    assert actual.tolist() == [['a', 'a'], ['a', 'b']]
+    assert actual[0, 0] is actual[0, 1] is actual[1, 0]
+
+
+@pytest.mark.parametrize(
+    '_desc,table,dtype,expected',
+    [
+        ('it converts table with no rows to an empty numeric array',
+            Table(id=0),
+            'float64',
+            []
+        ),
+        ('it converts numbers, percentages and blanks to floats',
+            NUMPY_NUMERIC_TABLE,
+            'float64',
+            [[0.05, 1000.0, 1000.0], [3.0, -2.0, float('nan')]]
+        ),
+        ('it converts numbers to integers',
+            Table(id=0, rows=[
+                TRow(group='tbody', cells=[
+                    NUMPY_SPANNED_CELL,
+                    TCell(header=False, elements=[
+                        TText(text='(2)'),
+                    ]),
+                ]),
+            ]),
+            'int64',
+            [[1000, -2]]
+        ),
+        ('it converts dates and nulls to dates',
+            Table(id=0, rows=[
+                TRow(group='tbody', cells=[
+                    TCell(header=False, elements=[
+                        TText(text='2024-01-02'),
+                    ]),
+                ]),
+                TRow(group='tbody', cells=[
+                    TCell(header=False, elements=[
+                        TText(text='—'),
+                    ]),
+                ]),
+            ]),
+            'datetime64[D]',
+            [['2024-01-02'], ['NaT']]
+        ),
+    ]
+)
+def test_table_to_numpy_typed(_desc, table: Table, dtype, expected):
+    np = pytest.importorskip('numpy')
+    actual = table.to_numpy(dtype=dtype, header=False)
+    assert actual.dtype == np.dtype(dtype)
+    assert np.array_equal(actual, np.array(expected, dtype=dtype).reshape(actual.shape), equal_nan=True)
+
+
+@pytest.mark.parametrize(
+    '_desc,table,dtype,message',
+    [
+        ('it rejects percentages for integers',
+            NUMPY_NUMERIC_TABLE,
+            'int64',
+            "Failed to convert '5%' in record 0 to int64"
+        ),
+        ('it rejects blanks for integers',
+            Table(id=0, rows=[
+                TRow(group='tbody', cells=[
+                    NUMPY_SPANNED_CELL,
+                ]),
+                TRow(group='tbody', cells=[
+                    TCell(header=False),
+                ]),
+            ]),
+            'int64',
+            "Failed to convert '' in record 1 to int64"
+        ),
+        ('it rejects text for dates',
+            Table(id=0, rows=[
+                TRow(group='tbody', cells=[
+                    TCell(header=False, elements=[
+                        TText(text='soon'),
+                    ]),
+                ]),
+            ]),
+            'datetime64[D]',
+            r"Failed to convert 'soon' in record 0 to datetime64\[D\]"
+        ),
+    ]
+)
+def test_table_to_numpy_invalid(_desc, table: Table, dtype, message):
+    pytest.importorskip('numpy')
+    with pytest.raises(ValueError, match=message):
+        table.to_numpy(dtype=dtype, header=False)
+
+
+def test_table_to_numpy_structured():
+    np = pytest.importorskip('numpy')
+
+    actual = NUMPY_TABLE.to_numpy(structured=True)
+    assert actual.dtype == np.dtype([('Name', '<U2'), ('Qty', 'int64'), ('Price', 'float64')])
+    assert actual['Name'].tolist() == ['A', 'Bb']
+    assert actual['Qty'].tolist() == [1000, -2]
+    assert np.array_equal(actual['Price'], [1000.0, np.nan], equal_nan=True)
+
+    actual = NUMPY_TABLE.to_numpy(dtype=[('a', object), ('b', 'float32'), ('c', 'U3')])
+    assert actual.dtype == np.dtype([('a', object), ('b', 'float32'), ('c', '<U3')])
+    assert actual.tolist() == [('A', 1000.0, '1,0'), ('Bb', -2.0, '')]
+
+    with pytest.raises(ValueError, match='Expected 3 fields'):
+        NUMPY_TABLE.to_numpy(dtype=[('a', object)])
+
+
+def test_table_to_numpy_not_installed(monkeypatch):
+    monkeypatch.setitem(sys.modules, 'numpy', None)
+    with pytest.raises(ImportError, match='NumPy is required'):
+        NUMPY_TABLE.to_numpy()
+
+
 #########################################################
 # Table inner_text
 #########################################################
@@ -648,6 +1574,51 @@ def test_table_nested_inner_text():
     assert table_three.inner_text() == expected
 
 
+#########################################################
+# Table walk_tables
+#########################################################
+
+
+def test_table_walk_tables():
+    table_one = Table(id=0)
+    table_two = Table(id=1)
+    table_three = Table(id=2, rows=[
+        TRow(group='tbody', cells=[
+            TCell(header=False, elements=[
+                TRef(table=table_one),
+            ]),
+        ]),
+    ])
+    shared_cell = TCell(header=False, elements=[
+        TRef(table=table_two),
+    ])
+    table_four = Table(id=3, rows=[
+        TRow(group='tbody', cells=[
+            TCell(header=False, elements=[
+                TRef(table=table_three),
+            ]),
+            shared_cell,
+            shared_cell,
+        ]),
+        TRow(group='tbody', cells=[
+            shared_cell,
+        ]),
+    ])
+    assert [t.id for t in table_four.walk_tables()] == [3, 2, 0, 1]
+    assert [t.id for t in table_one.walk_tables()] == [0]
+
+
+def test_table_deeply_nested():
+    depth = 5000
+    table = create_nested_tables(depth)
+    assert len(list(table.walk_tables())) == depth
+    assert table.inner_text() == '  '.join(str(i) for i in reversed(range(depth)))
+    html_text = table.to_html(indent=-1)
+    assert html_text.startswith(f"<table data-table-id='{depth - 1}'><tbody><tr><td>{depth - 1} <table data-table-id='{depth - 2}'>")
+    assert html_text.endswith("<td>0</td></tr></tbody></table>" + "</td></tr></tbody></table>" * (depth - 1))
+    assert table.rows[0].cells[0].inner_text() == table.inner_text()
+
+
 #########################################################
 # Table max_width
 #########################################################
@@ -982,6 +1953,233 @@ def test_table_nested_rectangify():
         assert table.is_rectangular()
 
 
+#########################################################
+# Table fingerprint
+#########################################################
+
+
+FINGERPRINT_TABLE = Table(id=1, rows=[
+    TRow(group='tbody', cells=[
+        TCell(header=False, elements=[
+            TText(text='a'),
+            TLink(text='l', href='h'),
+        ]),
+        TCell(header=False, elements=[
+            TRef(table=Table(id=0, rows=[
+                TRow(group='tbody', cells=[
+                    TCell(header=False, elements=[
+                        TText(text='n'),
+                    ]),
+                ]),
+            ])),
+        ]),
+    ]),
+])
+
+
+@pytest.mark.parametrize(
+    '_desc,table,other,expected',
+    [
+        ('it is equal for tables with no rows whatever their id and span',
+            Table(id=0),
+            Table(id=3, span=(1, 2)),
+            True
+        ),
+        ('it changes with rows without cells',
+            Table(id=0),
+            Table(id=0, rows=[
+                TRow(group='tbody'),
+            ]),
+            False
+        ),
+        ('it is equal whatever the id and span',
+            FINGERPRINT_TABLE,
+            Table(id=7, span=(3, 9), rows=[
+                TRow(group='tbody', cells=[
+                    TCell(header=False, elements=[
+                        TText(text='a'),
+                        TLink(text='l', href='h'),
+                    ]),
+                    TCell(header=False, elements=[
+                        TRef(table=Table(id=5, rows=[
+                            TRow(group='tbody', cells=[
+                                TCell(header=False, elements=[
+                                    TText(text='n'),
+                                ]),
+                            ]),
+                        ])),
+                    ]),
+                ]),
+            ]),
+            True
+        ),
+        ('it changes with text',
+            FINGERPRINT_TABLE,
+            Table(id=1, rows=[
+                TRow(group='tbody', cells=[
+                    TCell(header=False, elements=[
+                        TText(text='b'),
+                        TLink(text='l', href='h'),
+                    ]),
+                    FINGERPRINT_TABLE.rows[0].cells[1],
+                ]),
+            ]),
+            False
+        ),
+        ('it changes with link href',
+            FINGERPRINT_TABLE,
+            Table(id=1, rows=[
+                TRow(group='tbody', cells=[
+                    TCell(header=False, elements=[
+                        TText(text='a'),
+                        TLink(text='l', href='g'),
+                    ]),
+                    FINGERPRINT_TABLE.rows[0].cells[1],
+                ]),
+            ]),
+            False
+        ),
+        ('it changes with header cells',
+            FINGERPRINT_TABLE,
+            Table(id=1, rows=[
+                TRow(group='tbody', cells=[
+                    TCell(header=True, elements=[
+                        TText(text='a'),
+                        TLink(text='l', href='h'),
+                    ]),
+                    FINGERPRINT_TABLE.rows[0].cells[1],
+                ]),
+            ]),
+            False
+        ),
+        ('it changes with row group',
+            FINGERPRINT_TABLE,
+            Table(id=1, rows=[
+                TRow(group='thead', cells=FINGERPRINT_TABLE.rows[0].cells),
+            ]),
+            False
+        ),
+        ('it changes with nested table',
+            FINGERPRINT_TABLE,
+            Table(id=1, rows=[
+                TRow(group='tbody', cells=[
+                    FINGERPRINT_TABLE.rows[0].cells[0],
+                    TCell(header=False, elements=[
+                        TRef(table=Table(id=0, rows=[
+                            TRow(group='tbody', cells=[
+                                TCell(header=False, elements=[
+                                    TText(text='m'),
+                                ]),
+                            ]),
+                        ])),
+                    ]),
+                ]),
+            ]),
+            False
+        ),
+        ('it changes with elements running together',
+            FINGERPRINT_TABLE,
+            Table(id=1, rows=[
+                TRow(group='tbody', cells=[
+                    TCell(header=False, elements=[
+                        TText(text='al'),
+                        TLink(text='', href='h'),
+                    ]),
+                    FINGERPRINT_TABLE.rows[0].cells[1],
+                ]),
+            ]),
+            False
+        ),
+        ('it is equal for text cells and cells of text',
+            Table(id=0, rows=[
+                TRow(group='tbody', cells=[
+                    TTextCell(header=False, text='a'),
+                ]),
+            ]),
+            Table(id=0, rows=[
+                TRow(group='tbody', cells=[
+                    TCell(header=False, elements=[
+                        TText(text='a'),
+                    ]),
+                ]),
+            ]),
+            True
+        ),
+        ('it is equal for colspan cells and copies of them',
+            Table(id=0, rows=[
+                TRow(group='tbody', cells=[
+                    SPANNED_CELL,
+                    SPANNED_CELL,
+                ]),
+            ]),
+            Table(id=0, rows=[
+                TRow(group='tbody', cells=[
+                    TCell(header=False, elements=[
+                        TText(text='a'),
+                    ]),
+                    TCell(header=False, elements=[
+                        TText(text='a'),
+                    ]),
+                ]),
+            ]),
+            True
+        ),
+        ('it is equal for a nested table referenced twice and copies of it',
+            Table(id=1, rows=[
+                TRow(group='tbody', cells=[
+                    FINGERPRINT_TABLE.rows[0].cells[1],
+                    FINGERPRINT_TABLE.rows[0].cells[1],
+                ]),
+            ]),
+            Table(id=1, rows=[
+                TRow(group='tbody', cells=[
+                    FINGERPRINT_TABLE.rows[0].cells[1],
+                    copy.deepcopy(FINGERPRINT_TABLE.rows[0].cells[1]),
+                ]),
+            ]),
+            True
+        ),
+    ]
+)
+def test_table_fingerprint(_desc, table: Table, other: Table, expected):
+    assert (table.fingerprint() == other.fingerprint()) == expected
+    if table.rows and other.rows:
+        assert (table.rows[0].fingerprint() == other.rows[0].fingerprint()) == expected
+    assert len({table.fingerprint(): table, other.fingerprint(): other}) == (1 if expected else 2)
+
+
+def test_table_fingerprint_levels():
+    row = FINGERPRINT_TABLE.rows[0]
+    assert row.fingerprint() != row.cells[0].fingerprint()
+    assert row.cells[0].fingerprint() != row.cells[1].fingerprint()
+    assert TTextCell(text='a').fingerprint() == TCell(elements=[TText('a')]).fingerprint()
+
+
+def test_table_fingerprint_follows_changes():
+    table = copy.deepcopy(FINGERPRINT_TABLE)
+    nested = table.rows[0].cells[1].elements[0].table  # type: ignore[attr-defined]
+    nested.rows[0].cells[0].elements[0].text = 'm'
+    assert table.fingerprint() != FINGERPRINT_TABLE.fingerprint()
+    assert table.rows[0].fingerprint() != FINGERPRINT_TABLE.rows[0].fingerprint()
+    nested.rows[0].cells[0].elements[0].text = 'n'
+    assert table.fingerprint() == FINGERPRINT_TABLE.fingerprint()
+    table.rows[0].group = 'thead'
+    assert table.fingerprint() != FINGERPRINT_TABLE.fingerprint()
+
+    table = copy.deepcopy(FINGERPRINT_TABLE)
+    table.rows.append(TRow(cells=[TCell()]))
+    fingerprint = table.fingerprint()
+    table.rectangify()
+    assert table.fingerprint() != fingerprint
+
+
+def test_table_fingerprint_deeply_nested():
+    depth = 5000
+    table = create_nested_tables(depth)
+    assert table.fingerprint() == create_nested_tables(depth).fingerprint()
+    assert table.fingerprint() != create_nested_tables(depth - 1).fingerprint()
+
+
 #########################################################
 # Table __iter__
 #########################################################